@@ -0,0 +1,72 @@
+import os
+
+from time import perf_counter
+
+from lib.classes import F1DB
+from lib.search import search_params
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+def per_call(fn, calls: int) -> float:
+    fn()
+
+    start = perf_counter()
+    for _ in range(calls):
+        fn()
+
+    return (perf_counter() - start) / calls * 1e6
+
+def sample_params(db: F1DB) -> dict[str, object]:
+    race_id, gp, circuit, year = db.execute(
+        """
+        SELECT race.id, race.grand_prix_id, race.circuit_id, race.year
+        FROM race
+        JOIN race_data ON race_data.race_id = race.id
+        WHERE race_data.type = 'SPRINT_RACE_RESULT'
+        ORDER BY race.id DESC
+        LIMIT 1
+        """, []
+    )[0]
+
+    driver, = db.execute(
+        "SELECT driver_id FROM race_data WHERE race_id = ? AND type = 'RACE_RESULT' LIMIT 1", [race_id]
+    )[0]
+
+    gp_params = {"id": gp, "year": year}
+    driver_params = {"id": driver, "year": year}
+    circuit_params = {"id": circuit, "limit": 15, "after": 0, "reverse": False}
+    all_circuits_params = {"limit": 3, "after": 0, "reverse": False}
+
+    return {
+        "best-lap": circuit_params,
+        "best-qualifying": circuit_params,
+        "most-wins": circuit_params,
+        "most-podiums": circuit_params,
+        "circuit-best-lap": circuit_params,
+        "circuit-best-qualifying": circuit_params,
+        "circuit-most-wins": circuit_params,
+        "circuit-most-podiums": circuit_params,
+        "circuits-best-lap": all_circuits_params,
+        "circuits-best-qualifying": all_circuits_params,
+        "circuits-most-wins": all_circuits_params,
+        "circuits-most-podiums": all_circuits_params,
+        "all-circuits-best-lap": all_circuits_params,
+        "all-circuits-best-qualifying": all_circuits_params,
+        "all-circuits-most-wins": all_circuits_params,
+        "all-circuits-most-podiums": all_circuits_params,
+        "championship": {"first": year, "last": year},
+        "driver-pits": driver_params,
+        "driver-qualifying": driver_params,
+        "driver-races": driver_params,
+        "driver-season-overview": {"id": driver, "first": year, "last": year},
+        "driver-sprints": driver_params,
+        "season-overview": {"year": year},
+        "gp-race": gp_params,
+        "gp-race-qualifying": gp_params,
+        "gp-sprint": gp_params,
+        "gp-sprint-qualifying": gp_params,
+        "search": search_params(gp[:4]),
+        "records-totals": {"kind": "win", "limit": 15},
+        "records-streaks": {"kind": "points", "limit": 15},
+        "h2h": {"first": year, "last": year, "driver": None, "constructor": None},
+    }
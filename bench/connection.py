@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+import argparse
+
+from time import perf_counter
+
+from lib.classes import F1DB
+from bench.common import ROOT_DIR, per_call, sample_params
+
+def cold_call(profile: str, db_file: str, name: str, params) -> float:
+    db = F1DB(root_dir=ROOT_DIR, profile=profile, db_file=db_file)
+
+    start = perf_counter()
+    db.run_script(name, params)
+    elapsed = perf_counter() - start
+
+    db.con.close()
+    return elapsed * 1e6
+
+def main(args: argparse.Namespace):
+    profiles = list(F1DB.PROFILES)
+    dbs = {p: F1DB(root_dir=ROOT_DIR, profile=p, db_file=args.db) for p in profiles}
+    params = sample_params(dbs["readonly"])
+
+    header = f"{'script':<30}"
+    for p in profiles:
+        header += f" {p + ' cold':>16} {p + ' warm':>16}"
+    print(header)
+
+    totals = {p: [0.0, 0.0] for p in profiles}
+
+    for name in dbs["readonly"].scripts.names():
+        line = f"{name:<30}"
+
+        derived = "circuit-records" if name.startswith(("circuit-", "circuits-")) else "search" if name == "search" else None
+
+        if derived and not dbs["readonly"].is_derived_fresh(derived):
+            print(f"{line} skipped, run db --optimize first")
+            continue
+
+        for p, db in dbs.items():
+            cold = cold_call(p, args.db, name, params[name])
+            warm = per_call(lambda: db.run_script(name, params[name]), args.calls)
+            totals[p][0] += cold
+            totals[p][1] += warm
+            line += f" {cold:>14.1f}us {warm:>14.1f}us"
+
+        print(line)
+
+    line = f"{'total':<30}"
+    for cold, warm in totals.values():
+        line += f" {cold:>14.1f}us {warm:>14.1f}us"
+    print(line)
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Timing of every sql/ script for each F1DB connection profile")
+    p.add_argument("--db",    type=str,             help="Database file, defaults to data/f1db.db")
+    p.add_argument("--calls", type=int, default=20, help="Warm calls per script")
+
+    main(p.parse_args())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import os, sys, json, sqlite3, argparse, platform, subprocess, tempfile
+
+from contextlib import redirect_stdout
+from statistics import mean, median
+from time import perf_counter
+
+from lib.tables import Table
+from lib.classes import F1DB, GP, DB, Driver, Season, Circuit, Records, H2H
+from bench.common import ROOT_DIR, sample_params
+from bench.synth import generate
+
+def cli_paths(db: F1DB) -> dict[str, callable]:
+    params = sample_params(db)
+    table = Table("left", False, False)
+
+    circuit_id = params["best-lap"]["id"]
+    year = params["championship"]["first"]
+    gp_params = params["gp-race"]
+    driver_params = params["driver-races"]
+
+    circuit = Circuit(circuit_id, 15, False, db, table)
+    season = Season(year, False, db, table)
+    driver = Driver(driver_params["id"], driver_params["year"], db, table)
+    gp = GP(gp_params["id"], gp_params["year"], db, table)
+    search = DB(db, table)
+    records = Records(15, db, table)
+    h2h = H2H(None, None, db, table)
+
+    return {
+        "circuit.info": circuit.info,
+        "circuit.best-lap": lambda: circuit.record("best-lap"),
+        "circuit.best-qualifying": lambda: circuit.record("best-qualifying"),
+        "circuit.most-wins": lambda: circuit.record("most-wins"),
+        "circuit.most-podiums": lambda: circuit.record("most-podiums"),
+        "circuit.all": lambda: circuit.record_all("best-lap"),
+        "season.drivers": lambda: season.championship(False),
+        "season.constructors": lambda: season.championship(True),
+        "season.leaderboard": season.leaderboard,
+        "season.all": lambda: season.championships(0, 9999),
+        "driver.races": driver.races,
+        "driver.pits": driver.pits,
+        "driver.overview": driver.overview,
+        "driver.career": lambda: driver.overview_range(0, 9999, True),
+        "driver.qualifying": driver.qualifying,
+        "driver.sprints": driver.sprints,
+        "gp.race": gp.race,
+        "gp.sprint": gp.sprint,
+        "gp.race-qualifying": gp.race_qualifying,
+        "gp.sprint-qualifying": gp.sprint_qualifying,
+        "gp.weekend": lambda: gp_weekend(gp),
+        "driver.season": lambda: driver_season(driver),
+        "records.totals": lambda: records.totals("podium"),
+        "records.streaks": lambda: records.streaks("points"),
+        "h2h.season": lambda: h2h.pairs(year, year),
+        "h2h.all": lambda: h2h.pairs(0, 9999),
+        "db.search": lambda: search.search(gp_params["id"][:4], "grand_prix", "name"),
+        "db.find": lambda: search.find(gp_params["id"][:4]),
+    }
+
+def gp_weekend(gp: GP):
+    # Every gp report at once, as gp ID YEAR -r -s -rq -sq runs them
+    with gp.prefetch(["race", "sprint", "race-qualifying", "sprint-qualifying"]):
+        gp.race()
+        gp.sprint()
+        gp.race_qualifying()
+        gp.sprint_qualifying()
+
+def driver_season(driver: Driver):
+    # As driver ID YEAR -r -s -q -p -o
+    with driver.prefetch(["races", "pits", "season-overview", "qualifying", "sprints"]):
+        driver.races()
+        driver.pits()
+        driver.overview()
+        driver.qualifying()
+        driver.sprints()
+
+def measure(fn, repeat: int) -> dict[str, float]:
+    timings = []
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        fn()
+
+        for _ in range(repeat):
+            start = perf_counter()
+            fn()
+            timings.append((perf_counter() - start) * 1000)
+
+    return {
+        "min_ms": min(timings),
+        "median_ms": median(timings),
+        "mean_ms": mean(timings),
+    }
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: dict, baseline_file: str):
+    with open(baseline_file) as f:
+        baseline = json.load(f)["results"]
+
+    print(f"\n{'path':<26} {'baseline':>12} {'current':>12} {'change':>8}")
+
+    for path, current in results.items():
+        if path not in baseline:
+            continue
+
+        before = baseline[path]["median_ms"]
+        after = current["median_ms"]
+        print(f"{path:<26} {before:>10.3f}ms {after:>10.3f}ms {after / before - 1:>+7.1%}")
+
+def main(args: argparse.Namespace):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = args.db
+
+        if not db_file:
+            db_file = os.path.join(tmp, "f1db.db")
+            generate(db_file, args.seasons, args.drivers, args.races, seed=args.seed)
+
+            if not args.no_optimize:
+                F1DB(root_dir=ROOT_DIR, profile="readwrite", db_file=db_file).optimize()
+
+        db = F1DB(root_dir=ROOT_DIR, profile=args.profile, db_file=db_file)
+        results = {}
+
+        for path, fn in cli_paths(db).items():
+            if args.filter and args.filter not in path:
+                continue
+
+            results[path] = measure(fn, args.repeat)
+            print(f"{path:<26} {results[path]['median_ms']:>10.3f}ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "profile": args.profile,
+            "db": args.db or {
+                "seasons": args.seasons,
+                "drivers": args.drivers,
+                "races": args.races,
+                "seed": args.seed,
+                "optimized": not args.no_optimize,
+            },
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Time every cli path against a synthetic (or given) f1db")
+    p.add_argument("-o", "--output",  type=str, default="bench_results.json", help="Where to write json results")
+    p.add_argument("--compare",       type=str,                             help="Previous json results to compare with")
+    p.add_argument("--db",            type=str,                             help="Use an existing database instead of generating one")
+    p.add_argument("--profile",       default="readonly", choices=tuple(F1DB.PROFILES), help="Connection profile")
+    p.add_argument("--repeat",        type=int, default=20,                 help="Timed runs per path")
+    p.add_argument("--filter",        type=str,                             help="Only run paths containing this string")
+    p.add_argument("--seasons",       type=int, default=10,                 help="Synthetic db seasons")
+    p.add_argument("--drivers",       type=int, default=20,                 help="Synthetic db drivers per season")
+    p.add_argument("--races",         type=int, default=22,                 help="Synthetic db races per season")
+    p.add_argument("--seed",          type=int, default=1,                  help="Synthetic db random seed")
+    p.add_argument("--no-optimize",   action="store_true",                  help="Do not build indexes on the synthetic db")
+
+    main(p.parse_args())
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+import os, argparse
+
+from lib.classes import F1DB
+from bench.common import ROOT_DIR, per_call, sample_params
+
+def read_script(db: F1DB, name: str) -> str:
+    # The way F1DB.run_script used to get its sql: re-read sql/<name>.sql per call
+    with open(os.path.join(db.sql_scripts_dir, name + ".sql")) as s:
+        return s.read()
+
+def run_script_from_disk(db: F1DB, name: str, params: dict) -> list:
+    db.cur.execute(read_script(db, name), params)
+    return db.cur.fetchall()
+
+def main(args: argparse.Namespace):
+    db = F1DB(root_dir=ROOT_DIR, db_file=args.db)
+    params = sample_params(db)
+
+    print(f"{'script':<14} {'stage':<8} {'from disk':>12} {'registry':>12} {'speedup':>8}")
+
+    for name in ("gp-race", "driver-races"):
+        stages = {
+            "lookup": (
+                lambda: read_script(db, name),
+                lambda: db.scripts[name]
+            ),
+            "call": (
+                lambda: run_script_from_disk(db, name, params[name]),
+                lambda: db.run_script(name, params[name])
+            ),
+        }
+
+        for stage, (old, new) in stages.items():
+            before = per_call(old, args.calls)
+            after = per_call(new, args.calls)
+            print(f"{name:<14} {stage:<8} {before:>10.2f}us {after:>10.2f}us {before / after:>7.2f}x")
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Per call overhead of F1DB.run_script, reading scripts from disk vs the registry")
+    p.add_argument("--db",    type=str,               help="Database file, defaults to data/f1db.db")
+    p.add_argument("--calls", type=int, default=2000, help="Calls per measurement")
+
+    main(p.parse_args())
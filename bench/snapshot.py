@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+import os, sys, argparse, tempfile, subprocess
+
+from time import perf_counter
+
+from lib import stats
+from lib.classes import F1DB
+from lib.records import RECORD_KINDS, RECORD_COLUMNS, snapshot_totals
+from lib.snapshot import Snapshot, build_snapshot, db_fingerprint
+from bench.common import ROOT_DIR, per_call
+
+def import_cost(module: str, runs: int) -> float:
+    # What a single cli call pays to load module: fresh interpreters with and without it
+    def start(code: str) -> float:
+        began = perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        return perf_counter() - began
+
+    bare = min(start("pass") for _ in range(runs))
+    loaded = min(start(f"import {module}") for _ in range(runs))
+    return max(loaded - bare, 0) * 1e6
+
+def main(args: argparse.Namespace):
+    db = F1DB(root_dir=ROOT_DIR, profile="readonly", db_file=args.db)
+    rows = db.execute("SELECT COUNT(*) FROM race_data", [])[0][0]
+    names = dict(db.execute("SELECT id, name FROM driver", []))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file = os.path.join(tmp, "f1db.snapshot")
+
+        build = per_call(lambda: build_snapshot(db.con, file, db_fingerprint(db.db_file)), 1)
+        print(f"{rows} race_data rows, snapshot of {os.path.getsize(file) / 2**20:.2f} MiB built in {build / 1000:.1f}ms\n")
+
+        # Loading: the columns a totals scan reads, as python values from sql
+        # and as views over the mapped snapshot
+        columns = ("type", "driver_id") + RECORD_COLUMNS
+        sql = f"SELECT {", ".join(columns)} FROM race_data"
+        sql_load = per_call(lambda: db.con.execute(sql).fetchall(), args.calls)
+
+        def snapshot_load():
+            snapshot = Snapshot(file)
+            return [snapshot.column("race_data", name) for name in columns]
+
+        mapped = per_call(snapshot_load, args.calls)
+
+        print(f"{'load':<22} {'per call':>12} {'speedup':>8}")
+        print(f"{'sql rows':<22} {sql_load / 1000:>10.2f}ms {1:>7.2f}x")
+        print(f"{'snapshot mmap':<22} {mapped / 1000:>10.2f}ms {sql_load / mapped:>7.2f}x")
+
+        # Scans: every totals kind, throughput in race_data rows per second.
+        # A single command also pays for importing numpy, a batch only once
+        imports = {backend: 0 for backend in stats.BACKENDS}
+
+        if "numpy" in imports:
+            imports["numpy"] = import_cost("numpy", args.import_runs)
+            print(f"\nimport numpy {imports["numpy"] / 1000:.1f}ms")
+
+        snapshot = Snapshot(file)
+        print(f"\n{'scan':<22} {'per call':>12} {'Mrows/s':>8} {'speedup':>8} {'+ import':>12} {'speedup':>8}")
+
+        for kind in RECORD_KINDS:
+            params = {"kind": kind, "limit": -1}
+            before = per_call(lambda: db.con.execute(db.scripts["records-totals"], params).fetchall(), args.calls)
+            print(f"{f"sql {kind}":<22} {before / 1000:>10.2f}ms {rows / before:>8.2f} {1:>7.2f}x {before / 1000:>10.2f}ms {1:>7.2f}x")
+
+            for backend in stats.BACKENDS:
+                after = per_call(lambda: snapshot_totals(snapshot, kind, names, -1, backend), args.calls)
+                once = after + imports[backend]
+                print(f"{f"{backend} {kind}":<22} {after / 1000:>10.2f}ms {rows / after:>8.2f} {before / after:>7.2f}x {once / 1000:>10.2f}ms {before / once:>7.2f}x")
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Columnar race_data snapshot against the equivalent sql: load time and scan throughput")
+    p.add_argument("--db",          type=str,             help="Database file, defaults to the current release")
+    p.add_argument("--calls",       type=int, default=20, help="Calls per measurement")
+    p.add_argument("--import-runs", type=int, default=5,  help="Fresh interpreters timing the numpy import")
+
+    main(p.parse_args())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+import os, sys, argparse, subprocess
+
+from statistics import median
+from time import perf_counter
+
+from bench.common import ROOT_DIR
+
+CLI = os.path.join(ROOT_DIR, "f1_stats.py")
+
+# Invocations that never need the db: they must not pay for what queries need
+NO_QUERY_CASES = {
+    "help": ["--help"],
+    "command help": ["season", "--help"],
+    "bad arguments": ["gp", "monaco"],
+}
+
+QUERY_CASES = {
+    "gp race": ["gp", "{gp}", "{year}", "-r"],
+    "driver overview": ["driver", "{driver}", "{year}", "-o"],
+}
+
+# Modules that only commands running queries should load
+HEAVY_MODULES = (
+    "lib.classes", "lib.overview", "lib.stats", "lib.cache", "lib.emoji",
+    "sqlite3", "statistics", "subprocess", "hashlib", "numpy",
+    "concurrent.futures", "urllib.request",
+)
+
+# What any cli pays before its own code: the interpreter and argparse
+BASELINE = ["-c", "import argparse"]
+
+def import_times(argv: list[str]) -> dict[str, tuple[int, bool]]:
+    # Cumulative import time in microseconds per module and whether it was
+    # imported at the top level, from -X importtime
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + argv,
+        capture_output=True, text=True, cwd=ROOT_DIR
+    )
+
+    times = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, module = line.split('|')
+        # Nested imports are indented under the module importing them
+        times[module.strip()] = (int(cumulative), not module.startswith("  "))
+
+    return times
+
+def import_total(times: dict[str, tuple[int, bool]]) -> int:
+    # Top level modules only, their cumulative times don't overlap
+    return sum(t for t, top_level in times.values() if top_level)
+
+def median_imports(argv: list[str], runs: int) -> tuple[float, dict[str, tuple[int, bool]]]:
+    # One run is at the mercy of the machine, the median total over runs
+    # isn't. The modules come from the run closest to it
+    measured = sorted((import_times(argv) for _ in range(runs)), key=import_total)
+    total = median(import_total(times) for times in measured)
+    return total, measured[len(measured) // 2]
+
+def wall_time(argv: list[str], runs: int) -> float:
+    timings = []
+
+    for _ in range(runs):
+        start = perf_counter()
+        subprocess.run(
+            [sys.executable, CLI] + argv,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ROOT_DIR
+        )
+        timings.append((perf_counter() - start) * 1000)
+
+    return median(timings)
+
+def query_params() -> dict[str, str]:
+    from lib.classes import F1DB
+    from bench.common import sample_params
+
+    params = sample_params(F1DB(root_dir=ROOT_DIR, profile="readonly"))
+    return {
+        "gp": params["gp-race"]["id"],
+        "driver": params["driver-races"]["id"],
+        "year": str(params["gp-race"]["year"]),
+    }
+
+def main(args: argparse.Namespace) -> int:
+    cases = dict(NO_QUERY_CASES)
+
+    if not args.no_db:
+        params = query_params()
+        cases.update({
+            name: [arg.format(**params) for arg in argv] for name, argv in QUERY_CASES.items()
+        })
+
+    failed = []
+    baseline, _ = median_imports(BASELINE, args.runs)
+    budget = baseline * args.budget
+    print(f"import argparse {baseline / 1000:.1f}ms, budget {args.budget}x = {budget / 1000:.1f}ms\n")
+    print(f"{'case':<18} {'wall':>10} {'imports':>10}  slowest imports")
+
+    for name, argv in cases.items():
+        total, times = median_imports([CLI] + argv, args.runs)
+        slowest = sorted(
+            ((t, module) for module, (t, _) in times.items()), reverse=True
+        )[:args.top]
+
+        wall = wall_time(argv, args.runs)
+        summary = ", ".join(f"{module} {t / 1000:.1f}" for t, module in slowest)
+        print(f"{name:<18} {wall:>8.1f}ms {total / 1000:>8.1f}ms  {summary}")
+
+        if name in NO_QUERY_CASES:
+            heavy = [m for m in HEAVY_MODULES if m in times]
+
+            if heavy:
+                failed.append(f"{name}: imports {', '.join(heavy)}")
+
+            if total > budget:
+                failed.append(
+                    f"{name}: imports take {total / 1000:.1f}ms, "
+                    f"{total / baseline:.2f}x import argparse, budget is {args.budget}x"
+                )
+
+    for failure in failed:
+        print(f"FAIL {failure}", file=sys.stderr)
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Cli startup cost per invocation, fails when over the import budget")
+    p.add_argument("--budget",    type=float, default=2,  help="Import time budget for invocations that run no query, as a multiple of a bare import argparse")
+    p.add_argument("--runs",      type=int,   default=10, help="Runs per measurement, the median is kept")
+    p.add_argument("--top",       type=int,   default=3,  help="Slowest imports to show per case")
+    p.add_argument("--no-db",     action="store_true",    help="Skip the cases that query data/f1db.db")
+
+    sys.exit(main(p.parse_args()))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+import argparse
+
+from statistics import mean, stdev, median, median_low, median_high, mode
+
+from lib import stats
+from lib.classes import F1DB
+from lib.helpers import ifnone
+from lib.overview import OVERVIEW_COLUMNS, NUMERIC_COLUMNS, overview_stats_by
+from bench.common import ROOT_DIR, per_call
+
+def longest(values: list, condition) -> int:
+    longest = current = 0
+
+    for value in values:
+        current = current + 1 if condition(value) else 0
+        longest = max(longest, current)
+
+    return longest
+
+def per_row_overview(rows: list[tuple]) -> dict:
+    # The way Driver.overview used to aggregate: one pass of dict updates per
+    # row, then the statistics module one metric at a time
+    total = dict.fromkeys(
+        ("gains", "losses", "q1_q2_elim", "q3", "races", "finished", "wins",
+         "podiums", "score_finishes", "fastest_laps", "poles", "penalties"), 0
+    )
+    grid, finishes, results, gains, pits, pts_made, pit_times = [], [], [], [], [], [], []
+    season_pts, season_team_pts, nfs = {}, {}, {}
+
+    for year, gp, is_fastest, is_pole, q3, stops, start, finish, finish_text, reason_retired, gained,\
+        gap, laps, penalty, pts_after_race, made, pts_pos_after, team_pts_after_race, times in rows:
+
+        if not start and finish and gained is not None:
+            start = finish + gained
+
+        if q3: total["q3"] += 1
+        else: total["q1_q2_elim"] += 1
+
+        if start: grid.append(start)
+        if gained: gains.append(gained)
+        if penalty: total["penalties"] += 1
+        if stops: pits.append(stops)
+        results.append(finish)
+
+        if finish:
+            finishes.append(finish)
+            total["finished"] += 1
+            total["gains"] += bool(start and finish < start)
+            total["losses"] += bool(start and finish > start)
+            total["wins"] += finish == 1
+            total["podiums"] += finish <= 3
+            total["score_finishes"] += finish <= 10
+        else:
+            nf = nfs.setdefault(finish_text, [0, [], []])
+            nf[0] += 1
+            nf[1].append(gp)
+            nf[2].append(reason_retired)
+
+        if times:
+            pit_times.extend(int(t) / 1000 for t in times.split(','))
+
+        total["races"] += 1
+        total["poles"] += ifnone(is_pole, 0)
+        total["fastest_laps"] += ifnone(is_fastest, 0)
+        season_pts[year] = ifnone(pts_after_race, 0)
+        season_team_pts[year] = ifnone(team_pts_after_race, 0)
+        pts_made.append(ifnone(made, 0))
+
+    pit_times.sort()
+    n = len(pit_times)
+    iqr = median_high(pit_times[(n+1)//2:] or pit_times) - median_low(pit_times[:n//2] or pit_times) if n else 0
+
+    return {
+        "total": total,
+        "nfs": nfs,
+        "pts": sum(season_pts.values()),
+        "team_pts": sum(season_team_pts.values()),
+        "avg_finish_position": mean(finishes) if finishes else 0,
+        "avg_grid_position": mean(grid) if grid else 0,
+        "avg_gained_positions": mean(gains) if gains else 0,
+        "avg_race_pit_stops": mean(pits) if pits else 0,
+        "median_grid_position": median(grid) if grid else 0,
+        "mode_grid_position": mode(grid) if grid else None,
+        "median_finish_position": median(finishes) if finishes else 0,
+        "mode_finish_position": mode(finishes) if finishes else None,
+        "finish_pos_stdev": stdev(finishes) if len(finishes) > 1 else 0,
+        "pts_volatility": stdev(pts_made) if len(pts_made) > 1 else 0,
+        "pit_avg": mean(pit_times) if pit_times else 0,
+        "pit_iqr": iqr,
+        "pit_problematic": sum(1 for t in pit_times if t > median(pit_times) + 3.0 * iqr) if n else 0,
+        "longest_win_streak": longest(results, lambda x: x == 1),
+        "longest_pod_streak": longest(results, lambda x: x and x <= 3),
+        "longest_pts_streak": longest(results, lambda x: x and x <= 10),
+    }
+
+def grid_rows(db: F1DB, first: int, last: int) -> list[tuple]:
+    # Overview rows of every driver of the seasons, driver id as last column
+    drivers = db.execute(
+        """
+        SELECT DISTINCT rd.driver_id
+        FROM race_data rd
+        JOIN race r ON r.id = rd.race_id
+        WHERE rd.type = 'RACE_RESULT' AND r.year BETWEEN ? AND ?
+        ORDER BY rd.driver_id
+        """, [first, last]
+    )
+
+    rows = []
+
+    for driver, in drivers:
+        params = {"id": driver, "first": first, "last": last}
+        rows.extend(row + (driver,) for row in db.run_script("driver-season-overview", params))
+
+    return rows
+
+def main(args: argparse.Namespace):
+    db = F1DB(root_dir=ROOT_DIR, profile="readonly", db_file=args.db)
+
+    if args.years:
+        first, _, last = args.years.partition('-')
+        first, last = int(first), int(last or first)
+    else:
+        first, last = db.execute("SELECT MAX(year), MAX(year) FROM race", [])[0]
+
+    rows = grid_rows(db, first, last)
+    names = OVERVIEW_COLUMNS + ("driver",)
+    by_driver = {}
+
+    for row in rows:
+        by_driver.setdefault(row[-1], []).append(row[:-1])
+
+    print(f"{len(by_driver)} drivers, {len(rows)} rows, seasons {first}-{last}\n")
+    print(f"{'kernel':<10} {'per grid':>12} {'speedup':>8}")
+
+    before = per_call(lambda: [per_row_overview(r) for r in by_driver.values()], args.calls)
+    print(f"{'per row':<10} {before / 1000:>10.2f}ms {1:>7.2f}x")
+
+    for backend in stats.BACKENDS:
+        def kernel():
+            cols = stats.columns(rows, names, NUMERIC_COLUMNS, backend)
+            return overview_stats_by(cols, "driver")
+
+        after = per_call(kernel, args.calls)
+        print(f"{backend:<10} {after / 1000:>10.2f}ms {before / after:>7.2f}x")
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Driver overview statistics for a full grid, per row loop vs the column kernel")
+    p.add_argument("--db",    type=str,              help="Database file, defaults to data/f1db.db")
+    p.add_argument("--years", type=str,              help="Seasons, e.g: 2020 or 2010-2020, defaults to the last one")
+    p.add_argument("--calls", type=int, default=20,  help="Calls per measurement")
+
+    main(p.parse_args())
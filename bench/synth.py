@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+import os, sqlite3, random, argparse
+
+from lib.emoji import gp_flags
+
+SCHEMA = """
+CREATE TABLE circuit (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    previous_names TEXT,
+    type TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    place_name TEXT NOT NULL,
+    country_id TEXT NOT NULL,
+    latitude DECIMAL(10,6) NOT NULL,
+    longitude DECIMAL(10,6) NOT NULL,
+    length DECIMAL(6,3) NOT NULL,
+    turns INTEGER NOT NULL,
+    total_races_held INTEGER NOT NULL
+);
+
+CREATE TABLE grand_prix (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    short_name TEXT NOT NULL,
+    abbreviation TEXT NOT NULL,
+    country_id TEXT,
+    total_races_held INTEGER NOT NULL
+);
+
+CREATE TABLE driver (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    abbreviation TEXT NOT NULL,
+    permanent_number TEXT,
+    gender TEXT NOT NULL,
+    nationality_country_id TEXT NOT NULL
+);
+
+CREATE TABLE constructor (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    country_id TEXT NOT NULL
+);
+
+CREATE TABLE race (
+    id INTEGER PRIMARY KEY,
+    year INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    date DATE NOT NULL,
+    grand_prix_id TEXT NOT NULL,
+    official_name TEXT NOT NULL,
+    circuit_id TEXT NOT NULL,
+    laps INTEGER NOT NULL
+);
+
+CREATE TABLE race_data (
+    race_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    position_display_order INTEGER NOT NULL,
+    position_number INTEGER,
+    position_text TEXT NOT NULL,
+    driver_number TEXT NOT NULL,
+    driver_id TEXT NOT NULL,
+    constructor_id TEXT NOT NULL,
+    engine_manufacturer_id TEXT NOT NULL,
+    tyre_manufacturer_id TEXT NOT NULL,
+    qualifying_time TEXT,
+    qualifying_time_millis INTEGER,
+    qualifying_q1 TEXT,
+    qualifying_q1_millis INTEGER,
+    qualifying_q2 TEXT,
+    qualifying_q2_millis INTEGER,
+    qualifying_q3 TEXT,
+    qualifying_q3_millis INTEGER,
+    qualifying_gap TEXT,
+    qualifying_gap_millis INTEGER,
+    qualifying_interval TEXT,
+    qualifying_interval_millis INTEGER,
+    qualifying_laps INTEGER,
+    race_laps INTEGER,
+    race_time TEXT,
+    race_time_millis INTEGER,
+    race_time_penalty TEXT,
+    race_time_penalty_millis INTEGER,
+    race_gap TEXT,
+    race_gap_millis INTEGER,
+    race_interval TEXT,
+    race_interval_millis INTEGER,
+    race_reason_retired TEXT,
+    race_points DECIMAL(8,2),
+    race_pole_position BOOLEAN,
+    race_grid_position_number INTEGER,
+    race_grid_position_text TEXT,
+    race_positions_gained INTEGER,
+    race_pit_stops INTEGER,
+    race_fastest_lap BOOLEAN,
+    fastest_lap_lap INTEGER,
+    fastest_lap_time TEXT,
+    fastest_lap_time_millis INTEGER,
+    fastest_lap_gap TEXT,
+    fastest_lap_gap_millis INTEGER,
+    pit_stop_stop INTEGER,
+    pit_stop_lap INTEGER,
+    pit_stop_time TEXT,
+    pit_stop_time_millis INTEGER,
+    PRIMARY KEY (race_id, type, position_display_order)
+);
+
+CREATE TABLE race_driver_standing (
+    race_id INTEGER NOT NULL,
+    position_display_order INTEGER NOT NULL,
+    position_number INTEGER,
+    position_text TEXT NOT NULL,
+    driver_id TEXT NOT NULL,
+    points DECIMAL(8,2) NOT NULL,
+    positions_gained INTEGER,
+    PRIMARY KEY (race_id, position_display_order)
+);
+
+CREATE TABLE race_constructor_standing (
+    race_id INTEGER NOT NULL,
+    position_display_order INTEGER NOT NULL,
+    position_number INTEGER,
+    position_text TEXT NOT NULL,
+    constructor_id TEXT NOT NULL,
+    points DECIMAL(8,2) NOT NULL,
+    positions_gained INTEGER,
+    PRIMARY KEY (race_id, position_display_order)
+);
+
+CREATE TABLE season_driver_standing (
+    year INTEGER NOT NULL,
+    position_display_order INTEGER NOT NULL,
+    position_number INTEGER,
+    position_text TEXT NOT NULL,
+    driver_id TEXT NOT NULL,
+    points DECIMAL(8,2) NOT NULL,
+    PRIMARY KEY (year, position_display_order)
+);
+
+CREATE TABLE season_constructor_standing (
+    year INTEGER NOT NULL,
+    position_display_order INTEGER NOT NULL,
+    position_number INTEGER,
+    position_text TEXT NOT NULL,
+    constructor_id TEXT NOT NULL,
+    points DECIMAL(8,2) NOT NULL,
+    PRIMARY KEY (year, position_display_order)
+);
+"""
+
+POINTS = (25, 18, 15, 12, 10, 8, 6, 4, 2, 1)
+RETIREMENTS = ("Collision", "Engine", "Gearbox", "Hydraulics", "Spun off", "Brakes")
+TYRES = ("pirelli", "bridgestone", "michelin")
+ENGINES = ("mercedes", "ferrari", "honda-rbpt", "renault")
+
+RACE_DATA_COLUMNS = (
+    "race_id", "type", "position_display_order", "position_number", "position_text",
+    "driver_number", "driver_id", "constructor_id", "engine_manufacturer_id", "tyre_manufacturer_id",
+    "qualifying_time", "qualifying_time_millis", "qualifying_q1", "qualifying_q1_millis",
+    "qualifying_q2", "qualifying_q2_millis", "qualifying_q3", "qualifying_q3_millis",
+    "qualifying_gap", "qualifying_gap_millis", "qualifying_interval", "qualifying_interval_millis",
+    "qualifying_laps", "race_laps", "race_time", "race_time_millis", "race_time_penalty",
+    "race_time_penalty_millis", "race_gap", "race_gap_millis", "race_interval", "race_interval_millis",
+    "race_reason_retired", "race_points", "race_pole_position", "race_grid_position_number",
+    "race_grid_position_text", "race_positions_gained", "race_pit_stops", "race_fastest_lap",
+    "fastest_lap_lap", "fastest_lap_time", "fastest_lap_time_millis", "fastest_lap_gap",
+    "fastest_lap_gap_millis", "pit_stop_stop", "pit_stop_lap", "pit_stop_time", "pit_stop_time_millis",
+)
+
+def lap_time(millis: int) -> str:
+    minutes, rest = divmod(millis, 60_000)
+    return f"{minutes}:{rest // 1000:02d}.{rest % 1000:03d}"
+
+def gap_time(millis: int) -> str:
+    return f"+{millis // 1000}.{millis % 1000:03d}"
+
+def abbreviations(ids: list[str]) -> dict[str, str]:
+    # Three letters, unique: the first three when free, else the first
+    # letter and two later ones (Australia AUS, Austria AUT). Pivots like
+    # the championship table are keyed by them
+    taken = set()
+    result = {}
+
+    for id in ids:
+        letters = id.replace('-', '').upper()
+        candidates = [letters[:3]] + [
+            letters[0] + letters[i] + letters[j]
+            for i in range(1, len(letters)) for j in range(i + 1, len(letters))
+        ]
+        result[id] = next(c for c in candidates if c not in taken)
+        taken.add(result[id])
+
+    return result
+
+def engine(team: str) -> str:
+    return ENGINES[int(team[-2:]) % len(ENGINES)]
+
+def race_data_row(**values) -> tuple:
+    return tuple(values.get(c) for c in RACE_DATA_COLUMNS)
+
+def insert(cur: sqlite3.Cursor, table: str, rows: list[tuple]):
+    if not rows:
+        return
+
+    marks = ','.join('?' * len(rows[0]))
+    cur.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+
+def qualifying(race_id: int, order: list[tuple], base: int, rng: random.Random, type: str) -> list[tuple]:
+    rows = []
+    pole = None
+    prev = None
+    q1 = base
+
+    for pos, (driver, number, team) in enumerate(order, start=1):
+        q1 += rng.randint(40, 160)
+        q2 = q1 - rng.randint(0, 30) if pos <= 15 else None
+        q3 = q2 - rng.randint(0, 30) if pos <= 10 else None
+        best = min(t for t in (q1, q2, q3) if t)
+
+        if pole is None:
+            pole = best
+            prev = best
+
+        rows.append(race_data_row(
+            race_id=race_id, type=type, position_display_order=pos,
+            position_number=pos, position_text=str(pos), driver_number=number,
+            driver_id=driver, constructor_id=team,
+            engine_manufacturer_id=engine(team),
+            tyre_manufacturer_id=TYRES[0],
+            qualifying_q1=lap_time(q1), qualifying_q1_millis=q1,
+            qualifying_q2=q2 and lap_time(q2), qualifying_q2_millis=q2,
+            qualifying_q3=q3 and lap_time(q3), qualifying_q3_millis=q3,
+            qualifying_gap=gap_time(best - pole) if pos > 1 else None,
+            qualifying_gap_millis=best - pole if pos > 1 else None,
+            qualifying_interval=gap_time(max(best - prev, 0)) if pos > 1 else None,
+            qualifying_interval_millis=max(best - prev, 0) if pos > 1 else None,
+            qualifying_laps=rng.randint(6, 24),
+        ))
+        prev = best
+
+    return rows
+
+def race(
+    race_id: int, grid: list[tuple], laps: int, base: int,
+    rng: random.Random, type: str, points: tuple
+) -> tuple[list[tuple], list[tuple], list[tuple], dict]:
+    finishers = []
+    retired = []
+
+    for start, entry in enumerate(grid, start=1):
+        if rng.random() < 0.12:
+            retired.append((start, entry, rng.choice(("DNF", "DNF", "DNF", "DNS", "DSQ", "NC"))))
+        else:
+            finishers.append((start + rng.gauss(0, 3), start, entry))
+
+    finishers.sort()
+    results = []
+    fastest = []
+    pits = []
+    scored = {}
+    winner_time = base * laps
+
+    fastest_laps = {
+        entry[0]: base + rng.randint(0, 2500) for _, _, entry in finishers
+    }
+    fastest_driver = min(fastest_laps, key=fastest_laps.get) if fastest_laps else None
+    fastest_best = fastest_laps.get(fastest_driver)
+
+    for pos, (_, start, (driver, number, team)) in enumerate(finishers, start=1):
+        gap = 0 if pos == 1 else (pos - 1) * rng.randint(800, 6000)
+        pts = points[pos - 1] if pos <= len(points) else None
+        penalty = rng.choice((5000, 10000)) if rng.random() < 0.03 else None
+        stops = rng.randint(0, 3) if type == "RACE_RESULT" else 0
+        scored[driver] = pts or 0
+
+        results.append(race_data_row(
+            race_id=race_id, type=type, position_display_order=pos,
+            position_number=pos, position_text=str(pos), driver_number=number,
+            driver_id=driver, constructor_id=team,
+            engine_manufacturer_id=engine(team),
+            tyre_manufacturer_id=TYRES[0], race_laps=laps,
+            race_time=lap_time(winner_time + gap), race_time_millis=winner_time + gap,
+            race_time_penalty=penalty and gap_time(penalty)[1:], race_time_penalty_millis=penalty,
+            race_gap=gap_time(gap) if pos > 1 else None, race_gap_millis=gap if pos > 1 else None,
+            race_interval=gap_time(gap) if pos > 1 else None, race_interval_millis=gap if pos > 1 else None,
+            race_points=pts, race_pole_position=int(start == 1),
+            race_grid_position_number=start, race_grid_position_text=str(start),
+            race_positions_gained=start - pos, race_pit_stops=stops,
+            race_fastest_lap=int(driver == fastest_driver),
+        ))
+
+        if type != "RACE_RESULT":
+            continue
+
+        flap = fastest_laps[driver]
+        fastest.append((flap, race_data_row(
+            race_id=race_id, type="FASTEST_LAP", driver_number=number,
+            driver_id=driver, constructor_id=team,
+            engine_manufacturer_id=engine(team),
+            tyre_manufacturer_id=TYRES[0], fastest_lap_lap=rng.randint(2, laps),
+            fastest_lap_time=lap_time(flap), fastest_lap_time_millis=flap,
+            fastest_lap_gap=gap_time(flap - fastest_best) if flap != fastest_best else None,
+            fastest_lap_gap_millis=flap - fastest_best if flap != fastest_best else None,
+        )))
+
+        for stop in range(1, stops + 1):
+            millis = rng.randint(19000, 32000)
+            pits.append(race_data_row(
+                race_id=race_id, type="PIT_STOP", driver_number=number,
+                driver_id=driver, constructor_id=team,
+                engine_manufacturer_id=engine(team),
+                tyre_manufacturer_id=TYRES[0], pit_stop_stop=stop,
+                pit_stop_lap=stop * laps // (stops + 1), pit_stop_time=gap_time(millis)[1:],
+                pit_stop_time_millis=millis,
+            ))
+
+    for offset, (start, (driver, number, team), text) in enumerate(retired, start=len(finishers) + 1):
+        results.append(race_data_row(
+            race_id=race_id, type=type, position_display_order=offset,
+            position_number=None, position_text=text, driver_number=number,
+            driver_id=driver, constructor_id=team,
+            engine_manufacturer_id=engine(team),
+            tyre_manufacturer_id=TYRES[0], race_laps=rng.randint(0, laps - 1),
+            race_reason_retired=rng.choice(RETIREMENTS) if text == "DNF" else None,
+            race_pole_position=int(start == 1), race_grid_position_number=start,
+            race_grid_position_text=str(start), race_fastest_lap=0,
+        ))
+
+    fastest.sort(key=lambda f: f[0])
+    fastest = [
+        row[:2] + (pos, pos, str(pos)) + row[5:] for pos, (_, row) in enumerate(fastest, start=1)
+    ]
+
+    for i, row in enumerate(pits, start=1):
+        pits[i - 1] = row[:2] + (i, i, str(i)) + row[5:]
+
+    return results, fastest, pits, scored
+
+def standings(points: dict, previous: dict | None = None) -> list[tuple]:
+    ordered = sorted(points.items(), key=lambda kv: (-kv[1], kv[0]))
+    rows = []
+
+    for pos, (key, pts) in enumerate(ordered, start=1):
+        gained = previous.get(key, pos) - pos if previous is not None else None
+        rows.append((pos, pos, str(pos), key, pts, gained))
+
+    return rows
+
+def generate(
+    db_file: str,
+    seasons=10,
+    drivers=20,
+    races=22,
+    first_year=None,
+    seed=1
+):
+    if races > len(gp_flags):
+        raise ValueError(f"At most {len(gp_flags)} races per season are supported")
+
+    if os.path.exists(db_file):
+        os.remove(db_file)
+
+    rng = random.Random(seed)
+    con = sqlite3.connect(db_file)
+    cur = con.cursor()
+    cur.executescript(SCHEMA)
+
+    first_year = first_year or 2026 - seasons
+    grand_prix = sorted(gp_flags)[:races]
+    circuits = {gp: f"{gp}-circuit" for gp in grand_prix}
+    abbreviation = abbreviations(grand_prix)
+
+    insert(cur, "grand_prix", [
+        (gp, gp.replace('-', ' ').title(), f"{gp.replace('-', ' ').title()} Grand Prix",
+         gp.replace('-', ' ').title(), abbreviation[gp], gp[:2], seasons)
+        for gp in grand_prix
+    ])
+
+    insert(cur, "circuit", [
+        (circuit, f"{gp.title()} Circuit", f"{gp.title()} International Circuit", None,
+         "RACE", "CLOCKWISE", gp.title(), gp[:2], rng.uniform(-60, 60), rng.uniform(-180, 180),
+         round(rng.uniform(3.2, 7.0), 3), rng.randint(9, 23), seasons)
+        for gp, circuit in circuits.items()
+    ])
+
+    pool = [
+        (f"driver-{i:03d}", str(i), f"Driver{i:03d}", f"D{i:02d}") for i in range(1, drivers * 2 + 1)
+    ]
+
+    insert(cur, "driver", [
+        (id, f"{first} Racer", first, "Racer", f"{first} Racer", abbr, number, "MALE", "it")
+        for id, number, first, abbr in pool
+    ])
+
+    teams = [f"team-{i:02d}" for i in range(1, drivers // 2 + 1)]
+
+    insert(cur, "constructor", [
+        (team, f"Team {team[-2:]}", f"Team {team[-2:]} Racing", "gb") for team in teams
+    ])
+
+    race_id = 0
+    lineup = pool[:drivers]
+
+    for year in range(first_year, first_year + seasons):
+        if year != first_year:
+            lineup = lineup[2:] + rng.sample([d for d in pool if d not in lineup], 2)
+
+        entries = [
+            (driver, number, teams[i // 2 % len(teams)])
+            for i, (driver, number, _, _) in enumerate(lineup)
+        ]
+
+        driver_pts = {e[0]: 0 for e in entries}
+        team_pts = {t: 0 for t in teams}
+        prev_driver = None
+        prev_team = None
+
+        for rnd, gp in enumerate(grand_prix, start=1):
+            race_id += 1
+            laps = rng.randint(44, 78)
+            base = rng.randint(68_000, 105_000)
+            date = f"{year}-{3 + rnd * 9 // races:02d}-{1 + rnd % 28:02d}"
+
+            cur.execute(
+                "INSERT INTO race VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (race_id, year, rnd, date, gp, f"{year} {gp.title()} Grand Prix", circuits[gp], laps)
+            )
+
+            rows = []
+
+            if rnd % 4 == 0:
+                order = sorted(entries, key=lambda _: rng.random())
+                rows += qualifying(race_id, order, base, rng, "SPRINT_QUALIFYING_RESULT")
+                sprint, _, _, scored = race(
+                    race_id, order, laps // 3, base, rng, "SPRINT_RACE_RESULT", (8, 7, 6, 5, 4, 3, 2, 1)
+                )
+                rows += sprint
+
+                for driver, pts in scored.items():
+                    driver_pts[driver] += pts
+
+            order = sorted(entries, key=lambda _: rng.random())
+            rows += qualifying(race_id, order, base, rng, "QUALIFYING_RESULT")
+            results, fastest, pits, scored = race(race_id, order, laps, base, rng, "RACE_RESULT", POINTS)
+            rows += results + fastest + pits
+            insert(cur, "race_data", rows)
+
+            team_of = {e[0]: e[2] for e in entries}
+
+            for driver, pts in scored.items():
+                driver_pts[driver] += pts
+                team_pts[team_of[driver]] += pts
+
+            ds = standings(driver_pts, prev_driver)
+            ts = standings(team_pts, prev_team)
+            prev_driver = {r[3]: r[0] for r in ds}
+            prev_team = {r[3]: r[0] for r in ts}
+
+            insert(cur, "race_driver_standing", [(race_id,) + r for r in ds])
+            insert(cur, "race_constructor_standing", [(race_id,) + r for r in ts])
+
+        insert(cur, "season_driver_standing", [(year,) + r[:5] for r in standings(driver_pts)])
+        insert(cur, "season_constructor_standing", [(year,) + r[:5] for r in standings(team_pts)])
+
+    con.commit()
+    con.close()
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Generate a synthetic f1db shaped sqlite database")
+    p.add_argument("file", metavar="FILE",  type=str,              help="Output database file")
+    p.add_argument("--seasons",             type=int, default=10,  help="Amount of seasons to generate")
+    p.add_argument("--drivers",             type=int, default=20,  help="Drivers per season")
+    p.add_argument("--races",               type=int, default=22,  help="Races per season")
+    p.add_argument("--first-year",          type=int,              help="First generated season, defaults to 2026 - seasons")
+    p.add_argument("--seed",                type=int, default=1,   help="Random seed")
+
+    args = p.parse_args()
+    generate(args.file, args.seasons, args.drivers, args.races, args.first_year, args.seed)
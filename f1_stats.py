@@ -1,92 +1,256 @@
 #!/usr/bin/env python3
-import os, argparse
-
-from lib.tables import Table
-from lib.classes import (
-    Streak, 
-    F1DB, 
-    GP,
-    DB,
-    Driver, 
-    Season,
-    Circuit
-)
-
-def main(args: argparse.Namespace):
+from __future__ import annotations
+
+import os, sys, argparse
+
+from functools import cache
+
+# Startup matters, the cli is called a lot: only argparse is loaded up front,
+# the rest is imported once a command actually runs. typing is slow to
+# import too, so TYPE_CHECKING is spelled out
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from lib.classes import F1DB
+    from lib.tables import Table
+
+def db_profile(args: argparse.Namespace) -> str:
+    if args.db_profile != "auto":
+        return args.db_profile
+
+    if args.command == "db" and (args.update or args.source or args.optimize):
+        return "readwrite"
+
+    return "readonly"
+
+def year_range(value: str) -> tuple[int, int]:
+    first, _, last = value.partition('-')
+
+    try:
+        first, last = int(first), int(last or first)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid year range: {value}")
+
+    if first > last:
+        raise argparse.ArgumentTypeError(f"invalid year range: {value}")
+
+    return first, last
+
+def run_command(argv: list[str], f1db: F1DB):
+    args = build_parser(requested_command(argv)).parse_args(argv)
+
+    if args.command == "batch":
+        return print("Batch commands can not be nested")
+
+    main(args, f1db)
+
+def batch(args: argparse.Namespace, f1db: F1DB):
+    from lib.batch import read_commands, run_batch
+
+    if args.file == '-':
+        commands = read_commands(sys.stdin)
+    else:
+        with open(args.file) as f:
+            commands = read_commands(f)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    outputs = run_batch(commands, run_command, f1db, args.workers)
+
+    for i, (command, output) in enumerate(zip(commands, outputs), start=1):
+        if args.output_dir:
+            with open(os.path.join(args.output_dir, f"{i:04d}.txt"), 'w') as f:
+                f.write(output)
+        else:
+            sys.stdout.write(f"==> {command} <==\n{output}")
+
+def main(args: argparse.Namespace, f1db: F1DB | None = None):
+    from lib.tables import Table
+    from lib.classes import F1DB
+
     table = Table(
         args.adjustment,
         args.double_headers,
-        args.no_delimiters
+        args.no_delimiters,
+        output_format=args.format
     )
 
-    f1db = F1DB(
-        root_dir=os.path.dirname(os.path.realpath(__file__))
-    ) 
+    if f1db is None:
+        f1db = F1DB(
+            root_dir=os.path.dirname(os.path.realpath(__file__)),
+            profile=db_profile(args),
+            cache=not args.no_cache
+        ) 
+
+    if not (args.profile or args.profile_trace):
+        # A batch being profiled still times the tables of its commands
+        table.profiler = f1db.profiler
+        run(args, f1db, table)
+        return table.close()
+
+    from lib.profiler import Profiler
+
+    # Batch commands share the db, whatever profiles the batch comes back after
+    outer = f1db.profiler
+    profiler = Profiler(args.command)
+    f1db.set_profiler(profiler)
+    table.profiler = profiler
+
+    try:
+        run(args, f1db, table)
+        table.close()
+    finally:
+        profiler.stop()
+        f1db.set_profiler(outer)
+        profiler.print_summary()
+
+        if args.profile_trace:
+            profiler.write_trace(args.profile_trace)
+
+def run(args: argparse.Namespace, f1db: F1DB, table: Table):
+    from lib.classes import GP, DB, Driver, Season, Circuit, Records, H2H
 
     match args.command:
         case "circuit":
-            circuit = Circuit(args.id, args.rows, args.reverse, f1db, table)
-
-            if args.info:
-                circuit.info()
-
-            if args.best_lap:
-                circuit.record("best-lap")
+            circuit = Circuit(args.id, args.rows, args.reverse, f1db, table, args.after)
+            records = [
+                record for record, wanted in (
+                    ("best-lap", args.best_lap),
+                    ("best-qualifying", args.best_qualifying),
+                    ("most-wins", args.most_wins),
+                    ("most-podiums", args.most_podiums),
+                ) if wanted
+            ]
+
+            if args.all and args.output_dir:
+                circuit.write_all(args.output_dir, args.info, records, args.workers)
+            elif args.all:
+                for record in records:
+                    circuit.record_all(record)
+            elif args.id is None:
+                table.note("A circuit ID or --all is required")
+            else:
+                if args.info:
+                    circuit.info()
+
+                for record in records:
+                    circuit.record(record)
+        
+        case "season":
+            if args.all:
+                first, last = 0, 9999
+            elif args.year:
+                first, last = args.year
+            else:
+                return table.note("A season YEAR, a range of seasons or --all is required")
 
-            if args.best_qualifying:
-                circuit.record("best-qualifying")
+            season = Season(first, args.flags, f1db, table)
 
-            if args.most_wins:
-                circuit.record("most-wins")
+            if args.leaderboard:
+                if first != last:
+                    return table.note("Leaderboard is computed for a single season")
 
-            if args.most_podiums:
-                circuit.record("most-podiums")
-        
-        case "season":
-            season = Season(args.year, args.flags, f1db, table)
-            season.championship(args.constructor)
+                season.leaderboard(args.sort)
+            elif first != last:
+                season.championships(first, last, args.constructor, args.workers)
+            else:
+                season.championship(args.constructor)
 
         case "driver":
             driver = Driver(args.id, args.year, f1db, table)
 
-            if args.races:
-                driver.races()
-            
-            if args.pit_stops:
-                driver.pits()
+            if args.years or args.career:
+                first, last = args.years or (0, 9999)
+                driver.overview_range(first, last, args.career)
+
+            if args.year is None:
+                if any((args.races, args.pit_stops, args.overview, args.qualifying, args.sprints)):
+                    table.note("A season YEAR is required for these statistics")
+                return
+
+            reports = {
+                "races": args.races,
+                "pits": args.pit_stops,
+                "season-overview": args.overview,
+                "qualifying": args.qualifying,
+                "sprints": args.sprints,
+            }
+
+            with driver.prefetch(r for r, wanted in reports.items() if wanted):
+                if args.races:
+                    driver.races()
+
+                if args.pit_stops:
+                    driver.pits()
 
-            if args.overview:
-                driver.overview()
+                if args.overview:
+                    driver.overview()
 
-            if args.qualifying:
-                driver.qualifying()
+                if args.qualifying:
+                    driver.qualifying()
 
-            if args.sprints:
-                driver.sprints()
+                if args.sprints:
+                    driver.sprints()
 
         case "gp":
             gp = GP(args.id, args.year, f1db, table)
 
-            if args.race:
-                gp.race()
+            reports = {
+                "race": args.race,
+                "sprint": args.sprint,
+                "race-qualifying": args.race_qualifying,
+                "sprint-qualifying": args.sprint_qualifying,
+            }
 
-            if args.sprint:
-                gp.sprint()
+            with gp.prefetch(r for r, wanted in reports.items() if wanted):
+                if args.race:
+                    gp.race()
 
-            if args.race_qualifying:
-                gp.race_qualifying()
+                if args.sprint:
+                    gp.sprint()
 
-            if args.sprint_qualifying:
-                gp.sprint_qualifying()
+                if args.race_qualifying:
+                    gp.race_qualifying()
+
+                if args.sprint_qualifying:
+                    gp.sprint_qualifying()
+
+        case "h2h":
+            if args.all:
+                first, last = 0, 9999
+            elif args.year:
+                first, last = args.year
+            else:
+                return table.note("A season YEAR, a range of seasons or --all is required")
+
+            H2H(args.driver, args.constructor, f1db, table).pairs(first, last, args.workers)
+
+        case "records":
+            records = Records(args.rows, f1db, table)
+
+            if args.record == "totals":
+                records.totals(args.kind)
+            else:
+                records.streaks(args.kind)
 
         case "db":
             db = DB(f1db, table)
 
             if args.sql:
-                db.execute_sql(args.sql)
+                db.execute_sql(args.sql, args.stream, args.sample_rows)
+
+            if args.update or args.source:
+                db.update(args.source, args.keep)
+
+            if args.releases:
+                db.releases()
+
+            if args.optimize:
+                db.optimize(args.keep)
 
-            if args.update:
-                db.update()
+            if args.cache_stats:
+                db.cache_stats()
 
             if args.search:
                 queries = []
@@ -105,20 +269,21 @@ def main(args: argparse.Namespace):
             
                 for query, table in queries:
                     db.search(query, table, args.column, args.pattern)
-            
-        case _:
-            print(f"Unknown command: {args.command}")
 
-if __name__ == "__main__":
-    p = argparse.ArgumentParser(description="Diferrent charts, statistics, records, all time bests of Formula One")
+            if args.find:
+                db.find(args.find, args.kind, args.limit)
 
-    subps = p.add_subparsers(dest="command", help="Available commands")
-    p.add_argument("--double-headers", action="store_true", help="Print table headers twice (at the top and bottom)")
-    p.add_argument("--no-delimiters", action="store_true", help="Do not print any separators for tables")
-    p.add_argument("--adjustment", default="left", choices=("left", "center", "right"), help="Table text alignment")
+        case "batch":
+            batch(args, f1db)
+            
+        case _:
+            table.note(f"Unknown command: {args.command}")
 
-    circuit_p = subps.add_parser("circuit", help="Get different records for a circuit")
-    circuit_p.add_argument      ("id",  metavar="ID", type=str,                   help="Circuit id")
+def add_circuit_args(circuit_p: argparse.ArgumentParser):
+    circuit_p.add_argument      ("id",  metavar="ID", type=str, nargs='?',        help="Circuit id, not needed with --all")
+    circuit_p.add_argument      ("--all",                    action="store_true", help="Records of every circuit, in one table per record")
+    circuit_p.add_argument      ("-o",  "--output-dir", type=str,                 help="With --all, write what each circuit would print to its own file in this directory")
+    circuit_p.add_argument      ("-w",  "--workers", type=int, default=1,         help="With --all and --output-dir, worker processes splitting the circuits")
     circuit_p.add_argument      ("-i",  "--info",            action="store_true", help="Show circuit info")
     circuit_p.add_argument      ("-bl", "--best-lap",        action="store_true", help="All time best laps during the race")
     circuit_p.add_argument      ("-bq", "--best-qualifying", action="store_true", help="All time best qualifying records")
@@ -126,17 +291,20 @@ if __name__ == "__main__":
     circuit_p.add_argument      ("-mp", "--most-podiums",    action="store_true", help="List of drivers with most podiums")
     circuit_p.add_argument      ("-R",  "--reverse",         action="store_true", help="Reverse results")
     circuit_p.add_argument      ("-r",  "--rows", type=int,  default=15,          help="Amount of rows to fetch, -1 means all. Defaults to 15")
+    circuit_p.add_argument      ("-a",  "--after", type=int, default=0,           help="Only records ranked after this position, to page through results")
 
-    driver_p = subps.add_parser("driver", help="Different driver's statistics, data over the season")
+def add_driver_args(driver_p: argparse.ArgumentParser):
     driver_p.add_argument      ("id",   metavar="ID",   type=str,            help="Driver id")
-    driver_p.add_argument      ("year", metavar="YEAR", type=str,            help="Season year")
+    driver_p.add_argument      ("year", metavar="YEAR", type=str, nargs='?', help="Season year, not needed with --years and --career")
     driver_p.add_argument      ("-r", "--races",        action="store_true", help="Table of driver season races")
     driver_p.add_argument      ("-s", "--sprints",      action="store_true", help="Table of driver season sprints")
     driver_p.add_argument      ("-q", "--qualifying",   action="store_true", help="Table of driver race qualifyings")
     driver_p.add_argument      ("-p", "--pit-stops",    action="store_true", help="Table of pit stops for each race")
     driver_p.add_argument      ("-o", "--overview",     action="store_true", help="An overview, driver statistics for a season")
-    
-    race_p = subps.add_parser("gp",   help="Grand prix results tables")
+    driver_p.add_argument      ("--years", type=year_range,                  help="Overview over a range of seasons, e.g: 2007-2024, with a per-season breakdown")
+    driver_p.add_argument      ("--career",             action="store_true", help="Overview over the whole career, with a per-season breakdown")
+
+def add_gp_args(race_p: argparse.ArgumentParser):
     race_p.add_argument      ("id",   metavar="ID",         type=str,             help="Grand prix id, e.g: monaco")
     race_p.add_argument      ("year", metavar="YEAR",       type=str,             help="Year gp held")
     race_p.add_argument      ("-r", "--race",               action="store_true",  help="Show race results")
@@ -144,15 +312,41 @@ if __name__ == "__main__":
     race_p.add_argument      ("-rq", "--race-qualifying",   action="store_true",  help="Show race qualifying result")
     race_p.add_argument      ("-sq", "--sprint-qualifying", action="store_true",  help="Show sprint qualifying result")
 
-    champ_p = subps.add_parser("season", help="Fancy wikipedia like season table for driver/constructor championship")
-    champ_p.add_argument      ("year", metavar="YEAR", type=str, help="Season year")
+def add_season_args(champ_p: argparse.ArgumentParser):
+    from lib.leaderboard import LEADERBOARD_METRICS
+
+    champ_p.add_argument      ("year", metavar="YEAR", type=year_range, nargs='?', help="Season year, or a range of seasons, e.g: 1950-2025")
+    champ_p.add_argument      ("-a", "--all", action="store_true", help="Every season, same as the whole range")
+    champ_p.add_argument      ("-w", "--workers", type=int, default=1, help="With several seasons, worker processes rendering them")
     champ_p.add_argument      ("-c", "--constructor", action="store_true", help="Show constructor standing instead of driver")
     champ_p.add_argument      ("--flags", action="store_true", help="Add emoji flags to grand prix columns")
+    champ_p.add_argument      ("-l", "--leaderboard", action="store_true", help="Overview statistics of every driver of the season in one ranked table")
+    champ_p.add_argument      ("--sort", default="pts", choices=tuple(LEADERBOARD_METRICS), help="Leaderboard metric to rank by, defaults to pts")
 
+def add_h2h_args(h2h_p: argparse.ArgumentParser):
+    h2h_p.add_argument      ("year", metavar="YEAR", type=year_range, nargs='?', help="Season year, or a range of seasons, e.g: 2010-2020")
+    h2h_p.add_argument      ("-a", "--all", action="store_true",               help="Every season, same as the whole range")
+    h2h_p.add_argument      ("-d", "--driver", type=str,                       help="Only the teammates of this driver id")
+    h2h_p.add_argument      ("-t", "--constructor", type=str,                  help="Only the drivers of this constructor id")
+    h2h_p.add_argument      ("-w", "--workers", type=int, default=1,           help="Worker processes, each running the seasons it is given")
 
-    db_p = subps.add_parser("db",  help="Different database related commands")
+def add_records_args(records_p: argparse.ArgumentParser):
+    from lib.records import RECORD_KINDS
+
+    records_p.add_argument      ("record", metavar="RECORD", choices=("totals", "streaks"), help="totals: race results of every driver over the whole history, streaks: longest runs of consecutive starts, across seasons")
+    records_p.add_argument      ("-k", "--kind", default="win", choices=RECORD_KINDS, help="Race results to count or look for, defaults to win")
+    records_p.add_argument      ("-r", "--rows", type=int, default=15,            help="Amount of rows to fetch, -1 means all. Defaults to 15")
+
+def add_db_args(db_p: argparse.ArgumentParser):
     db_p.add_argument      ("-s",  "--sql",          type=str,              help="Run arbitrary sql on the f1db")
+    db_p.add_argument      ("--stream",              action="store_true",   help="Stream --sql results to the terminal instead of loading them all first")
+    db_p.add_argument      ("--sample-rows", type=int,                      help="When streaming, rows used to fix column widths, defaults to 1000")
     db_p.add_argument      ("-u",  "--update",       action="store_true",   help="Update/init f1db")
+    db_p.add_argument      ("--from", dest="source", type=str,              help="Update from a local f1db release (zip or sqlite file), writing only the rows that changed")
+    db_p.add_argument      ("--keep",    type=int,   default=3,             help="Releases kept in data/releases on update and optimize, defaults to 3")
+    db_p.add_argument      ("--releases",            action="store_true",   help="List the releases in data/releases, the current one marked")
+    db_p.add_argument      ("-O",  "--optimize",     action="store_true",   help="Build indexes and statistics for the f1db into a new release, done automatically on update")
+    db_p.add_argument      ("--cache-stats",         action="store_true",   help="Show what the query result cache holds")
     db_p.add_argument      ("-S",  "--search",       action="store_true",   help="Search by given part")
     db_p.add_argument      ("-d",  "--driver",       type=str,              help="If searching, search for driver")
     db_p.add_argument      ("-t",  "--constructor",  type=str,              help="If searching, search for a constructor (team)")
@@ -160,10 +354,65 @@ if __name__ == "__main__":
     db_p.add_argument      ("-g",  "--grand-prix",   type=str,              help="If searching, search for grand prix")
     db_p.add_argument      ("--pattern",             action="store_true",   help="If searching, treat part as entire pattern for sql LIKE when searching")
     db_p.add_argument      ("--column",  type=str,   default="name",        help="If searching, use given colum to match part, defaults to \"name\"")
+    db_p.add_argument      ("-f",  "--find",         type=str,              help="Ranked fuzzy search of drivers, constructors, circuits and grand prix by id, name or abbreviation")
+    db_p.add_argument      ("--kind",    choices=("driver", "constructor", "circuit", "grand_prix"), help="If finding, only this kind")
+    db_p.add_argument      ("--limit",   type=int,   default=10,            help="If finding, most results shown, defaults to 10")
+
+def add_batch_args(batch_p: argparse.ArgumentParser):
+    batch_p.add_argument      ("file", metavar="FILE", type=str, nargs='?', default='-', help="File with commands, same syntax as the cli without the program name. Defaults to stdin")
+    batch_p.add_argument      ("-w", "--workers",    type=int, default=1,  help="Worker processes, each with its own read only connection")
+    batch_p.add_argument      ("-o", "--output-dir", type=str,             help="Write each command output to its own numbered file instead of stdout")
+
+# name: (help, adds the command arguments)
+COMMANDS = {
+    "circuit": ("Get different records for a circuit", add_circuit_args),
+    "driver":  ("Different driver's statistics, data over the season", add_driver_args),
+    "gp":      ("Grand prix results tables", add_gp_args),
+    "season":  ("Fancy wikipedia like season table for driver/constructor championship", add_season_args),
+    "h2h":     ("Teammate head to head: qualifying, races, median qualifying gap and points", add_h2h_args),
+    "records": ("All time records over every race", add_records_args),
+    "db":      ("Different database related commands", add_db_args),
+    "batch":   ("Run many commands in one process, one command per line", add_batch_args),
+}
+
+def requested_command(argv: list[str]) -> str | None:
+    # Global option values are never command names, so the first one found is it
+    return next((arg for arg in argv if arg in COMMANDS), None)
+
+@cache
+def build_parser(command: str | None = None) -> argparse.ArgumentParser:
+    # Only the requested command gets its arguments, the others are just
+    # listed for the help
+    p = argparse.ArgumentParser(description="Diferrent charts, statistics, records, all time bests of Formula One")
+
+    subps = p.add_subparsers(dest="command", help="Available commands")
+    p.add_argument("--double-headers", action="store_true", help="Print table headers twice (at the top and bottom)")
+    p.add_argument("--no-delimiters", action="store_true", help="Do not print any separators for tables")
+    p.add_argument("--adjustment", default="left", choices=("left", "center", "right"), help="Table text alignment")
+    p.add_argument("--format", default="table", choices=("table", "csv", "tsv", "jsonl"), help="Output format, csv, tsv and jsonl are written as rows come, with annotations and comments as fields")
+    p.add_argument("--db-profile", default="auto", choices=("auto", "readonly", "readwrite"), help="Database connection profile, auto opens read only unless the command writes")
+    p.add_argument("--no-cache", action="store_true", help="Do not read or store query results in the on-disk cache (data/cache.db)")
+    p.add_argument("--profile", action="store_true", help="Print where the command spent its time to stderr: each sql statement, post-processing and rendering")
+    p.add_argument("--profile-trace", metavar="FILE", type=str, help="Profile like --profile and also write the trace as json to FILE")
 
+    for name, (command_help, add_args) in COMMANDS.items():
+        command_p = subps.add_parser(name, help=command_help)
+
+        if name == command:
+            add_args(command_p)
+
+    return p
+
+if __name__ == "__main__":
+    p = build_parser(requested_command(sys.argv[1:]))
     args = p.parse_args()
 
     if any(vars(args).values()):
-        main(args)
+        try:
+            main(args)
+        except BrokenPipeError:
+            # Output piped into something like head, that exits early
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
     else:
         p.print_help()
\ No newline at end of file
@@ -0,0 +1,97 @@
+import io, shlex
+
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import redirect_stdout, redirect_stderr
+
+from lib.classes import F1DB
+
+# Runs one parsed command line (argv without the program name) on a db
+Runner = Callable[[list[str], F1DB], None]
+
+# Per worker process state, set up once by init_worker: a read only F1DB
+# on the release of the parent, and the runner for batch commands
+_worker = {}
+
+def read_commands(source: TextIO) -> list[str]:
+    commands = []
+
+    for line in source:
+        line = line.strip()
+
+        if line and not line.startswith('#'):
+            commands.append(line)
+
+    return commands
+
+def capture(runner: Runner, command: str, db: F1DB) -> str:
+    out = io.StringIO()
+
+    with redirect_stdout(out), redirect_stderr(out):
+        try:
+            runner(shlex.split(command), db)
+        except SystemExit: # argparse errors, the message is already captured
+            pass
+        except Exception as e:
+            print(f"Error: {e}")
+
+    return out.getvalue()
+
+def init_worker(root_dir: str, db_file: str, cache: bool, runner: Optional[Runner] = None):
+    _worker["runner"] = runner
+    _worker["db"] = F1DB(root_dir, profile="readonly", db_file=db_file, cache=cache)
+    _worker["db"].bulk = True
+
+def worker_pool(db: F1DB, workers: int, runner: Optional[Runner] = None) -> ProcessPoolExecutor:
+    # Processes that each open their own connection to the db of the parent
+    return ProcessPoolExecutor(
+        workers,
+        initializer=init_worker,
+        initargs=(db.root_dir, db.db_file, db.use_cache, runner)
+    )
+
+def worker_db() -> F1DB:
+    return _worker["db"]
+
+def run_in_worker(command: str) -> str:
+    return capture(_worker["runner"], command, _worker["db"])
+
+def ordered_map(
+    pool: Executor,
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    window: int
+) -> Iterator[Any]:
+    # Like pool.map, but items are consumed lazily: at most window of them are
+    # in flight, results still come back in the order of items
+    pending = deque()
+
+    for item in items:
+        pending.append(pool.submit(fn, item))
+
+        if len(pending) >= window:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+def run_batch(
+    commands: Iterable[str],
+    runner: Runner,
+    db: F1DB,
+    workers=1
+) -> Iterator[str]:
+    # Outputs are yielded in the same order as commands, whatever the workers
+    db.bulk = True
+
+    if workers <= 1:
+        for command in commands:
+            yield capture(runner, command, db)
+        return
+
+    commands = list(commands)
+    chunksize = max(1, len(commands) // (workers * 4))
+
+    with worker_pool(db, workers, runner) as pool:
+        yield from pool.map(run_in_worker, commands, chunksize=chunksize)
@@ -0,0 +1,125 @@
+import sqlite3, os, time, zlib, marshal, hashlib
+
+from typing import Any, Iterable, Optional
+
+# Query results kept on disk between runs, next to the db they come from.
+# Entries are only valid for the db they were made from: the fingerprint
+# changes whenever the db file is replaced, and stale entries are dropped
+class ResultCache:
+    MAX_SIZE = 64 * 1024 * 1024
+
+    def __init__(self, cache_file: str, max_size: Optional[int] = None):
+        self.cache_file = cache_file
+        self.max_size = max_size or self.MAX_SIZE
+        self.fingerprint = None
+        self.con = sqlite3.connect(cache_file, timeout=10, isolation_level=None)
+
+        # Losing the cache is harmless, so skip fsyncs
+        self.con.execute("PRAGMA journal_mode = WAL")
+        self.con.execute("PRAGMA synchronous = OFF")
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS result (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                script TEXT,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                used INTEGER NOT NULL
+            )
+        """)
+        self.con.execute("CREATE INDEX IF NOT EXISTS result_used_idx ON result (used)")
+
+    def use(self, fingerprint: str):
+        # Called once per db connection, drops whatever other db versions left
+        self.fingerprint = fingerprint
+        self.con.execute("DELETE FROM result WHERE fingerprint != ?", [fingerprint])
+
+    @staticmethod
+    def key(sql: str, params: Optional[Iterable]) -> str:
+        if isinstance(params, dict):
+            params = sorted(params.items())
+        elif params is not None:
+            params = list(params)
+
+        return hashlib.sha1(repr((sql, params)).encode()).hexdigest()
+
+    def get(self, key: str) -> tuple[list[Any], list[str]] | None:
+        row = self.con.execute(
+            "SELECT data FROM result WHERE key = ? AND fingerprint = ?",
+            [key, self.fingerprint]
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        self.con.execute(
+            "UPDATE result SET hits = hits + 1, used = ? WHERE key = ?",
+            [time.time_ns(), key]
+        )
+
+        rows, columns = marshal.loads(zlib.decompress(row[0]))
+        return rows, columns
+
+    def put(self, key: str, script: Optional[str], rows: list[Any], columns: list[str]):
+        try:
+            data = zlib.compress(marshal.dumps((rows, columns)), 1)
+        except ValueError: # Values marshal can't store, just don't cache them
+            return
+
+        if len(data) > self.max_size:
+            return
+
+        self.con.execute("BEGIN")
+        self.con.execute(
+            "INSERT OR REPLACE INTO result VALUES (?, ?, ?, ?, ?, 0, ?)",
+            [key, self.fingerprint, script, data, len(data), time.time_ns()]
+        )
+        self.evict()
+        self.con.execute("COMMIT")
+
+    def evict(self):
+        # Least recently used entries go first, until the cache fits max_size
+        total, = self.con.execute("SELECT COALESCE(SUM(size), 0) FROM result").fetchone()
+
+        if total <= self.max_size:
+            return
+
+        freed = 0
+
+        for key, size in self.con.execute("SELECT key, size FROM result ORDER BY used").fetchall():
+            if total - freed <= self.max_size:
+                break
+
+            self.con.execute("DELETE FROM result WHERE key = ?", [key])
+            freed += size
+
+    def clear(self):
+        self.con.execute("DELETE FROM result")
+        self.con.execute("VACUUM")
+
+    def stats(self) -> dict[str, Any]:
+        entries, size, hits = self.con.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM result"
+        ).fetchone()
+
+        scripts = self.con.execute("""
+            SELECT COALESCE(script, '(sql)'), COUNT(*), SUM(size), SUM(hits)
+            FROM result
+            GROUP BY script
+            ORDER BY SUM(size) DESC
+        """).fetchall()
+
+        return {
+            "file": self.cache_file,
+            "file_size": os.path.getsize(self.cache_file),
+            "entries": entries,
+            "size": size,
+            "max_size": self.max_size,
+            "hits": hits,
+            "fingerprint": self.fingerprint,
+            "scripts": scripts,
+        }
+
+    def close(self):
+        self.con.close()
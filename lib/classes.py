@@ -1,80 +1,563 @@
-import sqlite3, os, subprocess
+from __future__ import annotations
 
-from typing import Callable, Iterable, Optional, Tuple, Any
-from statistics import mean, stdev, median, median_low, median_high, mode
+import sqlite3, os, sys, io
 
-from collections import defaultdict
-from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, Tuple, Any
 
-from lib.helpers import strsign, annotate_pf, ifnone, separator, print_comments
-from lib.tables import Table
-from lib.emoji import gp_flags
+from collections import defaultdict
+from itertools import islice, groupby
+from operator import itemgetter
+from contextlib import redirect_stdout, nullcontext, contextmanager
 
-class Streak:
-    def __init__(self, condition: Callable[[int], bool]):
-        self.longest = 0
-        self.current = 0
-        self._is_continued = condition
+from lib.helpers import strsign, annotate_pf, ifnone, lap_time, separator, print_comments
+from lib.tables import Table, STREAM_SAMPLE_SIZE
+from lib.scripts import ScriptRegistry
+from lib.releases import Releases, DB_NAME, KEEP_RELEASES
 
-    def update(self, value: int):
-        if self._is_continued(value):
-            self.current += 1
-            return
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+    from lib.cache import ResultCache
+    from lib.profiler import Profiler
+    from lib.snapshot import Snapshot
+    from lib.update import TableChange
 
-        if self.current > self.longest:
-            self.longest = self.current
-        
-        self.current = 0
-    
-    def get(self) -> int:
-        return max(self.longest, self.current)
+# Anything only some commands need (statistics kernel, emoji flags, result
+# cache, process pools, profiler, updates) is imported where it's used, to keep startup short
 
 class F1DB:
-    def __init__(self, root_dir: str):
+    # Scripts are kept as the very same str objects, so sqlite3 finds
+    # their compiled statements in the connection cache on every call
+    STATEMENTS_CACHE_SIZE = 256
+    STREAM_BATCH_SIZE = 1000
+    # Threads running prefetched queries, none on a single core where they
+    # would only take turns with the main one
+    READER_THREADS = min(4, os.cpu_count() or 1)
+
+    PROFILES = {
+        "readwrite": {},
+        # The db is only ever replaced as a whole by update, so readers can
+        # treat it as immutable: no locks, no journal checks, mapped pages
+        "readonly": {
+            "mmap_size": 256 * 1024 * 1024,
+            "cache_size": -64 * 1024,
+            "temp_store": "memory",
+            "query_only": 1,
+        },
+    }
+
+    def __init__(
+        self,
+        root_dir: str,
+        profile="readwrite",
+        db_file: Optional[str] = None,
+        cache=False
+    ):
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown connection profile: {profile}")
+
         self.sql_scripts_dir = os.path.join(root_dir, "sql")
-        self.db_file = os.path.join(root_dir, "data", "f1db.db")
-        self.con = sqlite3.connect(self.db_file)
-        self.cur = self.con.cursor()
+        self.derived_scripts_dir = os.path.join(self.sql_scripts_dir, "derived")
+        # The current release is resolved once, this F1DB stays on it even
+        # when an update makes another one current
+        self.data_dir = os.path.join(root_dir, "data")
+        self.db_file = db_file or Releases(self.data_dir).db_file()
+        self.profile = profile
+        self.derived = None
+        self.derived_fresh = {}
+        self._scripts = None
+        self._con = None
+        self._cur = None
+        self.columns = []
         self.root_dir = root_dir
 
+        # Results are only cached while the db can't change under us
+        self.cache_file = os.path.join(os.path.dirname(self.db_file), "cache.db")
+        self.use_cache = cache and profile == "readonly"
+        self.cache = None
+        self.profiler = None
+        self.prefetched = {}
+        self._readers = None
+        self._reader_local = None
+        self._snapshot = None
+        # Many commands in this process, say a batch: slow imports are paid once
+        self.bulk = False
+
+    # The connection and the scripts are only set up once a query runs
+    @property
+    def scripts(self) -> ScriptRegistry:
+        if self._scripts is None:
+            self._scripts = ScriptRegistry(self.sql_scripts_dir)
+
+        return self._scripts
+
+    @property
+    def con(self) -> sqlite3.Connection:
+        if self._con is None:
+            self._con = self.connect()
+
+        return self._con
+
+    @property
+    def cur(self) -> sqlite3.Cursor:
+        if self._cur is None:
+            self._cur = self.con.cursor()
+
+        return self._cur
+
+    def connect(self, profiled=True) -> sqlite3.Connection:
+        if self.profile == "readonly":
+            # Characters with a meaning in uris, the path is used as is otherwise
+            path = os.path.abspath(self.db_file)
+            path = path.replace('%', "%25").replace('?', "%3f").replace('#', "%23")
+            uri = f"file:{path}?mode=ro&immutable=1"
+            con = sqlite3.connect(
+                uri, uri=True, cached_statements=self.STATEMENTS_CACHE_SIZE
+            )
+        else:
+            con = sqlite3.connect(
+                self.db_file, cached_statements=self.STATEMENTS_CACHE_SIZE
+            )
+
+        if profiled and self.profiler is not None:
+            self.profiler.attach(con)
+
+        for pragma, value in self.PROFILES[self.profile].items():
+            con.execute(f"PRAGMA {pragma} = {value}")
+
+        return con
+
+    def set_profiler(self, profiler: Profiler | None):
+        if self._con is not None:
+            if profiler is not None:
+                profiler.attach(self._con)
+            elif self.profiler is not None:
+                self.profiler.detach(self._con)
+
+        self.profiler = profiler
+
+    def profiled(
+        self,
+        sql: str,
+        script: Optional[str] = None,
+        record: Optional[dict] = None
+    ):
+        # Times a statement while profiling, record resumes one being streamed
+        if self.profiler is None:
+            return nullcontext(record or {"rows": 0})
+
+        return self.profiler.running(record or self.profiler.record(sql, script))
+
+    def stage(self, name: str):
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
     def run_script(
         self, name: str, 
         params: Optional[Iterable]
     ) -> list[Any]:
-        script = os.path.join(self.sql_scripts_dir, name + ".sql")
-        
-        with open(script) as s:
-            sql = s.read()
+        return self.query(self.scripts[name], params, name)
 
-        if params:
-            self.cur.execute(sql, params)
-        else:
-            self.cur.execute(sql)
+    def query(
+        self,
+        sql: str,
+        params: Optional[Iterable],
+        script: Optional[str] = None
+    ) -> list[Any]:
+        # Opening the connection and the cache are not part of the statement
+        with self.stage("connect"):
+            cache = self.result_cache()
+            cur = self.cur
+
+        with self.profiled(sql, script) as record:
+            if self.prefetched:
+                from lib.cache import ResultCache
+
+                future = self.prefetched.pop(ResultCache.key(sql, params), None)
+
+                if future is not None:
+                    rows, self.columns, cached, vm_steps = future.result()
+                    record["rows"], record["cached"] = len(rows), cached
+                    record["vm_steps"] += vm_steps
+
+                    if cache is not None and not cached:
+                        cache.put(cache.key(sql, params), script, rows, self.columns)
+
+                    return rows
+
+            if cache is not None:
+                key = cache.key(sql, params)
+                hit = cache.get(key)
+
+                if hit is not None:
+                    rows, self.columns = hit
+                    record["rows"], record["cached"] = len(rows), True
+                    return rows
+
+            if params:
+                cur.execute(sql, params)
+            else:
+                cur.execute(sql)
+
+            rows = cur.fetchall()
+            self.columns = [c[0] for c in cur.description or ()]
+            record["rows"] = len(rows)
+
+            if cache is not None:
+                cache.put(key, script, rows, self.columns)
+
+            return rows
+
+    @contextmanager
+    def prefetch(self, queries: list[tuple[str, Optional[Iterable]]]) -> Iterator[None]:
+        # Scripts the coming run_script calls will ask for. The first runs
+        # on our own connection as usual, the others start at once on reader
+        # threads (sqlite3 releases the GIL while a statement runs). Each
+        # call then only waits for its own result, so reports still come out
+        # in the order they are asked for
+        if self.profile != "readonly" or len(queries) < 2 or self.READER_THREADS < 2:
+            yield
+            return
+
+        from concurrent.futures import Future
+        from lib.cache import ResultCache
 
-        return self.cur.fetchall()
+        with self.stage("connect"):
+            cache = self.result_cache()
+
+        try:
+            for name, params in queries[1:]:
+                sql = self.scripts[name]
+                key = ResultCache.key(sql, params)
+                hit = cache.get(key) if cache is not None else None
+
+                if hit is not None:
+                    future = Future()
+                    future.set_result((*hit, True, 0))
+                else:
+                    future = self.readers().submit(self.fetch, sql, params)
+
+                self.prefetched[key] = future
+
+            yield
+        finally:
+            for future in self.prefetched.values():
+                future.cancel()
+
+            self.prefetched.clear()
+
+    def readers(self) -> ThreadPoolExecutor:
+        # Kept for the life of the process, so threads and their connections
+        # are only set up once, say for all the commands of a batch
+        if self._readers is None:
+            from concurrent.futures import ThreadPoolExecutor
+            import threading
+
+            self._readers = ThreadPoolExecutor(self.READER_THREADS, "f1db-reader")
+            self._reader_local = threading.local()
+
+        return self._readers
+
+    def fetch(self, sql: str, params: Optional[Iterable]) -> tuple[list[Any], list[str], bool, int]:
+        # Runs on a reader thread, each has a connection of its own. One to
+        # a db that update replaced since is opened again. VM steps are
+        # counted apart and added to the statement's record when it's asked for
+        local = self._reader_local
+
+        if getattr(local, "db_file", None) != self.db_file:
+            local.con = self.connect(profiled=False)
+            local.db_file = self.db_file
+
+        profiler = self.profiler
+        counting = profiler.counting(local.con) if profiler is not None else nullcontext({"vm_steps": 0})
+
+        with counting as counted:
+            cur = local.con.execute(sql, params or ())
+            rows = cur.fetchall()
+
+        return rows, [c[0] for c in cur.description or ()], False, counted["vm_steps"]
+
+    def snapshot(self) -> Snapshot | None:
+        # The columnar copy optimize writes next to the db, mapped once. None
+        # when there is none or it was made from another state of the db
+        if self._snapshot is None:
+            from lib.snapshot import SNAPSHOT_NAME, db_fingerprint, load_snapshot
+
+            with self.stage("connect"):
+                file = os.path.join(os.path.dirname(self.db_file), SNAPSHOT_NAME)
+                self._snapshot = load_snapshot(file, db_fingerprint(self.db_file)) or False
+
+        return self._snapshot or None
+
+    def build_snapshot(self):
+        from lib.snapshot import SNAPSHOT_NAME, db_fingerprint, build_snapshot
+
+        # Nothing may write the db after this, the fingerprint would change
+        self.con.commit()
+        file = os.path.join(os.path.dirname(self.db_file), SNAPSHOT_NAME)
+        build_snapshot(self.con, file, db_fingerprint(self.db_file))
+        self._snapshot = None
+
+    def fingerprint(self) -> str:
+        stat = os.stat(self.db_file)
+        return f"{stat.st_size}:{stat.st_mtime_ns}:{self.data_version()}"
+
+    def result_cache(self) -> ResultCache | None:
+        if not self.use_cache or self.cache is not None:
+            return self.cache
+
+        from lib.cache import ResultCache
+
+        try:
+            self.cache = ResultCache(self.cache_file)
+            self.cache.use(self.fingerprint())
+        except sqlite3.Error: # No cache, say the data dir is read only
+            self.use_cache = False
+            self.cache = None
+
+        return self.cache
 
     def run_file(self, file: str) -> tuple[list[Any], list[str]]:
         with open(file) as f:
             content = f.read()
-        
-        self.cur.execute(content)
+
+        with self.stage("connect"):
+            cur = self.cur
+
+        with self.profiled(content, os.path.basename(file)) as record:
+            cur.execute(content)
+            rows = cur.fetchall()
+            record["rows"] = len(rows)
+
         return (
-            self.cur.fetchall(), 
-            [c[0] for c in self.cur.description]
+            rows,
+            [c[0] for c in cur.description]
         )
 
-    def update(self):
-        os.chdir(self.root_dir)
-        subprocess.run(
-            [os.path.join(self.root_dir, "install")], check=True
-        )
+    def iter_rows(
+        self,
+        sql: str,
+        params: Optional[Iterable] = None,
+        size: Optional[int] = None
+    ) -> tuple[Iterator[Any], list[str]]:
+        # A cursor of its own, so other queries can run while this one is consumed
+        with self.stage("connect"):
+            cur = self.con.cursor()
+
+        with self.profiled(sql) as record:
+            cur.execute(sql, params or ())
+
+        columns = [c[0] for c in cur.description or ()]
+
+        def batches():
+            while True:
+                with self.profiled(sql, record=record):
+                    rows = cur.fetchmany(size or self.STREAM_BATCH_SIZE)
+                    record["rows"] += len(rows)
+
+                if not rows:
+                    break
+
+                yield from rows
+
+            cur.close()
+
+        return batches(), columns
+
+    def iter_file(
+        self, 
+        file: str, 
+        size: Optional[int] = None
+    ) -> tuple[Iterator[Any], list[str]]:
+        with open(file) as f:
+            content = f.read()
+
+        return self.iter_rows(content, size=size)
+
+    def reconnect(self):
+        if self._con is not None:
+            self._con.close()
+
+        self._con = None
+        self._cur = None
+        self._snapshot = None
+
+    def update(
+        self,
+        source: Optional[str] = None,
+        keep=KEEP_RELEASES
+    ) -> tuple[str | None, list[TableChange] | None]:
+        # Returns the version of the new release, None when nothing changed,
+        # and the changes applied on a copy of the current db
+        import shutil, tempfile
+        from lib.update import download_release, extract_release, apply_release
+
+        changes = None
+
+        def build(staged: F1DB) -> bool:
+            nonlocal changes
+
+            with tempfile.TemporaryDirectory() as tmp:
+                release_file = extract_release(source or download_release(tmp), tmp)
+
+                if not os.path.exists(self.db_file):
+                    shutil.copyfile(release_file, staged.db_file)
+                    staged.optimize()
+                    return True
+
+                # Derived tables carry over, only what the changed rows touch is rebuilt
+                shutil.copyfile(self.db_file, staged.db_file)
+                changes = apply_release(staged.con, release_file)
+                changed = {c.table for c in changes if c.inserted or c.updated or c.deleted or c.note}
+
+                if changed:
+                    staged.optimize(changed)
+
+                return bool(changed)
+
+        return self.release(build, keep), changes
+
+    def optimize_release(self, keep=KEEP_RELEASES) -> str:
+        # optimize on a copy of the current db, published as a new release
+        import shutil
+
+        if not os.path.exists(self.db_file):
+            raise ValueError(f"No db to optimize at {self.db_file}, run db --update first")
+
+        def build(staged: F1DB) -> bool:
+            shutil.copyfile(self.db_file, staged.db_file)
+            staged.optimize()
+            return True
+
+        return self.release(build, keep)
+
+    def release(self, build: Callable[[F1DB], bool], keep=KEEP_RELEASES) -> Optional[str]:
+        # The current release is never written: build fills a new one next to
+        # it, which is checked and then made current. build returns False
+        # when there is nothing to publish
+        releases = Releases(self.data_dir)
+        previous = releases.current()
+        version, staging_dir = releases.stage()
+        staged = F1DB(self.root_dir, "readwrite", os.path.join(staging_dir, DB_NAME))
+
+        try:
+            try:
+                publish = build(staged)
+            finally:
+                staged.reconnect()
+
+            if not publish:
+                releases.discard(staging_dir)
+                return None
+
+            releases.publish(version, staging_dir)
+        except BaseException:
+            releases.discard(staging_dir)
+            raise
+
+        self.db_file = releases.db_file(version)
+        self.cache_file = os.path.join(os.path.dirname(self.db_file), "cache.db")
+        self.reconnect()
+
+        releases.prune(keep, previous)
+        return version
+
+    def derived_scripts(self) -> dict[str, str]:
+        # sql/derived/NN-name.sql, built in NN order and tracked by name
+        if self.derived is None:
+            registry = ScriptRegistry(self.derived_scripts_dir)
+            self.derived = {
+                name.split('-', 1)[1]: registry[name] for name in registry.names()
+            }
+
+        return self.derived
+
+    def data_version(self) -> str:
+        # Rows added or removed. Edits in place, say a DSQ or a corrected
+        # time, are caught by the triggers of lib.update.watch_sources
+        races, last_race, results, last_result = self.con.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM race),
+                (SELECT MAX(id) FROM race),
+                (SELECT COUNT(*) FROM race_data),
+                (SELECT MAX(rowid) FROM race_data)
+        """).fetchone()
+
+        return f"{races}:{last_race}:{results}:{last_result}"
+
+    def derived_version(self, name: str, data_version: str) -> str:
+        import hashlib
+
+        sql = self.derived_scripts()[name]
+        return hashlib.sha1(sql.encode()).hexdigest()[:12] + ":" + data_version
+
+    def is_derived_fresh(self, name: str) -> bool:
+        if name in self.derived_fresh:
+            return self.derived_fresh[name]
+
+        try:
+            row = self.con.execute(
+                "SELECT version FROM f1_stats_derived WHERE name = ?", [name]
+            ).fetchone()
+        except sqlite3.OperationalError: # Never optimized
+            row = None
+
+        fresh = row is not None and row[0] == self.derived_version(name, self.data_version())
+        self.derived_fresh[name] = fresh
+        return fresh
+
+    def optimize(self, changed_tables: Optional[set[str]] = None):
+        # With changed_tables, say after an incremental update, only derived
+        # scripts reading one of those (or changed themselves) are built again
+        from lib.update import referenced_tables, watch_sources
+
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS f1_stats_derived (
+                name TEXT PRIMARY KEY,
+                version TEXT NOT NULL
+            )
+        """)
+
+        data_version = self.data_version()
+        built = dict(self.con.execute("SELECT name, version FROM f1_stats_derived"))
+
+        for name, sql in self.derived_scripts().items():
+            version = self.derived_version(name, data_version)
+            sql_version = version.split(':', 1)[0]
+
+            is_current = (
+                changed_tables is not None
+                and built.get(name, "").split(':', 1)[0] == sql_version
+                and not referenced_tables(sql) & changed_tables
+            )
+
+            if not is_current:
+                self.con.executescript(f"BEGIN;\n{sql}\nCOMMIT;")
+
+            self.con.execute(
+                "INSERT OR REPLACE INTO f1_stats_derived VALUES (?, ?)",
+                [name, version]
+            )
+            self.con.commit()
+
+        watch_sources(self.con, self.derived_scripts())
+        self.derived_fresh = {}
+
+        if changed_tables is None:
+            self.con.execute("ANALYZE")
+        else:
+            for table in sorted(changed_tables):
+                self.con.execute(f"ANALYZE main.\"{table}\"")
+
+        self.con.commit()
+        self.build_snapshot()
 
     def execute(self, sql: str, params: Optional[Iterable] ) -> list[Any]:
-        self.cur.execute(sql, params)
-        return self.cur.fetchall()
+        return self.query(sql, params)
 
     def get_columns(self, start=0) -> list[Any]:
-        return [c[0] for c in self.cur.description[start:]] 
+        return self.columns[start:]
+
+    def table_columns(self, table: str) -> list[str]:
+        return [name for name, in self.execute("SELECT name FROM pragma_table_info(?)", [table])]
 
 class Base:
     def __init__(
@@ -85,7 +568,29 @@ class Base:
         self.db = db_handler
         self.table = out_table
 
-    def flush_script(self, script: str) -> bool:
+    def columns(self, start=0, blank="name") -> list[str]:
+        # Tables leave the name column unlabelled, other formats need a label
+        headers = self.db.get_columns(start)
+
+        if self.table.machine_readable:
+            headers = [h or blank for h in headers]
+
+        return headers
+
+    def flush_fields(self, rows: list[Any], fields: tuple[str, ...], blank="name"):
+        # What tables show as annotations and comments, machine readable
+        # formats get as fields of their own, after the visible columns
+        n = len(fields)
+        self.table.headers = self.columns(n, blank) + list(fields)
+        self.table.rows = (row[n:] + row[:n] for row in rows)
+        self.table.flush()
+
+    def flush_record(self, record: dict[str, Any]):
+        self.table.headers = list(record)
+        self.table.rows = [list(record.values())]
+        self.table.flush()
+
+    def flush_script(self, script: str, blank="name") -> bool:
         rows = self.db.run_script(
             script, {"id": self.id, "year": self.year}
         )
@@ -94,7 +599,7 @@ class Base:
             return False
 
         self.table.rows = rows
-        self.table.headers = self.db.get_columns()
+        self.table.headers = self.columns(blank=blank)
         self.table.flush()
         return True
 
@@ -111,10 +616,17 @@ class GP(Base):
         self.year = year
 
     def race(self):
+        self.table.section = "race"
         rows = self.db.run_script(
             "gp-race", {"id": self.id, "year": self.year}
         )
 
+        if self.table.machine_readable:
+            return self.flush_fields(rows, (
+                "is_fastest", "is_pole", "reason_retired",
+                "pts_pos_gained", "fastest_lap_gap", "pos_gained"
+            ), "driver")
+
         self.table.headers = self.db.get_columns(6)
         comments = []
         dnfs_comments = []
@@ -154,6 +666,7 @@ class GP(Base):
             print_comments(dnfs_comments)
 
     def sprint(self):
+        self.table.section = "sprint"
         rows = self.db.run_script(
             "gp-sprint", {"id": self.id, "year": self.year}
         )
@@ -162,7 +675,10 @@ class GP(Base):
         comments = []
 
         if not rows:
-            return print(f"No sprint found: {self.id} - {self.year}")
+            return self.table.note(f"No sprint found: {self.id} - {self.year}")
+
+        if self.table.machine_readable:
+            return self.flush_fields(rows, ("pos_gained", "reason_retired"))
 
         for pos_gained, reason_retired, *row in rows:
             
@@ -177,11 +693,18 @@ class GP(Base):
         self.table.flush()
         print_comments(comments)
 
+    def prefetch(self, reports: Iterable[str]):
+        # Reports are named after their scripts: race, sprint, race-qualifying, sprint-qualifying
+        params = {"id": self.id, "year": self.year}
+        return self.db.prefetch([(f"gp-{report}", params) for report in reports])
+
     def sprint_qualifying(self):
+        self.table.section = "sprint-qualifying"
         if not self.flush_script("gp-sprint-qualifying"):
-            print(f"No sprint found: {self.id} - {self.year}")
+            self.table.note(f"No sprint found: {self.id} - {self.year}")
 
     def race_qualifying(self):
+        self.table.section = "race-qualifying"
         self.flush_script("gp-race-qualifying")
 
 class Driver(Base):
@@ -197,10 +720,17 @@ class Driver(Base):
         self.year = year
 
     def races(self):
+        self.table.section = "races"
         rows = self.db.run_script(
             "driver-races", { "id": self.id, "year": self.year }
         )
 
+        if self.table.machine_readable:
+            return self.flush_fields(rows, (
+                "is_fastest", "is_pole", "reason_retired",
+                "team", "pts_pos_gained", "fastest_lap_gap"
+            ), "grand_prix")
+
         self.table.headers = self.db.get_columns(6)
         comments = []
 
@@ -237,10 +767,22 @@ class Driver(Base):
         print_comments(comments)
 
     def pits(self):
+        self.table.section = "pits"
         rows = self.db.run_script(
             "driver-pits", {"id": self.id, "year": self.year}
         )
 
+        if self.table.machine_readable:
+            # One row per stop rather than a column per stop
+            stops = defaultdict(int)
+            self.table.headers = ["grand_prix", "stop", "lap", "time"]
+
+            for race, lap, time in rows:
+                stops[race] += 1
+                self.table.add_row([race, stops[race], lap, time])
+
+            return self.table.flush()
+
         races_pits = defaultdict(list)
         most_pits = -1
 
@@ -276,239 +818,193 @@ class Driver(Base):
 
         self.table.flush()
 
+    def prefetch(self, reports: Iterable[str]):
+        # Reports are named after their scripts: races, pits, qualifying,
+        # sprints, and season-overview for overview
+        params = {"id": self.id, "year": self.year}
+        overview = {"id": self.id, "first": self.year, "last": self.year}
+
+        return self.db.prefetch([
+            (f"driver-{report}", overview if report == "season-overview" else params)
+            for report in reports
+        ])
+
     def qualifying(self):
-        self.flush_script("driver-qualifying")
+        self.table.section = "qualifying"
+        self.flush_script("driver-qualifying", "grand_prix")
 
     def sprints(self):
+        self.table.section = "sprints"
         self.flush_script("driver-sprints")
 
     def overview(self):
+        from lib.overview import overview_stats, overview_record, print_overview
+
+        cols = self.overview_columns(self.year, self.year)
+
+        if cols is None:
+            return self.table.note(f"No data found for {self.id} - {self.year}")
+
+        s = overview_stats(cols)
+
+        if self.table.machine_readable:
+            self.table.section = "season-overview"
+            return self.flush_record(overview_record(s))
+
+        with self.db.stage("render"):
+            print_overview(f"Season overview — {self.id}, {self.year}", s)
+
+    def overview_range(self, first: int, last: int, career: bool = False):
+        from lib.overview import overview_stats, overview_stats_by, overview_record, print_overview
+
+        cols = self.overview_columns(first, last)
+
+        if cols is None:
+            return self.table.note(f"No data found for {self.id} - {first}-{last}")
+
+        self.table.section = "seasons"
+        self.table.headers = [
+            "Year", "Races", "Wins", "Podiums", "Poles", "Fastest laps", "Pts", "Pos",
+            "Finish rate", "Avg grid", "Avg finish", "Team pts share"
+        ]
+
+        seasons = overview_stats_by(cols, "year")
+        # Machine readable formats get the values as they are
+        shown = (lambda value, spec: value) if self.table.machine_readable else format
+
+        for year, s in seasons.items():
+            total = s["total"]
+
+            self.table.add_row([
+                year, total["races"], total["wins"], total["podiums"], total["poles"],
+                total["fastest_laps"], total["pts"], s["season_pts_pos"][year],
+                shown(s["finish_rate"], ".1%"), shown(s["avg_grid_position"], ".2f"),
+                shown(s["avg_finish_position"], ".2f"), shown(s["points_share"], ".1%")
+            ])
+
+        self.table.flush()
+
+        years = f"{min(seasons)}-{max(seasons)}"
+        title = f"Career overview — {self.id}, {years}" if career else f"Overview — {self.id}, {years}"
+        s = overview_stats(cols)
+
+        if self.table.machine_readable:
+            self.table.section = "overview"
+            return self.flush_record(overview_record(s))
+
+        with self.db.stage("render"):
+            print_overview(title, s)
+
+    def overview_columns(self, first: int, last: int) -> dict[str, Any] | None:
+        from lib.overview import overview_columns
+
+        # One query for the whole range, as column arrays for the stats kernel
         rows = self.db.run_script(
-           "driver-season-overview", {"id": self.id, "year": self.year}
+           "driver-season-overview", {"id": self.id, "first": first, "last": last}
         )
-    
-        if not rows:
-            return print(f"No data found for {self.id} - {self.year}")
-
-        per_race_pts_made = []
-        per_race_team_pts_made = []
-        grid_postitions = []
-        finish_positions = []
-        gained_positions = []
-        race_pit_stops = []
-        season_pts_pos = None
-
-        total = {
-            "gains": 0,
-            "losses": 0,
-            "q1_q2_elim": 0,
-            "q3": 0,
-            "races": 0,
-            "finished": 0,
-            "wins": 0,
-            "podiums": 0,
-            "score_finishes": 0,
-            "pts": 0,
-            "team_pts": 0,
-            "fastest_laps": 0,
-            "poles": 0,
-            "penalties": 0,
-        }
-
-        nfs = {
-            "DNF": [0, [], []], # N, gp, reasons
-            "DNS": [0, [], []],
-            "DSQ": [0, [], []],
-            "NC":  [0, [], []]
-        }
-
-        longest_win_streak = Streak(lambda x: x and x == 1)
-        longest_pod_streak = Streak(lambda x: x and x <= 3)
-        longest_pts_streak = Streak(lambda x: x and x <= 10)
-
-        for gp, is_fastest, is_pole, q3, pits, start, finish, finish_text, reason_retired, gained,\
-            gap, laps, penalty, pts_after_race, pts_made, pts_pos_after, team_pts_after_race in rows:
-
-            longest_win_streak.update(finish)
-            longest_pod_streak.update(finish)
-            longest_pts_streak.update(finish)
-
-            pts_made = ifnone(pts_made, 0)
-            team_pts_after_race = ifnone(team_pts_after_race, 0)
-
-            if not start and finish: # PL start case
-                start = finish + gained
-
-            # Old records don't have q1, q2, q3
-            if q3: total["q3"] += 1
-            else: total["q1_q2_elim"] += 1
-
-            if start: grid_postitions.append(start)
-            if gained: gained_positions.append(gained)            
-            if penalty: total["penalties"] += 1
-            if pits: race_pit_stops.append(pits)
-
-            if finish:
-                finish_positions.append(finish)
-                total["finished"] += 1
-
-                if finish < start:
-                    total["gains"] += 1
-                elif finish > start:
-                    total["losses"] += 1
-
-                if finish == 1:
-                    total["wins"] += 1
-
-                if finish <= 3:
-                    total["podiums"] += 1
-
-                if finish <= 10:
-                    total["score_finishes"] += 1
-            else:
-                nfs[finish_text][0] += 1
-                nfs[finish_text][1].append(gp)
-                nfs[finish_text][2].append(reason_retired)
-
-            team_pts_made = team_pts_after_race - total["team_pts"]
-
-            total["races"] += 1
-            total["poles"] += ifnone(is_pole, 0)
-            total["fastest_laps"] += ifnone(is_fastest, 0)
-            total["pts"] = pts_after_race
-            total["team_pts"] = team_pts_after_race
-            season_pts_pos = pts_pos_after
-            per_race_pts_made.append(pts_made)
-            per_race_team_pts_made.append(team_pts_made)
-
-        pole_conversion = total["poles"] / total["q3"] if total["q3"] else 0
-        finish_rate = total["finished"] / total["races"]
-        pts_per_race = total["pts"] / total["races"]
-
-        win_rate = total["wins"] / total["races"]
-        podium_rate = total["podiums"] / total["races"]
-        scoring_rate = total["score_finishes"] / total["races"]
-        pole_rate = total["poles"] / total["races"]
-        fastest_lap_rate = total["fastest_laps"] / total["races"]
-
-        not_finished = total["races"] - total["finished"]
-        not_finished_rate = not_finished / total["races"]
-        q1_q2_elim_rate = total["q1_q2_elim"] / total["races"]
-        
-        avg_finish_position = mean(finish_positions) 
-        avg_grid_position = mean(grid_postitions)
-        avg_gained_positions = mean(gained_positions)
-        avg_race_pit_stops = mean(race_pit_stops) if race_pit_stops else 0
 
-        median_grid_position = median(grid_postitions)
-        mode_grid_position = mode(finish_positions)
+        return overview_columns(rows) if rows else None
+
+def championship_table(
+    rows: Iterable[tuple],
+    is_constructor: bool,
+    add_gp_flags: bool,
+    table: Table
+):
+    # Rows of one season, ordered by driver standing. Races without results
+    # come with no driver, they only add their grand prix column
+    grandprix_cols = {}
+    drivers_results = {}
+    teams_drivers = defaultdict(dict)
+    drivers_points = {}
+    teams_points = {}
 
-        median_finish_position = median(finish_positions)
-        mode_finish_position = mode(finish_positions)
+    for year, race_round, gp, abbrev, name, finish_pos, points, is_pole, is_fastest, team, team_points in rows:
+        grandprix_cols[race_round] = (gp, abbrev)
 
-        avg_points_when_scoring = total["pts"] / total["score_finishes"] if total["score_finishes"] else 0
-        no_pos_change = total["finished"] - total["gains"] - total["losses"]
+        if name is None:
+            continue
+
+        drivers_results.setdefault(name, {})[abbrev] = annotate_pf(finish_pos, is_pole, is_fastest)
+        drivers_points[name] = points
+        teams_points[team] = ifnone(team_points, 0)
+
+        teams_drivers[team][name] = drivers_results[name]
+
+    grandprix_cols = [grandprix_cols[race_round] for race_round in sorted(grandprix_cols)]
+    abbrevs = [abbr for _, abbr in grandprix_cols]
+    pos = 1
+
+    if is_constructor:
+        sorted_teams_points = sorted(teams_points.items(), reverse=True, key=lambda kv: kv[1])
         
-        pct_gain = total["gains"]  / total["finished"]
-        pct_loss = total["losses"] / total["finished"] 
-        pct_no_change = no_pos_change /  total["finished"]
+        for team, points in sorted_teams_points:
+            team_drivers = teams_drivers[team]
 
-        finish_pos_cv = stdev(finish_positions) / avg_finish_position
-        pts_volatility = stdev(per_race_pts_made)
+            for name, results in islice(team_drivers.items(), 2):
+                per_races = [results.get(abbr) for abbr in abbrevs]
+                table.add_row([pos, team] + per_races + [points])
+            
+            pos += 1
+    else:
+        for name, points in drivers_points.items():
+            per_races = [drivers_results[name].get(abbr) for abbr in abbrevs]
+            table.add_row([pos, name] + per_races + [points])
+            pos += 1
 
-        points_share = total["pts"] / total["team_pts"]
+    if add_gp_flags:
+        from lib.emoji import gp_flags
+        abbrevs = [f"{gp_flags[gp]} {abbr}" for gp, abbr in grandprix_cols]
 
-        # pit stops
-        sql = """
-            SELECT 
-                pit.pit_stop_time_millis 
-            FROM race_data pit 
-            JOIN race on race.id = pit.race_id 
-            WHERE 
-                pit.type = 'PIT_STOP' 
-                and pit.driver_id = :id 
-                and race.year = :year
-        """
+    table.headers = ["pos", "name"] + abbrevs + ["pts"]
+    table.flush()
 
-        rows = self.db.execute(sql, {"id": self.id, "year": self.year})
+CHAMPIONSHIP_FIELDS = ["round", "grand_prix", "finish", "pole", "fastest_lap"]
 
-        pit_times = []
-        problematic_pits = 0
-        avg_pit_time = 0
+def championship_records(rows: Iterable[tuple], is_constructor: bool):
+    # Machine readable championships, one record per driver and race with the
+    # finish as it is and the pole and fastest lap flags as fields of their own
+    for year, season_rows in groupby(rows, key=itemgetter(0)):
+        results = [row for row in season_rows if row[4] is not None]
 
-        for row in rows:
-            if not row[0]: continue
-            pit_times.append(row[0] / 1000)
+        if not is_constructor:
+            positions = {}
 
-        if pit_times:
-            pit_times.sort()
-        
-            n = len(pit_times)
-            q1 = median_low(pit_times[:n//2])
-            q3 = median_high(pit_times[(n+1)//2:])
-            iqr = q3 - q1
-
-            slow_thresh = median(pit_times) + 1.5 * iqr
-            problematic_thresh = median(pit_times) + 3.0 * iqr
-
-            problematic_pits = sum(1 for t in pit_times if t > problematic_thresh)
-            avg_pit_time = mean(pit_times)
-
-        print(f"\nSeason overview — {self.id}, {self.year}")
-        print("-" * 50)
-        print(f"Races: {total["races"]}  Finished: {total["finished"]}  Not finished/started: {not_finished}  (rate: {not_finished_rate:.1%})\n")
-
-        print("Points")
-        print(f"- Total pts: {total["pts"]} pts ({season_pts_pos} place)")
-        print(f"- Team pts share: {points_share:.2%}")
-        print(f"- Pts per race: {pts_per_race:.2f} pts")
-        print(f"- Avg pts when scoring: {avg_points_when_scoring:.2f} pts")
-        print(f"- Points volatility (std): {pts_volatility:.2f} pts\n")
-
-        print("Qualifying & starts")
-        print(f"- Poles: {total["poles"]}  (Pole rate: {pole_rate:.1%})")
-        print(f"- Q1, Q2 eliminations: {total["q1_q2_elim"]} (rate: {q1_q2_elim_rate:.1%})")
-        if total["q3"]:
-            print(f"- Q3 appearances: {total["q3"]}")
-            print(f"- Pole conversion (poles / Q3s): {pole_conversion:.1%}")
-        print(f"- Avg grid position: {avg_grid_position:.2f}")
-        print(f"- Median grid position: {median_grid_position:.2f}")
-        print(f"- Most common grid position: {mode_grid_position}")
-        print(f"- Penalties: {total["penalties"]}\n")
-
-        print("Results & rates")
-        print(f"- Wins: {total["wins"]}  (Win rate: {win_rate:.1%})")
-        print(f"- Podiums: {total["podiums"]}  (Podium rate: {podium_rate:.1%})")
-        print(f"- Scoring finishes: {total["score_finishes"]}  (Scoring rate: {scoring_rate:.1%})")
-        print(f"- Fastest laps: {total["fastest_laps"]}  (Fastest-lap rate: {fastest_lap_rate:.1%})")
-        print(f"- Finish rate: {finish_rate:.1%}")
-        print(f"- Avg finish position: {avg_finish_position:.2f}")
-        print(f"- Median finish position: {median_finish_position:.2f}")
-        print(f"- Most common finish position: {mode_finish_position}")
-        print(f"- Finish position CV (coefficient of variation): {finish_pos_cv:.3f}\n")
-
-        print("Pit stops & strategy")
-        print(f"- Avg pit stops per race: {avg_race_pit_stops:.2f}")
-        print(f"- Avg pit stops time: {avg_pit_time:.2f}s")
-        print(f"- Problematic pit stops: {problematic_pits}\n")
-
-        print("Not started/finished/classified, disqualified: ")
-        for nf in sorted(nfs, key=lambda k: nfs[k][0], reverse=True):
-            n, gps, reasons = nfs[nf]
-            rate = n / total["races"]
-            print(f"- {nf}: {n} ({rate:.1%})")
-
-            for i in range(n): print(f"  * {gps[i]} - {reasons[i]}")
-        print()
+            for _, race_round, gp, _, name, finish_pos, points, is_pole, is_fastest, _, _ in results:
+                pos = positions.setdefault(name, len(positions) + 1)
+                yield [year, pos, name, race_round, gp, finish_pos, bool(is_pole), bool(is_fastest), points]
+
+            continue
+
+        teams = defaultdict(lambda: defaultdict(list))
+        teams_points = {}
+
+        for row in results:
+            team = row[9]
+            teams[team][row[4]].append(row)
+            teams_points[team] = ifnone(row[10], 0)
 
-        print("Race progress")
-        print(f"- Avg positions gained per race: {avg_gained_positions:.2f}")
-        print(f"- % races net gain: {pct_gain:.1%}")
-        print(f"- % races net loss: {pct_loss:.1%}")
-        print(f"- % races no change: {pct_no_change:.1%}")
-        print(f"- Longest podium streak: {longest_pod_streak.get()}")
-        print(f"- Longest win streak: {longest_win_streak.get()}")
-        print(f"- Longest points streak: {longest_pts_streak.get()}\n")
+        sorted_teams_points = sorted(teams_points.items(), reverse=True, key=lambda kv: kv[1])
+
+        for pos, (team, points) in enumerate(sorted_teams_points, start=1):
+            for name, driver_rows in islice(teams[team].items(), 2):
+                for _, race_round, gp, _, _, finish_pos, _, is_pole, is_fastest, _, _ in driver_rows:
+                    yield [year, pos, team, name, race_round, gp, finish_pos, bool(is_pole), bool(is_fastest), points]
+
+def championship_headers(is_constructor: bool) -> list[str]:
+    names = ["team", "driver"] if is_constructor else ["name"]
+    return ["year", "pos"] + names + CHAMPIONSHIP_FIELDS + ["pts"]
+
+def render_championship(season: tuple) -> str:
+    # Picklable entry point, so seasons can render in worker processes
+    year, rows, is_constructor, add_gp_flags, table = season
+    out = io.StringIO()
+
+    with redirect_stdout(out):
+        print(f"\n{year} {"constructors" if is_constructor else "drivers"} championship")
+        championship_table(rows, is_constructor, add_gp_flags, table)
+
+    return out.getvalue()
 
 class Season:
     def __init__(
@@ -524,101 +1020,173 @@ class Season:
         self.table = out_table
 
     def championship(self, is_constructor=False):
-        sql = """
-            SELECT 
-                grand_prix.id, 
-                grand_prix.abbreviation 
-            FROM grand_prix 
-            JOIN race on race.year = ? 
-            WHERE race.grand_prix_id = grand_prix.id
-        """
+        rows = self.db.run_script("championship", {"first": self.year, "last": self.year})
 
-        rows = self.db.execute(sql, [self.year])
+        if self.table.machine_readable:
+            return self.table.stream(championship_records(rows, is_constructor), championship_headers(is_constructor))
 
-        grandprix_cols = []
-        grandprix_template = {}
+        championship_table(rows, is_constructor, self.add_gp_flags, self.table)
 
-        if self.add_gp_flags:
-            flags = []
+    def championships(self, first: int, last: int, is_constructor=False, workers=1):
+        # All seasons come from one query ordered by year, pivoted a season at a time
+        rows, _ = self.db.iter_rows(
+            self.db.scripts["championship"], {"first": first, "last": last}
+        )
 
-        for gp, abbr in rows:
-            if self.add_gp_flags:
-                flags.append(gp_flags[gp])
+        # Or kept as records, so all the seasons make one table
+        if self.table.machine_readable:
+            return self.table.stream(championship_records(rows, is_constructor), championship_headers(is_constructor))
 
-            grandprix_cols.append(abbr)
-            grandprix_template[abbr] = None
+        seasons = (
+            (year, list(season_rows), is_constructor, self.add_gp_flags, self.table)
+            for year, season_rows in groupby(rows, key=itemgetter(0))
+        )
 
-        rows = self.db.run_script("championship", {"year": self.year})
+        if workers <= 1:
+            for season in seasons:
+                sys.stdout.write(render_championship(season))
+            return
 
-        drivers_results = defaultdict(lambda: dict(grandprix_template))
-        teams_drivers = defaultdict(dict)
-        drivers_points = {}
-        teams_points = {}
+        from concurrent.futures import ProcessPoolExecutor
+        from lib.batch import ordered_map
 
-        for abbrev, name, finish_pos, points, is_pole, is_fastest, team, team_points in rows:
-            drivers_results[name][abbrev] = annotate_pf(finish_pos, is_pole, is_fastest)
-            drivers_points[name] = points
-            teams_points[team] = ifnone(team_points, 0)
-            
-            teams_drivers[team][name] = drivers_results[name]
+        with ProcessPoolExecutor(workers) as pool:
+            for output in ordered_map(pool, render_championship, seasons, workers * 2):
+                sys.stdout.write(output)
 
-        pos = 1
+    def leaderboard(self, sort: str = "pts"):
+        from lib.leaderboard import LEADERBOARD_METRICS
+        from lib.overview import overview_columns, overview_stats_by
 
-        if is_constructor:
-            sorted_teams_points = sorted(teams_points.items(), reverse=True, key=lambda kv: kv[1])
-            
-            for team, points in sorted_teams_points:
-                team_drivers = teams_drivers[team]
-
-                for name, results in islice(team_drivers.items(), 2):
-                    per_races = [results[abbr] for abbr in grandprix_cols]
-                    self.table.add_row([pos, team] + per_races + [points])
-                
-                pos += 1
-        else:
-            for name, points in drivers_points.items():
-                per_races = [drivers_results[name].get(abbr) for abbr in grandprix_cols]
-                self.table.add_row([pos, name] + per_races + [points])
-                pos += 1
+        # Every driver of the season from one query, reduced per driver at once
+        rows = self.db.run_script("season-overview", {"year": self.year})
 
-        if self.add_gp_flags:
-            for i in range(len(grandprix_cols)):
-                abbr = grandprix_cols[i]
-                grandprix_cols[i] = f"{flags[i]} {abbr}"
+        if not rows:
+            return self.table.note(f"No data found for {self.year}")
+
+        cols = overview_columns(rows, extra=("driver_id", "driver"))
+        names = dict(zip(cols["driver_id"], cols["driver"]))
+        overviews = overview_stats_by(cols, "driver_id")
+
+        pts = LEADERBOARD_METRICS["pts"][1]
+        _, value, descending = LEADERBOARD_METRICS[sort]
+
+        ranked = sorted(overviews.items(), key=lambda kv: pts(kv[1]), reverse=True)
+        ranked.sort(key=lambda kv: value(kv[1]), reverse=descending)
+
+        self.table.headers = ["pos", "name", "races"] + [header for header, _, _ in LEADERBOARD_METRICS.values()]
+        # Machine readable formats get the values as they are
+        shown = (lambda value, spec: value) if self.table.machine_readable else format
+
+        for pos, (driver, s) in enumerate(ranked, start=1):
+            self.table.add_row([
+                pos, names[driver], s["total"]["races"],
+                s["total"]["pts"], s["total"]["wins"], s["total"]["podiums"], s["total"]["poles"],
+                shown(s["finish_rate"], ".1%"), shown(s["pole_conversion"], ".1%"),
+                shown(s["avg_grid_position"], ".2f"), shown(s["avg_finish_position"], ".2f"),
+                shown(s["avg_gained_positions"], ".2f"),
+                shown(s["pits"]["avg"], ".2f"), shown(s["pits"]["iqr"], ".2f"),
+                s["longest_win_streak"], s["longest_pod_streak"], s["longest_pts_streak"],
+                shown(s["points_share"], ".1%")
+            ])
 
-        self.table.headers = ["pos", "name"] + grandprix_cols + ["pts"]
         self.table.flush()
 
 class Circuit:
+    # Record columns the queries give in millis
+    TIME_COLUMNS = ("time", "q1", "q2", "q3", "best")
+
     def __init__(
         self, 
         id: str,
         rows: int,
         is_reversed: bool,
         db_handler: F1DB,
-        out_table: Table
+        out_table: Table,
+        after=0
     ):
         self.id = id
         self.db = db_handler
         self.table = out_table
         self.rows = rows
         self.is_reversed = is_reversed
+        self.after = after
 
     def record(
         self, 
         script: str
     ):
-        fetched = self.db.run_script(script, [self.id])
-        if self.rows != -1:
-            fetched = fetched[:self.rows]
+        self.table.section = script
 
-        if self.is_reversed:
-            fetched.reverse()
+        # Rankings precomputed on update, window queries when those are missing
+        if self.db.is_derived_fresh("circuit-records"):
+            script = "circuit-" + script
+
+        # Paging and ordering happen in the query, -1 is sqlite's "no limit"
+        fetched = self.db.run_script(script, {
+            "id": self.id,
+            "limit": self.rows,
+            "after": self.after,
+            "reverse": self.is_reversed
+        })
+
+        self.flush(fetched)
+
+    def record_all(self, script: str):
+        # Every circuit in one table, read from the rankings update makes,
+        # or one window query partitioned by circuit when those are missing
+        self.table.section = script
+
+        if self.db.is_derived_fresh("circuit-records"):
+            script = "circuits-" + script
+        else:
+            script = "all-circuits-" + script
+
+        self.flush(self.db.run_script(script, {
+            "limit": self.rows,
+            "after": self.after,
+            "reverse": self.is_reversed
+        }))
+
+    def flush(self, fetched: list[tuple]):
+        # Times are compared as millis in the queries, formatted only here
+        headers = self.db.get_columns()
+        times = [i for i, h in enumerate(headers) if h in self.TIME_COLUMNS]
+
+        self.table.headers = headers
+        self.table.rows = [
+            [lap_time(v) if i in times else v for i, v in enumerate(row)] for row in fetched
+        ] if times else fetched
+
+        if self.table.machine_readable:
+            self.table.headers = [h or "rank" for h in self.table.headers]
 
-        self.table.headers = self.db.get_columns()
-        self.table.rows = fetched
         self.table.flush()
 
+    def write_all(self, output_dir: str, info: bool, records: list[str], workers=1):
+        # A file per circuit with what circuit ID would print, circuits
+        # split across worker processes
+        ids = [id for id, in self.db.execute("SELECT id FROM circuit ORDER BY id", [])]
+        jobs = [(id, info, records, self.rows, self.is_reversed, self.after, self.table) for id in ids]
+        extension = self.table.output_format if self.table.machine_readable else "txt"
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        def write(outputs: Iterable[str]):
+            for id, output in zip(ids, outputs):
+                with open(os.path.join(output_dir, f"{id}.{extension}"), 'w') as f:
+                    f.write(output)
+
+        if workers <= 1:
+            write(render_circuit(job, self.db) for job in jobs)
+        else:
+            from lib.batch import worker_pool
+
+            with worker_pool(self.db, workers) as pool:
+                write(pool.map(render_circuit, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+        self.table.note(f"{len(ids)} circuits written to {output_dir}")
+
     def info(self, years_per_row=8):
         sql = """
             SELECT 
@@ -631,7 +1199,13 @@ class Circuit:
         fetched = self.db.execute(sql, {"id": self.id})[0]
 
         if not fetched or fetched[0] is None:
-            return print(f"Circuit: \"{self.id}\" was not found")
+            return self.table.note(f"Circuit: \"{self.id}\" was not found")
+
+        if self.table.machine_readable:
+            self.table.section = "info"
+            self.table.headers = self.db.get_columns()
+            self.table.rows = [fetched]
+            return self.table.flush()
 
         _, name, full_name, prev_names, circuit_type, direction, \
         place, country_id, lat, lon, length, turns, total_races, races_years = fetched
@@ -655,6 +1229,126 @@ class Circuit:
         print("Coordinates: ")
         print(f"{lat},{lon}\n")
 
+def render_circuit(job: tuple, db: Optional[F1DB] = None) -> str:
+    # Picklable entry point, so circuits can render in worker processes
+    from lib.batch import worker_db
+
+    id, info, records, rows, is_reversed, after, table = job
+    circuit = Circuit(id, rows, is_reversed, db or worker_db(), table, after)
+    out = io.StringIO()
+
+    with redirect_stdout(out):
+        if info:
+            circuit.info()
+
+        for record in records:
+            circuit.record(record)
+
+        circuit.table.close()
+
+    return out.getvalue()
+
+class H2H(Base):
+    def __init__(
+        self,
+        driver: Optional[str],
+        constructor: Optional[str],
+        db_handler: F1DB,
+        out_table: Table
+    ):
+        super().__init__(db_handler, out_table)
+        self.driver = driver
+        self.constructor = constructor
+
+    def pairs(self, first: int, last: int, workers=1):
+        # Every teammate pair of the seasons: one query over the whole range,
+        # or with workers, a query per season in worker processes
+        from lib.h2h import h2h_rows, season_in_worker
+
+        if workers <= 1:
+            rows = h2h_rows(self.db, first, last, self.driver, self.constructor)
+        else:
+            from lib.batch import worker_pool
+
+            years = self.db.execute(
+                "SELECT DISTINCT year FROM race WHERE year BETWEEN ? AND ? ORDER BY year", [first, last]
+            )
+            seasons = [(year, self.driver, self.constructor) for year, in years]
+
+            with worker_pool(self.db, workers) as pool:
+                rows = [row for season in pool.map(season_in_worker, seasons) for row in season]
+
+        if not rows:
+            return self.table.note("No teammates found")
+
+        if self.table.machine_readable:
+            self.table.headers = [
+                "year", "team", "driver", "teammate", "races", "quali_wins", "quali_losses",
+                "race_wins", "race_losses", "median_quali_gap_ms", "points", "teammate_points"
+            ]
+            self.table.rows = rows
+            return self.table.flush()
+
+        self.table.headers = ["year", "team", "driver", "teammate", "races", "quali", "race", "quali gap", "pts"]
+
+        for year, team, driver, teammate, races, quali_wins, quali_losses, \
+            race_wins, race_losses, gap, points, teammate_points in rows:
+
+            self.table.add_row([
+                year, team, driver, teammate, races,
+                f"{quali_wins}-{quali_losses}", f"{race_wins}-{race_losses}",
+                None if gap is None else f"{gap / 1000:+.3f}", f"{points}-{teammate_points}"
+            ])
+
+        self.table.flush()
+
+class Records(Base):
+    def __init__(
+        self,
+        rows: int,
+        db_handler: F1DB,
+        out_table: Table
+    ):
+        super().__init__(db_handler, out_table)
+        self.rows = rows
+
+    def totals(self, kind: str):
+        from lib import stats
+
+        # Whole history scans go to the snapshot when optimize made one. The
+        # pure python kernel is slower than sqlite at them, so only with numpy,
+        # and importing numpy takes longer than sqlite, so only when the
+        # import is shared by many commands or was paid already
+        use_snapshot = stats.BACKEND == "numpy" and (self.db.bulk or stats.np is not None)
+        snapshot = self.db.snapshot() if use_snapshot else None
+
+        if snapshot is None:
+            self.table.rows = self.db.run_script("records-totals", {"kind": kind, "limit": self.rows})
+            self.table.headers = self.columns(blank="rank")
+        else:
+            from lib.records import snapshot_totals
+
+            names = dict(self.db.execute("SELECT id, name FROM driver", []))
+
+            self.table.rows = snapshot_totals(snapshot, kind, names, self.rows)
+
+            self.table.headers = ["rank" if self.table.machine_readable else "", "driver", "total", "races"]
+
+        self.table.flush()
+
+    def streaks(self, kind: str):
+        # Runs over consecutive starts, across seasons. One window query
+        # over every race result, kept in the result cache until an update
+        rows = self.db.run_script("records-streaks", {"kind": kind, "limit": self.rows})
+        self.table.headers = self.columns(blank="rank")
+
+        if self.table.machine_readable:
+            self.table.rows = rows
+        else:
+            self.table.rows = [row[:-1] + ("yes" if row[-1] else None,) for row in rows]
+
+        self.table.flush()
+
 class DB:
     def __init__(
         self, 
@@ -664,16 +1358,90 @@ class DB:
         self.db = db_handler
         self.table = out_table
 
-    def update(self):
-        self.db.update()
+    def update(self, source: Optional[str] = None, keep=KEEP_RELEASES):
+        try:
+            version, changes = self.db.update(source, keep)
+        except (ValueError, sqlite3.DatabaseError, OSError) as e:
+            return self.table.note(f"Update failed, the db is unchanged: {e}")
+
+        if version is None:
+            return self.table.note("Already up to date")
+
+        if changes is not None:
+            self.table.headers = ["table", "inserted", "updated", "deleted", ""]
+
+            for change in changes:
+                if change.inserted or change.updated or change.deleted or change.note:
+                    self.table.add_row(list(change))
+
+            self.table.flush()
+
+        self.table.note(f"Release {version} is now current")
+
+    def releases(self):
+        releases = Releases(self.db.data_dir)
+        current = releases.current()
+
+        self.table.headers = ["version", "current", "size"]
 
-    def execute_sql(self, file: str):
+        for version in reversed(releases.versions()):
+            size = os.path.getsize(releases.db_file(version))
+            self.table.add_row([version, "*" if version == current else None, f"{size / 2**20:.1f} MiB"])
+
+        if not self.table.rows:
+            return self.table.note("No releases yet, data/f1db.db is used until the next update")
+
+        self.table.flush()
+
+    def optimize(self, keep=KEEP_RELEASES):
+        try:
+            version = self.db.optimize_release(keep)
+        except (ValueError, sqlite3.DatabaseError, OSError) as e:
+            return self.table.note(f"Optimize failed, the db is unchanged: {e}")
+
+        self.table.note(f"Release {version} is now current")
+
+    def cache_stats(self):
+        cache = self.db.result_cache()
+
+        if cache is None:
+            return self.table.note("Result cache is disabled (read only profile without --no-cache only)")
+
+        stats = cache.stats()
+        mib = 1024 * 1024
+
+        if self.table.machine_readable:
+            self.table.section = "cache"
+            self.table.headers = [name for name in stats if name != "scripts"]
+            self.table.rows = [[stats[name] for name in self.table.headers]]
+            self.table.flush()
+        else:
+            print(f"\nCache: {stats["file"]} ({stats["file_size"] / mib:.2f} MiB on disk)")
+            print(f"Entries: {stats["entries"]}, hits: {stats["hits"]}")
+            print(f"Size: {stats["size"] / mib:.2f} / {stats["max_size"] / mib:.0f} MiB")
+            print(f"Db fingerprint: {stats["fingerprint"]}")
+
+        self.table.section = "scripts"
+        self.table.headers = ["script", "entries", "KiB", "hits"]
+
+        for script, entries, size, hits in stats["scripts"]:
+            self.table.add_row([script, entries, f"{size / 1024:.1f}", hits])
+
+        self.table.flush()
+
+    def execute_sql(self, file: str, stream=False, sample_size=None):
         try:
+            # Other formats need no column widths, so they always stream
+            if stream or self.table.machine_readable:
+                rows, headers = self.db.iter_file(file)
+                self.table.stream(rows, headers, sample_size or STREAM_SAMPLE_SIZE)
+                return
+
             self.table.rows, self.table.headers = self.db.run_file(file)
             self.table.flush()
 
         except FileNotFoundError:
-            return print(f'File "{file}" does not exist')
+            return self.table.note(f'File "{file}" does not exist')
     
     def search(
         self, 
@@ -682,18 +1450,53 @@ class DB:
         column: str,
         overwrite_pattern=False
     ):
-        pattern = part if overwrite_pattern else f"%{part}%"
+        from lib.search import SEARCH_TABLES, INDEXED_COLUMNS, phrase
 
-        fetched = self.db.execute(
-            f"SELECT * FROM {table} WHERE {table}.{column} LIKE ?"
-        , [pattern])
+        # Names can't be bound as parameters, they're checked against the schema
+        if table not in SEARCH_TABLES:
+            return self.table.note(f"Can not search in: {table}")
+
+        columns = self.db.table_columns(table)
+
+        if column not in columns:
+            return self.table.note(f"Unknown {table} column: {column}, one of: {", ".join(columns)}")
+
+        is_indexed = (
+            not overwrite_pattern
+            and column in INDEXED_COLUMNS
+            and len(part) >= 3
+            and not any(c in part for c in "%_")
+            and self.db.is_derived_fresh("search")
+        )
+
+        if is_indexed:
+            # Same rows as the LIKE scan below, looked up in the trigram index
+            fetched = self.db.execute(f"""
+                SELECT * FROM {table}
+                WHERE id IN (
+                    SELECT id FROM f1_stats_search
+                    WHERE f1_stats_search MATCH ? AND kind = ?
+                )
+                ORDER BY rowid
+            """, [f"{column} : {phrase(part)}", table])
+        else:
+            pattern = part if overwrite_pattern else f"%{part}%"
+
+            fetched = self.db.execute(
+                f"SELECT * FROM {table} WHERE {table}.{column} LIKE ?"
+            , [pattern])
+
+        if self.table.machine_readable:
+            self.table.headers = self.db.get_columns()
+            self.table.rows = fetched
+            return self.table.flush()
 
         headers = []
         name_index = 0
 
-        for i, c in enumerate(self.db.cur.description):
-            headers.append(c[0])
-            if c[0] == "name": 
+        for i, c in enumerate(self.db.get_columns()):
+            headers.append(c)
+            if c == "name": 
                 name_index = i
 
         for found in fetched:
@@ -701,3 +1504,32 @@ class DB:
 
             for i in range(len(headers)):
                 print(f"{headers[i]}: {found[i]}")
+
+    def find(self, part: str, kind: Optional[str] = None, limit=10):
+        from lib.search import MATCHES, FUZZY_MIN_SIMILARITY, search_params, similarity
+
+        # One ranked search over every kind: exact, prefix and substring
+        # matches first, then rows sharing trigrams with the part
+        if not self.db.is_derived_fresh("search"):
+            return self.table.note("No search index, it's built by: db --optimize")
+
+        found = []
+
+        for row_kind, id, name, full_name, abbreviation, match in self.db.run_script(
+            "search", search_params(part, kind)
+        ):
+            if MATCHES[match] == "fuzzy" and \
+                similarity(part, (id, name, full_name, abbreviation)) < FUZZY_MIN_SIMILARITY:
+                continue
+
+            found.append([row_kind, id, name, full_name, abbreviation, MATCHES[match]])
+
+            if len(found) == limit:
+                break
+
+        if not found:
+            return self.table.note(f"Nothing found for: {part}")
+
+        self.table.headers = ["kind", "id", "name", "full name", "abbreviation", "match"]
+        self.table.rows = found
+        self.table.flush()
@@ -0,0 +1,44 @@
+from typing import Any, Optional
+from statistics import median
+
+from lib.batch import worker_db
+from lib.classes import F1DB
+from lib.records import total_value
+
+def pair_row(row: tuple, driver: Optional[str] = None) -> list[Any]:
+    # A row of sql/h2h.sql with the median gap worked out. The asked for
+    # driver comes first, else the one who scored more
+    year, team, name, teammate, races, quali_wins, quali_losses, race_wins, \
+        race_losses, gaps, points, teammate_points, driver_id, teammate_id = row
+
+    gaps = [int(gap) for gap in gaps.split(',')] if gaps else []
+    swap = teammate_id == driver if driver else teammate_points > points
+
+    if swap:
+        name, teammate = teammate, name
+        quali_wins, quali_losses = quali_losses, quali_wins
+        race_wins, race_losses = race_losses, race_wins
+        points, teammate_points = teammate_points, points
+        gaps = [-gap for gap in gaps]
+
+    return [
+        year, team, name, teammate, races, quali_wins, quali_losses, race_wins, race_losses,
+        median(gaps) if gaps else None, total_value(points), total_value(teammate_points)
+    ]
+
+def h2h_rows(
+    db: F1DB,
+    first: int,
+    last: int,
+    driver: Optional[str] = None,
+    constructor: Optional[str] = None
+) -> list[list[Any]]:
+    rows = db.run_script("h2h", {
+        "first": first, "last": last, "driver": driver, "constructor": constructor
+    })
+
+    return [pair_row(row, driver) for row in rows]
+
+def season_in_worker(season: tuple[int, Optional[str], Optional[str]]) -> list[list[Any]]:
+    year, driver, constructor = season
+    return h2h_rows(worker_db(), year, year, driver, constructor)
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 
 SUP_F = "\u1DA0"
 SUP_P = "\u1D56"
@@ -18,6 +18,14 @@ def annotate_pf(data: Any, is_pole: bool, is_fastest: bool):
         addif(data, is_pole, SUP_P)
     , is_fastest, SUP_F)
     
+def lap_time(millis: Optional[int]) -> Optional[str]:
+    # m:ss.mmm, as f1db writes lap and qualifying times
+    if millis is None:
+        return None
+
+    minutes, rest = divmod(millis, 60_000)
+    return f"{minutes}:{rest // 1000:02d}.{rest % 1000:03d}"
+
 def separator():
     return '-' * 50
 
@@ -0,0 +1,20 @@
+# Season leaderboard metrics: header, value of an overview, whether higher
+# is better. Apart from lib.overview, so the cli lists them without loading
+# the statistics kernel
+LEADERBOARD_METRICS = {
+    "pts":             ("pts",         lambda s: s["total"]["pts"],         True),
+    "wins":            ("wins",        lambda s: s["total"]["wins"],        True),
+    "podiums":         ("podiums",     lambda s: s["total"]["podiums"],     True),
+    "poles":           ("poles",       lambda s: s["total"]["poles"],       True),
+    "finish-rate":     ("finish rate", lambda s: s["finish_rate"],          True),
+    "pole-conversion": ("pole conv",   lambda s: s["pole_conversion"],      True),
+    "avg-grid":        ("avg grid",    lambda s: s["avg_grid_position"],    False),
+    "avg-finish":      ("avg finish",  lambda s: s["avg_finish_position"],  False),
+    "gained":          ("avg gained",  lambda s: s["avg_gained_positions"], True),
+    "pit-time":        ("pit avg",     lambda s: s["pits"]["avg"],          False),
+    "pit-iqr":         ("pit iqr",     lambda s: s["pits"]["iqr"],          False),
+    "win-streak":      ("win streak",  lambda s: s["longest_win_streak"],   True),
+    "podium-streak":   ("pod streak",  lambda s: s["longest_pod_streak"],   True),
+    "points-streak":   ("pts streak",  lambda s: s["longest_pts_streak"],   True),
+    "team-share":      ("team share",  lambda s: s["points_share"],         True),
+}
@@ -0,0 +1,278 @@
+from typing import Any
+
+from lib import stats
+from lib.helpers import ifnone
+
+# Column layout of sql/driver-season-overview.sql
+OVERVIEW_COLUMNS = (
+    "year", "gp", "is_fastest", "is_pole", "q3", "pits", "start", "finish",
+    "finish_text", "reason_retired", "gained", "gap", "laps", "penalty",
+    "pts_after_race", "pts_made", "pts_pos_after", "team_pts_after_race", "pit_times"
+)
+
+# Columns the kernel gets as arrays, the others stay plain lists
+NUMERIC_COLUMNS = ("is_fastest", "is_pole", "q3", "pits", "start", "finish", "gained", "pts_made")
+
+def ratio(part: float, whole: float) -> float:
+    return part / whole if whole else 0
+
+def overview_columns(
+    rows: list[tuple],
+    backend: str | None = None,
+    extra: tuple[str, ...] = ()
+) -> dict[str, Any]:
+    # extra names columns the script selects after the overview ones
+    return stats.columns(rows, OVERVIEW_COLUMNS + extra, NUMERIC_COLUMNS, backend)
+
+# Driver statistics over overview rows ordered by year and round, computed a
+# column at a time for every group of rows at once, say one group per driver.
+# Rows of several seasons may follow each other in a group: standings points
+# are cumulative within a season so they are kept per year, while streaks
+# carry on across season boundaries.
+def overview_stats_by(c: dict[str, Any], key: str | None = None) -> dict[Any, dict[str, Any]]:
+    finish, gained, pits = c["finish"], c["gained"], c["pits"]
+    backend = "numpy" if stats.is_numpy(finish) else "python"
+    groups = stats.Groups(c[key] if key else [None] * len(finish), backend)
+    row_groups = groups.ids.tolist() if backend == "numpy" else groups.ids
+
+    # PL start case
+    start = stats.where((c["start"] == 0) & (finish != 0), finish + gained, c["start"])
+    finished = finish != 0
+    started = start != 0
+
+    finish_positions, by_finish = finish[finished], groups.select(finished)
+    grid_positions, by_grid = start[started], groups.select(started)
+    gained_positions, by_gained = gained[gained != 0], groups.select(gained != 0)
+    race_pit_stops, by_pits = pits[pits != 0], groups.select(pits != 0)
+
+    pit_times, pit_groups = [], []
+    for group, times in zip(row_groups, c["pit_times"]):
+        if times:
+            for t in times.split(','):
+                pit_times.append(int(t) / 1000)
+                pit_groups.append(group)
+
+    pit_times = stats.array(pit_times, backend)
+    by_pit_time = groups.regroup(pit_groups)
+    pit_iqrs = by_pit_time.iqr(pit_times)
+    pit_thresholds = [median + 3.0 * iqr for median, iqr in zip(by_pit_time.median(pit_times), pit_iqrs)]
+    problematic = pit_times > stats.array([pit_thresholds[i] for i in pit_groups], backend)
+
+    columns = {
+        "races": groups.size(),
+        "finished": groups.count(finished),
+        "gains": groups.count(finished & started & (finish < start)),
+        "losses": groups.count(finished & started & (finish > start)),
+        # Old records don't have q1, q2, q3
+        "q3": groups.count(c["q3"] != 0),
+        "wins": groups.count(finish == 1),
+        "podiums": groups.count(finished & (finish <= 3)),
+        "score_finishes": groups.count(finished & (finish <= 10)),
+        "fastest_laps": groups.total(c["is_fastest"]),
+        "poles": groups.total(c["is_pole"]),
+        "penalties": groups.count(stats.array([bool(p) for p in c["penalty"]], backend)),
+
+        "avg_finish_position": by_finish.mean(finish_positions),
+        "avg_grid_position": by_grid.mean(grid_positions),
+        "avg_gained_positions": by_gained.mean(gained_positions),
+        "avg_race_pit_stops": by_pits.mean(race_pit_stops),
+        "median_grid_position": by_grid.median(grid_positions),
+        "mode_grid_position": by_grid.mode(grid_positions),
+        "median_finish_position": by_finish.median(finish_positions),
+        "mode_finish_position": by_finish.mode(finish_positions),
+        "finish_pos_std": by_finish.stdev(finish_positions),
+        "pts_volatility": groups.stdev(c["pts_made"]),
+
+        "pit_avg": by_pit_time.mean(pit_times),
+        "pit_iqr": pit_iqrs,
+        "pit_problematic": by_pit_time.count(problematic),
+
+        "longest_win_streak": groups.longest_run(finish == 1),
+        "longest_pod_streak": groups.longest_run(finished & (finish <= 3)),
+        "longest_pts_streak": groups.longest_run(finished & (finish <= 10)),
+    }
+
+    season_pts = [{} for _ in range(groups.n)]
+    season_team_pts = [{} for _ in range(groups.n)]
+    season_pts_pos = [{} for _ in range(groups.n)]
+
+    for group, year, pts, team_pts, pts_pos in zip(
+        row_groups, c["year"], c["pts_after_race"], c["team_pts_after_race"], c["pts_pos_after"]
+    ):
+        season_pts[group][year] = ifnone(pts, 0)
+        season_team_pts[group][year] = ifnone(team_pts, 0)
+        season_pts_pos[group][year] = pts_pos
+
+    nfs = [{
+        "DNF": [0, [], []], # N, gp, reasons
+        "DNS": [0, [], []],
+        "DSQ": [0, [], []],
+        "NC":  [0, [], []]
+    } for _ in range(groups.n)]
+
+    for i in stats.indices(~finished):
+        nf = nfs[row_groups[i]].setdefault(c["finish_text"][i], [0, [], []])
+        nf[0] += 1
+        nf[1].append(c["gp"][i])
+        nf[2].append(c["reason_retired"][i])
+
+    overviews = {}
+
+    for i, group in enumerate(groups.keys):
+        v = {name: values[i] for name, values in columns.items()}
+        races = v["races"]
+
+        total = {
+            name: v[name] for name in (
+                "gains", "losses", "q3", "races", "finished", "wins", "podiums",
+                "score_finishes", "fastest_laps", "poles", "penalties"
+            )
+        }
+        total["q1_q2_elim"] = races - total["q3"]
+        total["pts"] = sum(season_pts[i].values())
+        total["team_pts"] = sum(season_team_pts[i].values())
+
+        not_finished = races - total["finished"]
+        no_pos_change = total["finished"] - total["gains"] - total["losses"]
+
+        overviews[group] = {
+            "total": total,
+            "nfs": nfs[i],
+            "seasons": len(season_pts[i]),
+            "season_pts_pos": season_pts_pos[i],
+
+            "pole_conversion": ratio(total["poles"], total["q3"]),
+            "finish_rate": ratio(total["finished"], races),
+            "pts_per_race": ratio(total["pts"], races),
+            "win_rate": ratio(total["wins"], races),
+            "podium_rate": ratio(total["podiums"], races),
+            "scoring_rate": ratio(total["score_finishes"], races),
+            "pole_rate": ratio(total["poles"], races),
+            "fastest_lap_rate": ratio(total["fastest_laps"], races),
+            "not_finished": not_finished,
+            "not_finished_rate": ratio(not_finished, races),
+            "q1_q2_elim_rate": ratio(total["q1_q2_elim"], races),
+
+            "avg_finish_position": v["avg_finish_position"],
+            "avg_grid_position": v["avg_grid_position"],
+            "avg_gained_positions": v["avg_gained_positions"],
+            "avg_race_pit_stops": v["avg_race_pit_stops"],
+
+            "median_grid_position": v["median_grid_position"],
+            "mode_grid_position": v["mode_grid_position"],
+            "median_finish_position": v["median_finish_position"],
+            "mode_finish_position": v["mode_finish_position"],
+
+            "avg_points_when_scoring": ratio(total["pts"], total["score_finishes"]),
+            "pct_gain": ratio(total["gains"], total["finished"]),
+            "pct_loss": ratio(total["losses"], total["finished"]),
+            "pct_no_change": ratio(no_pos_change, total["finished"]),
+
+            "finish_pos_cv": ratio(v["finish_pos_std"], v["avg_finish_position"]),
+            "pts_volatility": v["pts_volatility"],
+            "points_share": ratio(total["pts"], total["team_pts"]),
+
+            "pits": {"avg": v["pit_avg"], "iqr": v["pit_iqr"], "problematic": v["pit_problematic"]},
+            "longest_win_streak": v["longest_win_streak"],
+            "longest_pod_streak": v["longest_pod_streak"],
+            "longest_pts_streak": v["longest_pts_streak"],
+        }
+
+    return overviews
+
+def overview_stats(c: dict[str, Any]) -> dict[str, Any]:
+    return overview_stats_by(c)[None]
+
+def best_standing(s: dict[str, Any]) -> int | None:
+    # Championship position of a single season, the best one over several
+    positions = s["season_pts_pos"]
+
+    if s["seasons"] == 1:
+        return next(iter(positions.values()))
+
+    return min((p for p in positions.values() if p), default=None)
+
+def overview_record(s: dict[str, Any]) -> dict[str, Any]:
+    # An overview as one flat record, for the machine readable formats
+    record = dict(s["total"])
+    record["pts_pos"] = best_standing(s)
+
+    for name, value in s.items():
+        if name not in ("total", "nfs", "season_pts_pos", "pits"):
+            record[name] = value
+
+    for name, value in s["pits"].items():
+        record[f"pit_{name}"] = value
+
+    for nf, (n, gps, reasons) in s["nfs"].items():
+        record[nf.lower()] = n
+        record[f"{nf.lower()}_races"] = "; ".join(f"{gp} - {reason}" for gp, reason in zip(gps, reasons))
+
+    return record
+
+def print_overview(title: str, s: dict[str, Any]):
+    total = s["total"]
+    pos = best_standing(s)
+
+    if s["seasons"] == 1:
+        standing = f"{pos} place"
+    else:
+        standing = f"best: {pos} place" if pos else "not classified"
+
+    print(f"\n{title}")
+    print("-" * 50)
+    print(f"Races: {total["races"]}  Finished: {total["finished"]}  Not finished/started: {s["not_finished"]}  (rate: {s["not_finished_rate"]:.1%})\n")
+
+    print("Points")
+    print(f"- Total pts: {total["pts"]} pts ({standing})")
+    print(f"- Team pts share: {s["points_share"]:.2%}")
+    print(f"- Pts per race: {s["pts_per_race"]:.2f} pts")
+    print(f"- Avg pts when scoring: {s["avg_points_when_scoring"]:.2f} pts")
+    print(f"- Points volatility (std): {s["pts_volatility"]:.2f} pts\n")
+
+    print("Qualifying & starts")
+    print(f"- Poles: {total["poles"]}  (Pole rate: {s["pole_rate"]:.1%})")
+    print(f"- Q1, Q2 eliminations: {total["q1_q2_elim"]} (rate: {s["q1_q2_elim_rate"]:.1%})")
+    if total["q3"]:
+        print(f"- Q3 appearances: {total["q3"]}")
+        print(f"- Pole conversion (poles / Q3s): {s["pole_conversion"]:.1%}")
+    print(f"- Avg grid position: {s["avg_grid_position"]:.2f}")
+    print(f"- Median grid position: {s["median_grid_position"]:.2f}")
+    print(f"- Most common grid position: {s["mode_grid_position"]}")
+    print(f"- Penalties: {total["penalties"]}\n")
+
+    print("Results & rates")
+    print(f"- Wins: {total["wins"]}  (Win rate: {s["win_rate"]:.1%})")
+    print(f"- Podiums: {total["podiums"]}  (Podium rate: {s["podium_rate"]:.1%})")
+    print(f"- Scoring finishes: {total["score_finishes"]}  (Scoring rate: {s["scoring_rate"]:.1%})")
+    print(f"- Fastest laps: {total["fastest_laps"]}  (Fastest-lap rate: {s["fastest_lap_rate"]:.1%})")
+    print(f"- Finish rate: {s["finish_rate"]:.1%}")
+    print(f"- Avg finish position: {s["avg_finish_position"]:.2f}")
+    print(f"- Median finish position: {s["median_finish_position"]:.2f}")
+    print(f"- Most common finish position: {s["mode_finish_position"]}")
+    print(f"- Finish position CV (coefficient of variation): {s["finish_pos_cv"]:.3f}\n")
+
+    print("Pit stops & strategy")
+    print(f"- Avg pit stops per race: {s["avg_race_pit_stops"]:.2f}")
+    print(f"- Avg pit stops time: {s["pits"]["avg"]:.2f}s")
+    print(f"- Pit stop time IQR: {s["pits"]["iqr"]:.2f}s")
+    print(f"- Problematic pit stops: {s["pits"]["problematic"]}\n")
+
+    print("Not started/finished/classified, disqualified: ")
+    nfs = s["nfs"]
+    for nf in sorted(nfs, key=lambda k: nfs[k][0], reverse=True):
+        n, gps, reasons = nfs[nf]
+        rate = ratio(n, total["races"])
+        print(f"- {nf}: {n} ({rate:.1%})")
+
+        for i in range(n): print(f"  * {gps[i]} - {reasons[i]}")
+    print()
+
+    print("Race progress")
+    print(f"- Avg positions gained per race: {s["avg_gained_positions"]:.2f}")
+    print(f"- % races net gain: {s["pct_gain"]:.1%}")
+    print(f"- % races net loss: {s["pct_loss"]:.1%}")
+    print(f"- % races no change: {s["pct_no_change"]:.1%}")
+    print(f"- Longest podium streak: {s["longest_pod_streak"]}")
+    print(f"- Longest win streak: {s["longest_win_streak"]}")
+    print(f"- Longest points streak: {s["longest_pts_streak"]}\n")
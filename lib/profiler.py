@@ -0,0 +1,179 @@
+import sys, json, sqlite3
+
+from typing import Any, Iterator, Optional
+from time import perf_counter
+from contextlib import contextmanager, redirect_stdout
+
+from lib.tables import Table
+
+# Where a command spends its time: opening the db and the result cache, sql
+# statements, the python work on their rows and printing tables. Time always
+# goes to the innermost stage only, so rows fetched while a table streams
+# count as sql, not render, and the stages add up to the total
+class Profiler:
+    STAGES = ("connect", "sql", "post-processing", "render")
+
+    # VM instructions between progress handler calls, steps are counted in these
+    PROGRESS_STEPS = 100
+
+    # Width of statements in the summary, the json trace keeps them whole
+    SUMMARY_SQL_WIDTH = 60
+
+    def __init__(self, command: str):
+        self.command = command
+        self.statements = []
+        self.times = dict.fromkeys(self.STAGES, 0.0)
+        self.current = "post-processing"
+        self.active = None
+        self.untimed = None
+        self.start = self.mark = perf_counter()
+        self.end = None
+
+    def attach(self, con: sqlite3.Connection):
+        con.set_trace_callback(self.trace)
+        con.set_progress_handler(self.step, self.PROGRESS_STEPS)
+
+    @staticmethod
+    def detach(con: sqlite3.Connection):
+        con.set_trace_callback(None)
+        con.set_progress_handler(None, 0)
+
+    @contextmanager
+    def counting(self, con: sqlite3.Connection) -> Iterator[dict[str, int]]:
+        # VM steps of a statement on a reader thread's connection, counted
+        # on their own: the active record belongs to the main thread
+        counted = {"vm_steps": 0}
+
+        def step() -> int:
+            counted["vm_steps"] += self.PROGRESS_STEPS
+            return 0
+
+        con.set_progress_handler(step, self.PROGRESS_STEPS)
+
+        try:
+            yield counted
+        finally:
+            con.set_progress_handler(None, 0)
+
+    def switch(self, stage: str) -> str:
+        now = perf_counter()
+        self.times[self.current] += now - self.mark
+        self.mark = now
+
+        previous, self.current = self.current, stage
+        return previous
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        previous = self.switch(name)
+
+        try:
+            yield
+        finally:
+            self.switch(previous)
+
+    def record(self, sql: str, script: Optional[str] = None) -> dict[str, Any]:
+        record = {
+            "script": script,
+            "sql": sql,
+            "wall_ms": 0.0,
+            "rows": 0,
+            "vm_steps": 0,
+            "cached": False,
+        }
+
+        self.statements.append(record)
+        self.untimed = None
+        return record
+
+    @contextmanager
+    def running(self, record: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        # May be entered again for the same record, say once per streamed batch
+        previous, self.active = self.active, record
+        start = perf_counter()
+
+        try:
+            with self.stage("sql"):
+                yield record
+        finally:
+            record["wall_ms"] += (perf_counter() - start) * 1000
+            self.active = previous
+
+    def trace(self, sql: str):
+        # Bound parameters are expanded by sqlite. Statements run outside
+        # F1DB.query (pragmas, version checks, optimize) get an untimed record
+        if sql.startswith("--"): # Run by sqlite itself, say for an fts5 table
+            return
+
+        if self.active is not None:
+            self.active["sql"] = sql
+            return
+
+        self.untimed = self.record(sql)
+        self.untimed["wall_ms"] = self.untimed["rows"] = None
+
+    def step(self) -> int:
+        record = self.active or self.untimed
+
+        if record is not None:
+            record["vm_steps"] += self.PROGRESS_STEPS
+
+        return 0 # Non zero would interrupt the statement
+
+    def stop(self):
+        if self.end is None:
+            self.switch(self.current)
+            self.end = perf_counter()
+
+    def total_ms(self) -> float:
+        return ((self.end or perf_counter()) - self.start) * 1000
+
+    def trace_data(self) -> dict[str, Any]:
+        return {
+            "command": self.command,
+            "total_ms": self.total_ms(),
+            "stages_ms": {stage: t * 1000 for stage, t in self.times.items()},
+            "vm_steps_resolution": self.PROGRESS_STEPS,
+            "statements": self.statements,
+        }
+
+    def write_trace(self, file: str):
+        with open(file, 'w') as f:
+            json.dump(self.trace_data(), f, indent=2)
+
+    def summary_sql(self, record: dict[str, Any]) -> str:
+        if record["script"]:
+            return record["script"]
+
+        sql = ' '.join(record["sql"].split())
+
+        if len(sql) > self.SUMMARY_SQL_WIDTH:
+            sql = sql[:self.SUMMARY_SQL_WIDTH - 3] + "..."
+
+        return sql
+
+    def print_summary(self, file=None):
+        timed = [r for r in self.statements if r["wall_ms"] is not None]
+        rows = sum(r["rows"] for r in timed)
+        steps = sum(r["vm_steps"] for r in self.statements)
+
+        table = Table("left", False, False)
+        table.headers = ["statement", "ms", "rows", "vm steps", "cached"]
+
+        for r in self.statements:
+            timed_ms = "-" if r["wall_ms"] is None else f"{r["wall_ms"]:.2f}"
+            table.add_row([
+                self.summary_sql(r), timed_ms, r["rows"], r["vm_steps"], "yes" if r["cached"] else None
+            ])
+
+        with redirect_stdout(file or sys.stderr):
+            print(f"\nProfile: {self.command}, {self.total_ms():.2f} ms")
+
+            for stage, t in self.times.items():
+                print(f"- {stage}: {t * 1000:.2f} ms")
+
+            print(f"{len(timed)} statements ({len(self.statements) - len(timed)} untimed), "
+                  f"{rows} rows, ~{steps} vm steps")
+
+            if self.statements:
+                table.flush()
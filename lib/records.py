@@ -0,0 +1,72 @@
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from lib.snapshot import Snapshot
+
+# What records totals counts and streaks look for in race results. Apart
+# from the snapshot kernel, so the cli lists them without loading it
+RECORD_KINDS = ("win", "podium", "points", "pole", "fastest-lap", "finish")
+
+RECORD_COLUMNS = (
+    "position_number", "race_points", "race_pole_position", "race_fastest_lap"
+)
+
+def total_value(total: float) -> float:
+    # Same as sql/records-totals.sql: whole numbers as int, the rest to 2 decimals
+    return int(total) if total == int(total) else round(total, 2)
+
+def snapshot_totals(
+    snapshot: "Snapshot",
+    kind: str,
+    names: dict[str, str],
+    limit=-1,
+    backend: Optional[str] = None
+) -> list[list[Any]]:
+    # sql/records-totals.sql over the snapshot columns: rank, driver, total, races
+    from lib import stats
+    from lib.snapshot import NULL_VALUE, as_array
+
+    column = lambda name: as_array(snapshot.column("race_data", name), backend)
+
+    results = column("type") == snapshot.code("race_data", "type", "RACE_RESULT")
+    c = {name: column(name)[results] for name in RECORD_COLUMNS}
+    groups = stats.Groups.coded(
+        snapshot.dictionary("race_data", "driver_id"), column("driver_id")[results], backend
+    )
+
+    pos = c["position_number"]
+
+    match kind:
+        case "win":
+            values = pos == 1
+        case "podium":
+            values = (pos >= 1) & (pos <= 3)
+        case "pole":
+            values = c["race_pole_position"] == 1
+        case "fastest-lap":
+            values = c["race_fastest_lap"] == 1
+        case "finish":
+            values = pos != NULL_VALUE
+        case "points":
+            scored = c["race_points"] != NULL_VALUE
+            values = None
+            totals = [cents / 100 for cents in groups.select(scored).total(c["race_points"][scored])]
+        case _:
+            raise ValueError(f"Unknown record kind: {kind}")
+
+    if values is not None:
+        totals = groups.count(values)
+
+    rows = sorted(
+        (-total, races, names.get(driver, driver))
+        for driver, total, races in zip(groups.keys, totals, groups.size())
+        if total > 0
+    )
+
+    if limit >= 0:
+        rows = rows[:limit]
+
+    return [
+        [rank, driver, total_value(-total), races]
+        for rank, (total, races, driver) in enumerate(rows, start=1)
+    ]
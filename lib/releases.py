@@ -0,0 +1,118 @@
+import os, time, shutil, sqlite3
+
+from typing import Optional
+
+# Every update writes a new data/releases/<version>/f1db.db, data/current
+# names the one in use. A release is never written once it's current, so
+# readers that resolved it keep a consistent snapshot, while the pointer
+# itself is swapped atomically by a rename
+
+DB_NAME = "f1db.db"
+KEEP_RELEASES = 3
+
+class Releases:
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.releases_dir = os.path.join(data_dir, "releases")
+        self.pointer = os.path.join(data_dir, "current")
+
+    def current(self) -> Optional[str]:
+        try:
+            with open(self.pointer) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def db_file(self, version: Optional[str] = None) -> str:
+        # Before the first release the db is data/f1db.db, as install used to leave it
+        version = version or self.current()
+
+        if version is None:
+            return os.path.join(self.data_dir, DB_NAME)
+
+        return os.path.join(self.releases_dir, version, DB_NAME)
+
+    def versions(self) -> list[str]:
+        if not os.path.isdir(self.releases_dir):
+            return []
+
+        return sorted(
+            name for name in os.listdir(self.releases_dir)
+            if not name.startswith('.') and os.path.isdir(os.path.join(self.releases_dir, name))
+        )
+
+    def stage(self) -> tuple[str, str]:
+        # A hidden directory for the release being made, published by rename
+        version = time.strftime("%Y%m%d-%H%M%S")
+        versions = set(self.versions())
+        n = 1
+
+        while version in versions:
+            n += 1
+            version = f"{time.strftime("%Y%m%d-%H%M%S")}-{n}"
+
+        staging_dir = os.path.join(self.releases_dir, f".{version}")
+        os.makedirs(staging_dir)
+        return version, staging_dir
+
+    @staticmethod
+    def check(db_file: str):
+        con = sqlite3.connect(db_file)
+
+        try:
+            result = [row[0] for row in con.execute("PRAGMA integrity_check")]
+            has_races = con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'race'"
+            ).fetchone()
+        finally:
+            con.close()
+
+        if result != ["ok"]:
+            raise ValueError(f"Integrity check failed for {db_file}: {"; ".join(result[:5])}")
+
+        if not has_races:
+            raise ValueError(f"Not an f1db release: {db_file}")
+
+    def publish(self, version: str, staging_dir: str):
+        self.check(os.path.join(staging_dir, DB_NAME))
+        os.rename(staging_dir, os.path.join(self.releases_dir, version))
+
+        tmp = self.pointer + ".tmp"
+
+        with open(tmp, 'w') as f:
+            f.write(version + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, self.pointer)
+
+    def discard(self, staging_dir: str):
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def prune(self, keep: int = KEEP_RELEASES, previous: Optional[str] = None) -> list[str]:
+        # The newest releases stay, the current one whatever its age, and the
+        # one it just replaced: a reader may have resolved that one and not
+        # opened it yet. previous is None when it was the db of before releases
+        current = self.current()
+
+        if current is None:
+            return []
+
+        pruned = [v for v in self.versions()[:-max(keep, 1)] if v not in (current, previous)]
+
+        for version in pruned:
+            shutil.rmtree(os.path.join(self.releases_dir, version), ignore_errors=True)
+
+        if previous is None:
+            return pruned
+
+        # The db of before releases, copied into the first one and replaced
+        # since, and the files kept next to it
+        for name in (DB_NAME, "cache.db", "f1db.snapshot"):
+            legacy = os.path.join(self.data_dir, name)
+
+            if os.path.exists(legacy):
+                os.remove(legacy)
+                pruned.append(legacy)
+
+        return pruned
@@ -0,0 +1,41 @@
+import os, sqlite3
+
+class ScriptRegistry:
+    def __init__(self, scripts_dir: str):
+        self.scripts_dir = scripts_dir
+        self.scripts: dict[str, str] = {}
+
+        for file in sorted(os.listdir(scripts_dir)):
+            name, ext = os.path.splitext(file)
+            path = os.path.join(scripts_dir, file)
+
+            if ext != ".sql" or not os.path.isfile(path):
+                continue
+
+            self.scripts[name] = self._load(path)
+
+    def _load(self, path: str) -> str:
+        with open(path) as s:
+            sql = s.read().strip()
+
+        # complete_statement() only needs the trailing semicolon,
+        # scripts in sql/ are written without one
+        if not sql or not sqlite3.complete_statement(sql.rstrip(';') + ';'):
+            raise ValueError(f"Invalid sql script: {path}")
+
+        return sql
+
+    def __getitem__(self, name: str) -> str:
+        try:
+            return self.scripts[name]
+        except KeyError:
+            raise KeyError(f"Unknown sql script: {name}") from None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.scripts
+
+    def __len__(self) -> int:
+        return len(self.scripts)
+
+    def names(self) -> list[str]:
+        return list(self.scripts)
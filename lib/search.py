@@ -0,0 +1,49 @@
+from typing import Any, Optional
+
+# Tables db --search may look into, with the f1_stats_search kind of each
+SEARCH_TABLES = ("driver", "constructor", "circuit", "grand_prix")
+
+# Columns of f1_stats_search (sql/derived/20-search.sql) a search may be limited to
+INDEXED_COLUMNS = ("id", "name", "full_name", "abbreviation")
+
+MATCHES = ("exact", "prefix", "contains", "fuzzy")
+
+# Share of the query trigrams a fuzzy match must have in one of its columns
+FUZZY_MIN_SIMILARITY = 0.4
+
+def trigrams(text: str) -> set[str]:
+    text = text.lower()
+    return {text[i:i+3] for i in range(len(text) - 2)}
+
+def phrase(text: str) -> str:
+    # fts5 string, the trigram tokenizer matches it as a substring
+    return '"' + text.replace('"', '""') + '"'
+
+def fuzzy_query(part: str) -> str:
+    # Any of the trigrams, rows sharing more of them rank higher
+    grams = sorted(trigrams(part))
+    return " OR ".join(phrase(g) for g in grams) if grams else phrase(part)
+
+def like_escape(text: str) -> str:
+    return text.replace('\\', "\\\\").replace('%', "\\%").replace('_', "\\_")
+
+def search_params(part: str, kind: Optional[str] = None) -> dict[str, Any]:
+    part = part.lower()
+
+    return {
+        "part": part,
+        "query": fuzzy_query(part),
+        "prefix": like_escape(part) + '%',
+        "contains": '%' + like_escape(part) + '%',
+        "kind": kind,
+    }
+
+def similarity(part: str, values: tuple[Optional[str], ...]) -> float:
+    # Share of the part trigrams found in the closest of values
+    grams = trigrams(part)
+    values = [v for v in values if v]
+
+    if not grams or not values:
+        return float(not grams)
+
+    return max(len(grams & trigrams(v)) / len(grams) for v in values)
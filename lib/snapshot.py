@@ -0,0 +1,171 @@
+import os, json, mmap, struct, sqlite3
+
+from array import array
+from typing import Any, Optional
+
+# Columnar copy of race_data and race for scans over the whole history,
+# written next to the db by optimize. Every column is an int32 buffer: ids
+# and other text are codes into a dictionary of the column, decimals are
+# scaled to integers and NULL is NULL_VALUE. Buffers are 8 byte aligned in
+# one file, so loading maps it and hands out memoryviews over the mapping
+# (numpy.frombuffer takes them as they are), nothing is copied
+
+SNAPSHOT_NAME = "f1db.snapshot"
+MAGIC = b"F1SNAP01"
+NULL_VALUE = -2**31
+
+# Header: magic, then the length of the json that follows
+PREAMBLE = struct.Struct("<8sQ")
+
+# column: encoding, "int" as is, "text" dictionary codes, "cents" decimals * 100
+SNAPSHOT_TABLES = {
+    "race": {
+        "id": "int",
+        "year": "int",
+        "round": "int",
+        "grand_prix_id": "text",
+        "circuit_id": "text",
+    },
+    "race_data": {
+        "race_id": "int",
+        "type": "text",
+        "position_number": "int",
+        "driver_id": "text",
+        "constructor_id": "text",
+        "race_points": "cents",
+        "race_pole_position": "int",
+        "race_fastest_lap": "int",
+        "race_grid_position_number": "int",
+        "race_laps": "int",
+        "race_time_millis": "int",
+        "fastest_lap_time_millis": "int",
+        "qualifying_time_millis": "int",
+        "pit_stop_lap": "int",
+        "pit_stop_time_millis": "int",
+    },
+}
+
+def db_fingerprint(db_file: str) -> str:
+    # A snapshot belongs to one state of the db file, no sqlite needed to tell
+    stat = os.stat(db_file)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def encode(values: tuple, encoding: str) -> tuple[array, list[str] | None]:
+    if encoding == "text":
+        codes = {}
+        column = array('i', (
+            NULL_VALUE if v is None else codes.setdefault(v, len(codes)) for v in values
+        ))
+        return column, list(codes)
+
+    if encoding == "cents":
+        return array('i', (NULL_VALUE if v is None else round(v * 100) for v in values)), None
+
+    return array('i', (NULL_VALUE if v is None else int(v) for v in values)), None
+
+def build_snapshot(con: sqlite3.Connection, file: str, fingerprint: str):
+    header = {"fingerprint": fingerprint, "tables": {}}
+    buffers = []
+    offset = 0
+
+    for table, columns in SNAPSHOT_TABLES.items():
+        # Columns a release doesn't have are left out
+        present = {row[0] for row in con.execute("SELECT name FROM pragma_table_info(?)", [table])}
+        names = [name for name in columns if name in present]
+        rows = con.execute(f"SELECT {", ".join(names)} FROM {table} ORDER BY rowid").fetchall()
+        values = list(zip(*rows)) or [()] * len(names)
+        header["tables"][table] = {"rows": len(rows), "columns": {}}
+
+        for name, column_values in zip(names, values):
+            column, dictionary = encode(column_values, columns[name])
+            data = column.tobytes()
+
+            header["tables"][table]["columns"][name] = {
+                "offset": offset,
+                "encoding": columns[name],
+                "dictionary": dictionary,
+            }
+
+            buffers.append(data + bytes(-len(data) % 8))
+            offset += len(buffers[-1])
+
+    meta = json.dumps(header).encode()
+    meta += b' ' * (-(PREAMBLE.size + len(meta)) % 8)
+
+    # Written aside and renamed, a reader never maps half a file
+    tmp = file + ".tmp"
+
+    with open(tmp, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, len(meta)))
+        f.write(meta)
+
+        for data in buffers:
+            f.write(data)
+
+    os.replace(tmp, file)
+
+class Snapshot:
+    def __init__(self, file: str):
+        with open(file, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, size = PREAMBLE.unpack_from(self.mm)
+
+        if magic != MAGIC:
+            self.mm.close()
+            raise ValueError(f"Not a snapshot: {file}")
+
+        self.header = json.loads(self.mm[PREAMBLE.size:PREAMBLE.size + size])
+        self.fingerprint = self.header["fingerprint"]
+        self.data_start = PREAMBLE.size + size
+        self.view = memoryview(self.mm)
+        self.codes = {}
+
+    def rows(self, table: str) -> int:
+        return self.header["tables"][table]["rows"]
+
+    def has(self, table: str, name: str) -> bool:
+        return name in self.header["tables"][table]["columns"]
+
+    def column(self, table: str, name: str) -> memoryview:
+        # int32 values, a view into the mapping
+        meta = self.header["tables"][table]["columns"][name]
+        start = self.data_start + meta["offset"]
+        return self.view[start:start + self.rows(table) * 4].cast('i')
+
+    def dictionary(self, table: str, name: str) -> list[str]:
+        return self.header["tables"][table]["columns"][name]["dictionary"]
+
+    def code(self, table: str, name: str, value: str) -> Optional[int]:
+        key = (table, name)
+
+        if key not in self.codes:
+            self.codes[key] = {v: i for i, v in enumerate(self.dictionary(table, name))}
+
+        return self.codes[key].get(value)
+
+    def close(self):
+        self.view.release()
+        self.mm.close()
+
+def load_snapshot(file: str, fingerprint: str) -> Optional[Snapshot]:
+    # None when there is no snapshot or it was made from another state of the db
+    try:
+        snapshot = Snapshot(file)
+    except (OSError, ValueError):
+        return None
+
+    if snapshot.fingerprint != fingerprint:
+        snapshot.close()
+        return None
+
+    return snapshot
+
+def as_array(column: memoryview, backend: Optional[str] = None) -> Any:
+    # A numpy array over the same memory, or a stats.Column copy without numpy
+    from lib import stats
+
+    if (backend or stats.BACKEND) == "numpy":
+        return stats.load_numpy().frombuffer(column, dtype="int32")
+
+    return stats.Column(column.tolist())
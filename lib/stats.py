@@ -0,0 +1,276 @@
+import operator, statistics
+
+from typing import Any, Iterable, Sequence
+from itertools import compress, groupby
+from importlib.util import find_spec
+
+# numpy is optional, the pure python kernel gives the same results. It takes
+# a while to import, so that only happens once a numpy column is made
+np = None
+
+BACKENDS = ("numpy", "python") if find_spec("numpy") is not None else ("python",)
+BACKEND = BACKENDS[0]
+
+def load_numpy():
+    global np
+
+    if np is None:
+        import numpy as np
+
+    return np
+
+# Pure python stand-in for a numpy array: element-wise operators, boolean
+# masks as indices, so the same expressions run on both backends
+class Column(list):
+    def _map(self, other, op) -> "Column":
+        if isinstance(other, list):
+            return Column(map(op, self, other))
+
+        return Column(op(value, other) for value in self)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return Column(super().__getitem__(key))
+
+        if isinstance(key, list):
+            return Column(compress(self, key))
+
+        return super().__getitem__(key)
+
+    def __eq__(self, other): return self._map(other, operator.eq)
+    def __ne__(self, other): return self._map(other, operator.ne)
+    def __lt__(self, other): return self._map(other, operator.lt)
+    def __le__(self, other): return self._map(other, operator.le)
+    def __gt__(self, other): return self._map(other, operator.gt)
+    def __ge__(self, other): return self._map(other, operator.ge)
+    def __and__(self, other): return self._map(other, operator.and_)
+    def __or__(self, other): return self._map(other, operator.or_)
+    def __add__(self, other): return self._map(other, operator.add)
+    def __sub__(self, other): return self._map(other, operator.sub)
+    def __invert__(self): return Column(not value for value in self)
+
+    __hash__ = None
+
+def is_numpy(col) -> bool:
+    return np is not None and isinstance(col, np.ndarray)
+
+def array(values: Iterable, backend: str | None = None):
+    # Missing values count as 0, like ifnone(value, 0) in a per row loop
+    values = [0 if v is None else v for v in values]
+
+    if (backend or BACKEND) == "numpy":
+        return load_numpy().asarray(values)
+
+    return Column(values)
+
+def columns(
+    rows: Sequence[tuple],
+    names: Sequence[str],
+    numeric: Iterable[str] = (),
+    backend: str | None = None
+) -> dict[str, Any]:
+    # Transposes rows once, numeric columns become arrays, the rest plain lists
+    numeric = set(numeric)
+    values = list(zip(*rows)) or [()] * len(names)
+
+    return {
+        name: array(col, backend) if name in numeric else list(col)
+        for name, col in zip(names, values)
+    }
+
+def where(mask, a, b):
+    if is_numpy(mask):
+        return np.where(mask, a, b)
+
+    return Column(x if m else y for m, x, y in zip(mask, a, b))
+
+def indices(mask) -> list[int]:
+    if is_numpy(mask):
+        return np.flatnonzero(mask).tolist()
+
+    return [i for i, m in enumerate(mask) if m]
+
+
+# Rows split into groups by a key column, say one group per driver. Every
+# reduction runs for all groups at once and returns one value per group, in
+# order of first appearance of the keys
+class Groups:
+    def __init__(self, keys: Sequence, backend: str | None = None):
+        index = {}
+        ids = [index.setdefault(key, len(index)) for key in keys]
+
+        self.keys = list(index)
+        self.n = len(self.keys)
+        self.backend = backend or BACKEND
+        self.ids = self.id_array(ids)
+
+    @staticmethod
+    def coded(keys: Sequence, ids, backend: str | None = None) -> "Groups":
+        # Rows already coded, say a dictionary encoded column: ids index keys
+        groups = Groups((), backend)
+        groups.keys = list(keys)
+        groups.n = len(groups.keys)
+        groups.ids = ids
+        return groups
+
+    def id_array(self, ids: Sequence[int]):
+        if self.backend == "numpy":
+            numpy = load_numpy()
+            return numpy.asarray(ids, dtype=numpy.int64)
+
+        return Column(ids)
+
+    def regroup(self, ids: Sequence[int]) -> "Groups":
+        # Same groups over other rows, ids are the group index of each row
+        groups = Groups((), self.backend)
+        groups.keys = self.keys
+        groups.n = self.n
+        groups.ids = self.id_array(ids)
+        return groups
+
+    def select(self, mask) -> "Groups":
+        # Only the rows in mask, to reduce a column filtered by it
+        return self.regroup(self.ids[mask])
+
+    def split(self, col) -> list[list]:
+        parts = [[] for _ in range(self.n)]
+        ids = self.ids.tolist() if is_numpy(self.ids) else self.ids
+
+        for i, value in zip(ids, col):
+            parts[i].append(value)
+
+        return parts
+
+    def size(self) -> list[int]:
+        if is_numpy(self.ids):
+            return self.sizes().tolist()
+
+        return [len(part) for part in self.split(self.ids)]
+
+    def sizes(self):
+        return np.bincount(self.ids, minlength=self.n)
+
+    def starts(self, sizes):
+        return np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    def sorted(self, col):
+        # Values ordered by group then value, the sort is stable
+        order = np.lexsort((col, self.ids))
+        return col[order], order
+
+    def count(self, mask) -> list[int]:
+        if is_numpy(mask):
+            return np.bincount(self.ids, weights=mask, minlength=self.n).astype(np.int64).tolist()
+
+        return [sum(1 for m in part if m) for part in self.split(mask)]
+
+    def total(self, col) -> list:
+        if is_numpy(col):
+            totals = np.bincount(self.ids, weights=col, minlength=self.n)
+
+            if col.dtype.kind in "iub":
+                totals = totals.astype(np.int64)
+
+            return totals.tolist()
+
+        return [sum(part) for part in self.split(col)]
+
+    def mean(self, col) -> list[float]:
+        if is_numpy(col):
+            sizes = self.sizes()
+            totals = np.bincount(self.ids, weights=col, minlength=self.n)
+            return np.divide(totals, sizes, out=np.zeros(self.n), where=sizes > 0).tolist()
+
+        return [statistics.mean(part) if part else 0 for part in self.split(col)]
+
+    def stdev(self, col) -> list[float]:
+        # Sample standard deviation
+        if is_numpy(col):
+            sizes = self.sizes()
+            means = np.bincount(self.ids, weights=col, minlength=self.n) / np.maximum(sizes, 1)
+            squares = np.bincount(self.ids, weights=(col - means[self.ids]) ** 2, minlength=self.n)
+            variance = np.divide(squares, sizes - 1, out=np.zeros(self.n), where=sizes > 1)
+            return np.sqrt(variance).tolist()
+
+        return [statistics.stdev(part) if len(part) > 1 else 0 for part in self.split(col)]
+
+    def median(self, col) -> list[float]:
+        if is_numpy(col):
+            sizes = self.sizes()
+            values, _ = self.sorted(col)
+            low = self.starts(sizes) + (sizes - 1) // 2
+            high = self.starts(sizes) + sizes // 2
+            filled = sizes > 0
+            medians = np.zeros(self.n)
+            medians[filled] = (values[low[filled]] + values[high[filled]]) / 2
+            return medians.tolist()
+
+        return [statistics.median(part) if part else 0 for part in self.split(col)]
+
+    def mode(self, col) -> list:
+        # Most common value, ties go to the value seen first as statistics.mode does
+        if is_numpy(col):
+            values, order = self.sorted(col)
+            ids = self.ids[order]
+            firsts = np.flatnonzero(np.concatenate((
+                [True], (values[1:] != values[:-1]) | (ids[1:] != ids[:-1])
+            )))
+            counts = np.diff(np.append(firsts, len(values)))
+            run_ids = ids[firsts]
+
+            best = np.lexsort((order[firsts], -counts, run_ids))
+            is_first = np.concatenate(([True], run_ids[best][1:] != run_ids[best][:-1]))
+            winners = best[is_first]
+
+            modes = [None] * self.n
+            for group, value in zip(run_ids[winners].tolist(), values[firsts[winners]].tolist()):
+                modes[group] = value
+            return modes
+
+        return [statistics.mode(part) if part else None for part in self.split(col)]
+
+    def iqr(self, col) -> list[float]:
+        # Quartiles are the low/high medians of each half, one value has no halves
+        if is_numpy(col):
+            sizes = self.sizes()
+            values, _ = self.sorted(col)
+            starts = self.starts(sizes)
+
+            lower = np.where(sizes > 1, sizes // 2, sizes)
+            upper_start = np.where(sizes > 1, (sizes + 1) // 2, 0)
+            q1 = starts + (lower - 1) // 2
+            q3 = starts + upper_start + (sizes - upper_start) // 2
+
+            filled = sizes > 0
+            iqrs = np.zeros(self.n)
+            iqrs[filled] = values[q3[filled]] - values[q1[filled]]
+            return iqrs.tolist()
+
+        iqrs = []
+
+        for part in self.split(col):
+            part.sort()
+            n = len(part)
+            lower = part[:n//2] if n > 1 else part
+            upper = part[(n+1)//2:] if n > 1 else part
+            iqrs.append(upper[len(upper) // 2] - lower[(len(lower) - 1) // 2] if part else 0)
+
+        return iqrs
+
+    def longest_run(self, mask) -> list[int]:
+        # Longest streak of consecutive rows in mask, never across groups
+        if is_numpy(mask):
+            new_group = np.concatenate(([True], self.ids[1:] != self.ids[:-1]))
+            run_starts = mask & (new_group | ~np.concatenate(([False], mask[:-1])))
+            run_ids = np.cumsum(run_starts)[mask] - 1
+
+            longest = np.zeros(self.n, dtype=np.int64)
+            if len(run_ids):
+                lengths = np.bincount(run_ids)
+                np.maximum.at(longest, self.ids[run_starts], lengths)
+            return longest.tolist()
+
+        return [
+            max((sum(1 for _ in run) for m, run in groupby(part) if m), default=0)
+            for part in self.split(mask)
+        ]
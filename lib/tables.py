@@ -1,6 +1,17 @@
-from typing import Literal, Any
+import sys
+
+from typing import Literal, Any, Iterable
+from itertools import islice, chain
+from contextlib import nullcontext
 
 Adjustment = Literal["left", "right", "center"]
+OutputFormat = Literal["table", "csv", "tsv", "jsonl"]
+
+# Lines are joined and written in batches instead of one print() per row
+WRITE_BATCH_SIZE = 512
+
+# How many leading rows a streamed table looks at to fix column widths
+STREAM_SAMPLE_SIZE = 1000
 
 def to_str(item: Any, show_nones=False):
     if item is None:
@@ -51,35 +62,36 @@ def print_headers(
         print(header_line + sep)
         print(med_separator + sep)
 
+def write_lines(lines: Iterable[str]):
+    out = sys.stdout
+    lines = iter(lines)
+
+    while batch := list(islice(lines, WRITE_BATCH_SIZE)):
+        out.write('\n'.join(batch))
+        out.write('\n')
+
 def print_rows(
-    rows: list[Any],
+    rows: Iterable[Any],
     widths: list[int],
     adjustment: str,
     show_nones=False,
     hide_delimiters=False
 ):
-    line = ""
     sep = '|' if not hide_delimiters else ' '
 
-    for row in rows:
-        for i in range(len(row)):
-            element = to_str(row[i], show_nones)
-            line += f"{sep} {adjust(element, widths[i], adjustment)} "
-
-        print(line + sep)
-        line = ""
+    write_lines(
+        ''.join(
+            f"{sep} {adjust(to_str(element, show_nones), widths[i], adjustment)} "
+            for i, element in enumerate(row)
+        ) + sep
+        for row in rows
+    )
 
-def print_table(
-    rows: list[Any],
+def column_widths(
+    rows: Iterable[Any],
     headers: list[str],
-    adjustment: Adjustment = "left",
-    hide_delimiters=False,
-    double_headers=False,
     show_nones=False
-):
-    if len(rows) and len(headers) != len(rows[0]):
-        return
-
+) -> list[int]:
     widths = [len(to_str(h, show_nones)) for h in headers]
 
     for row in rows:
@@ -89,6 +101,31 @@ def print_table(
             if widths[j] < column_len:
                 widths[j] = column_len
 
+    return widths
+
+def print_table(
+    rows: Iterable[Any],
+    headers: list[str],
+    adjustment: Adjustment = "left",
+    hide_delimiters=False,
+    double_headers=False,
+    show_nones=False,
+    sample_size=None
+):
+    # With sample_size the rows may be a lazy iterator: widths are fixed from
+    # the first sample_size rows, longer cells further down just overflow
+    if sample_size is None:
+        sample = rows
+    else:
+        rows = iter(rows)
+        sample = list(islice(rows, sample_size))
+        rows = chain(sample, rows)
+
+    if len(sample) and len(headers) != len(sample[0]):
+        return
+
+    widths = column_widths(sample, headers, show_nones)
+
     print()
     print_headers(headers, widths, adjustment, show_nones, hide_delimiters=hide_delimiters)
     print_rows(rows, widths, adjustment, show_nones, hide_delimiters)
@@ -98,13 +135,80 @@ def print_table(
     
     print()
 
+def write_records(
+    rows: Iterable[Any],
+    headers: list[str],
+    output_format: OutputFormat,
+    section: str | None = None
+):
+    # Machine readable formats need no widths, rows are written as they come
+    if output_format == "jsonl":
+        import json
+
+        # Every record says which of the tables of a command it belongs to
+        if section is not None:
+            headers = ["section"] + headers
+            rows = ([section] + list(row) for row in rows)
+
+        write_lines(
+            json.dumps(dict(zip(headers, row)), ensure_ascii=False, default=str)
+            for row in rows
+        )
+        return
+
+    import csv
+
+    dialect = "excel-tab" if output_format == "tsv" else "excel"
+    writer = csv.writer(sys.stdout, dialect, lineterminator='\n')
+    writer.writerow(headers)
+    writer.writerows(rows)
+
+def column_keys(headers: list[str]) -> list[tuple[str, int]]:
+    # Repeated names within a table are told apart by their occurrence
+    seen = {}
+    keys = []
+
+    for header in headers:
+        keys.append((header, seen.get(header, 0)))
+        seen[header] = keys[-1][1] + 1
+
+    return keys
+
+def merge_sections(
+    sections: list[tuple[str | None, list[str], list[Any]]]
+) -> tuple[list[str], list[list[Any]]]:
+    # Tables of one command as one: a section column, then every column of
+    # every table in order of appearance, left empty where a table has none
+    columns = {}
+
+    for _, headers, _ in sections:
+        for key in column_keys(headers):
+            columns.setdefault(key, len(columns))
+
+    rows = []
+
+    for i, (section, headers, table_rows) in enumerate(sections, start=1):
+        positions = [columns[key] for key in column_keys(headers)]
+
+        for row in table_rows:
+            merged = [None] * len(columns)
+
+            for position, value in zip(positions, row):
+                merged[position] = value
+
+            rows.append([section or str(i)] + merged)
+
+    return ["section"] + [name for name, _ in columns], rows
+
 class Table:
     def __init__(
         self, 
         adjustment: Adjustment,
         double_headers: bool,
         hide_delimiters: bool,
-        show_nones=False
+        show_nones=False,
+        profiler=None,
+        output_format: OutputFormat = "table"
     ):
         self.double_headers = double_headers
         self.hide_delimiters = hide_delimiters
@@ -112,21 +216,95 @@ class Table:
         self.show_nones = show_nones
         self.rows = []
         self.headers = []
+        # lib.profiler.Profiler, set while a command is profiled
+        self.profiler = profiler
+        self.output_format = output_format
+        # Names the table being filled, for commands printing several
+        self.section = None
+        # csv and tsv hold one table: those of a command are written at close
+        self.pending = []
+        self.streamed = False
+
+    @property
+    def machine_readable(self) -> bool:
+        return self.output_format != "table"
+
+    @property
+    def single_table(self) -> bool:
+        return self.output_format in ("csv", "tsv")
+
+    def rendering(self):
+        return self.profiler.stage("render") if self.profiler is not None else nullcontext()
+
+    def note(self, *values: Any):
+        # Messages around tables, kept out of machine readable streams
+        print(*values, file=sys.stderr if self.machine_readable else sys.stdout)
 
     def print(self):
-        print_table(
-            self.rows, 
-            self.headers,
-            self.adjustment,
-            self.hide_delimiters,
-            self.double_headers,
-            self.show_nones
-        )
+        with self.rendering():
+            if self.single_table:
+                return self.pending.append((self.section, self.headers, list(self.rows)))
+
+            if self.machine_readable:
+                return write_records(self.rows, self.headers, self.output_format, self.section)
+
+            print_table(
+                self.rows, 
+                self.headers,
+                self.adjustment,
+                self.hide_delimiters,
+                self.double_headers,
+                self.show_nones
+            )
 
     def flush(self):
         self.print()
         self.rows = []
         self.headers = []
+        self.section = None
+
+    def close(self):
+        # The csv or tsv tables of a command go out as one, with a section
+        # column when there are several
+        pending, self.pending = self.pending, []
+
+        if not pending:
+            return
+
+        if self.streamed:
+            return self.note(f"--format {self.output_format} holds one table, use --format jsonl for the rest")
+
+        with self.rendering():
+            if len(pending) == 1:
+                _, headers, rows = pending[0]
+            else:
+                headers, rows = merge_sections(pending)
+
+            write_records(rows, headers, self.output_format)
 
     def add_row(self, row: list[Any]):
-        self.rows.append(row)
\ No newline at end of file
+        self.rows.append(row)
+
+    def stream(
+        self,
+        rows: Iterable[Any],
+        headers: list[str],
+        sample_size=STREAM_SAMPLE_SIZE
+    ):
+        with self.rendering():
+            if self.single_table and (self.pending or self.streamed):
+                return self.pending.append((self.section, headers, list(rows)))
+
+            if self.machine_readable:
+                self.streamed = self.single_table
+                return write_records(rows, headers, self.output_format, self.section)
+
+            print_table(
+                rows,
+                headers,
+                self.adjustment,
+                self.hide_delimiters,
+                self.double_headers,
+                self.show_nones,
+                sample_size
+            )
\ No newline at end of file
@@ -0,0 +1,205 @@
+import os, re, sqlite3, zipfile
+
+from typing import NamedTuple
+from collections import defaultdict
+
+# Objects of f1_stats itself (derived tables, their indexes) and sqlite's
+# own are never part of a release, so a diff leaves them alone
+OWN_OBJECTS = "name NOT LIKE 'sqlite_%' AND name NOT LIKE 'f1_stats_%'"
+
+RELEASE_URL = "https://github.com/f1db/f1db/releases/latest/download/f1db-sqlite.zip"
+RELEASE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+class TableChange(NamedTuple):
+    table: str
+    inserted: int
+    updated: int
+    deleted: int
+    note: str = ""
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def download_release(target_dir: str) -> str:
+    from urllib.request import urlretrieve
+
+    file, _ = urlretrieve(RELEASE_URL, os.path.join(target_dir, os.path.basename(RELEASE_URL)))
+    return file
+
+def extract_release(source: str, target_dir: str) -> str:
+    # A release zip holds the db file, a plain sqlite file is used as is
+    if not zipfile.is_zipfile(source):
+        return source
+
+    with zipfile.ZipFile(source) as z:
+        members = [m for m in z.namelist() if m.endswith(RELEASE_SUFFIXES)]
+
+        if len(members) != 1:
+            raise ValueError(f"Expected one sqlite file in {source}, found: {", ".join(members) or "none"}")
+
+        return z.extract(members[0], target_dir)
+
+def schema_objects(con: sqlite3.Connection, schema: str) -> dict[str, tuple[str, str]]:
+    return {
+        name: (kind, sql) for kind, name, sql in con.execute(
+            f"SELECT type, name, sql FROM {schema}.sqlite_master WHERE {OWN_OBJECTS}"
+        )
+    }
+
+def table_columns(con: sqlite3.Connection, schema: str, table: str) -> tuple[list[str], list[str]]:
+    # All columns, and the primary key ones in key order
+    info = con.execute(
+        "SELECT name, pk FROM pragma_table_info(?, ?) ORDER BY cid", [table, schema]
+    ).fetchall()
+
+    return [name for name, _ in info], [name for name, pk in sorted(info, key=lambda c: c[1]) if pk]
+
+def copy_table(con: sqlite3.Connection, table: str, sql: str) -> TableChange:
+    t = quote(table)
+    deleted = 0
+
+    if con.execute("SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = ?", [table]).fetchone():
+        deleted, = con.execute(f"SELECT COUNT(*) FROM main.{t}").fetchone()
+        con.execute(f"DROP TABLE main.{t}")
+
+    con.execute(sql)
+    inserted = con.execute(f"INSERT INTO main.{t} SELECT * FROM release.{t}").rowcount
+    return TableChange(table, inserted, 0, deleted, "new table" if not deleted else "schema changed")
+
+def diff_table(con: sqlite3.Connection, table: str, columns: list[str], key: list[str]) -> TableChange:
+    t = quote(table)
+
+    if not key:
+        # Rows can't be matched up, the table is copied whole when it differs
+        differs = con.execute(f"""
+            SELECT EXISTS (SELECT * FROM main.{t} EXCEPT SELECT * FROM release.{t})
+                OR EXISTS (SELECT * FROM release.{t} EXCEPT SELECT * FROM main.{t})
+        """).fetchone()[0]
+
+        if not differs:
+            return TableChange(table, 0, 0, 0)
+
+        deleted = con.execute(f"DELETE FROM main.{t}").rowcount
+        inserted = con.execute(f"INSERT INTO main.{t} SELECT * FROM release.{t}").rowcount
+        return TableChange(table, inserted, 0, deleted, "no primary key, copied whole")
+
+    # Rows are matched by primary key and compared column by column, which
+    # tells the same as a row hash without reading rows into python
+    cols = ", ".join(quote(c) for c in columns)
+    same_key = " AND ".join(f"r.{quote(c)} = m.{quote(c)}" for c in key)
+    values = [c for c in columns if c not in key]
+    changed = " OR ".join(f"r.{quote(c)} IS NOT m.{quote(c)}" for c in values) or "0"
+
+    deleted = con.execute(f"""
+        DELETE FROM main.{t} AS m
+        WHERE NOT EXISTS (SELECT 1 FROM release.{t} r WHERE {same_key})
+    """).rowcount
+
+    updated = 0
+
+    if values:
+        updated = con.execute(f"""
+            UPDATE main.{t} AS m
+            SET {", ".join(f"{quote(c)} = r.{quote(c)}" for c in values)}
+            FROM release.{t} r
+            WHERE {same_key} AND ({changed})
+        """).rowcount
+
+    inserted = con.execute(f"""
+        INSERT INTO main.{t} ({cols})
+        SELECT {cols} FROM release.{t} r
+        WHERE NOT EXISTS (SELECT 1 FROM main.{t} m WHERE {same_key})
+    """).rowcount
+
+    return TableChange(table, inserted, updated, deleted)
+
+def apply_release(con: sqlite3.Connection, release_file: str) -> list[TableChange]:
+    # The db becomes the release: only rows that differ are written, all in
+    # one transaction, so readers see either the old or the new release
+    con.execute("ATTACH DATABASE ? AS release", [release_file])
+
+    try:
+        release = schema_objects(con, "release")
+        current = schema_objects(con, "main")
+
+        if "race" not in release:
+            raise ValueError(f"Not an f1db release: {release_file}")
+
+        changes = []
+        con.execute("BEGIN IMMEDIATE")
+
+        try:
+            for name, (kind, sql) in release.items():
+                if kind != "table":
+                    continue
+
+                columns, key = table_columns(con, "release", name)
+
+                if name not in current or table_columns(con, "main", name) != (columns, key):
+                    changes.append(copy_table(con, name, sql))
+                else:
+                    changes.append(diff_table(con, name, columns, key))
+
+            for name, (kind, sql) in current.items():
+                if kind == "table" and name not in release:
+                    deleted, = con.execute(f"SELECT COUNT(*) FROM main.{quote(name)}").fetchone()
+                    con.execute(f"DROP TABLE main.{quote(name)}")
+                    changes.append(TableChange(name, 0, 0, deleted, "dropped"))
+
+            # Views, indexes and triggers of the release, made again when they differ
+            current = schema_objects(con, "main")
+
+            for name, (kind, sql) in current.items():
+                if kind != "table" and release.get(name) != (kind, sql):
+                    con.execute(f"DROP {kind.upper()} IF EXISTS main.{quote(name)}")
+
+            for name, (kind, sql) in release.items():
+                if kind != "table" and sql and current.get(name) != (kind, sql):
+                    con.execute(sql)
+
+            con.commit()
+        except BaseException:
+            con.rollback()
+            raise
+    finally:
+        con.execute("DETACH DATABASE release")
+
+    return changes
+
+def referenced_tables(sql: str) -> set[str]:
+    # Tables a derived script reads or indexes, a loose match is fine: a
+    # false positive only rebuilds something that didn't need it
+    return {name.lower() for name in re.findall(r"\b(?:FROM|JOIN|ON)\s+(\w+)", sql, re.IGNORECASE)}
+
+def watch_sources(con: sqlite3.Connection, scripts: dict[str, str]):
+    # Triggers dropping derived scripts from f1_stats_derived when a table
+    # they read is written, by an update or by hand. Counts can't show an
+    # edit in place, say a DSQ, the scripts read as stale until built again
+    tables = {
+        name.lower(): name for name, in con.execute(
+            f"SELECT name FROM main.sqlite_master WHERE type = 'table' AND {OWN_OBJECTS}"
+        )
+    }
+
+    for name, in con.execute(
+        "SELECT name FROM main.sqlite_master WHERE type = 'trigger' AND name LIKE 'f1_stats_stale_%'"
+    ).fetchall():
+        con.execute(f"DROP TRIGGER main.{quote(name)}")
+
+    readers = defaultdict(list)
+
+    for script, sql in scripts.items():
+        for table in referenced_tables(sql) & tables.keys():
+            readers[table].append(script)
+
+    for table, names in sorted(readers.items()):
+        stale = ", ".join("'" + name.replace("'", "''") + "'" for name in names)
+
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            con.execute(f"""
+                CREATE TRIGGER main.{quote(f"f1_stats_stale_{table}_{event.lower()}")}
+                AFTER {event} ON {quote(tables[table])}
+                BEGIN
+                    DELETE FROM f1_stats_derived WHERE name IN ({stale});
+                END
+            """)
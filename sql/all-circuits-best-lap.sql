@@ -0,0 +1,51 @@
+WITH records AS (
+    SELECT
+        race.circuit_id,
+        ROW_NUMBER() OVER (
+            PARTITION BY race.circuit_id
+            ORDER BY fastest_lap.fastest_lap_time_millis ASC, race.year ASC, driver.name ASC
+        ) as rank,
+        race.year,
+        driver.name as driver,
+        race_result.position_text as finish,
+        fastest_lap.fastest_lap_lap as lap,
+        fastest_lap.fastest_lap_time_millis as time,
+        fastest_lap.tyre_manufacturer_id as tyre,
+        fastest_lap.engine_manufacturer_id as engine,
+        fastest_lap.constructor_id as constructor
+    FROM 
+        race_data fastest_lap
+    JOIN
+        race ON fastest_lap.race_id = race.id
+    JOIN
+        driver on driver.id = fastest_lap.driver_id
+    LEFT JOIN 
+        race_data race_result ON race_result.race_id = fastest_lap.race_id
+        AND race_result.driver_id = fastest_lap.driver_id
+        AND race_result.type = 'RACE_RESULT'
+    WHERE 
+        fastest_lap.type = 'FASTEST_LAP'
+        AND fastest_lap.fastest_lap_time_millis is not NULL
+)
+SELECT
+    circuit.name AS circuit,
+    records.rank AS '',
+    records.year,
+    records.driver,
+    records.finish,
+    records.lap,
+    records.time,
+    records.tyre,
+    records.engine,
+    records.constructor
+FROM
+    records
+JOIN
+    circuit ON circuit.id = records.circuit_id
+WHERE
+    records.rank > :after
+    AND (:limit < 0 OR records.rank <= :after + :limit)
+ORDER BY
+    circuit.name ASC,
+    circuit.id ASC,
+    CASE WHEN :reverse THEN -records.rank ELSE records.rank END
\ No newline at end of file
@@ -0,0 +1,65 @@
+WITH records AS (
+    SELECT
+        circuit_id,
+        ROW_NUMBER() OVER (
+            PARTITION BY circuit_id
+            ORDER BY best ASC, year ASC, driver ASC
+        ) AS rank,
+        t.*
+    FROM (
+        SELECT 
+            race.circuit_id,
+            race.year,
+            driver.name as driver,
+            q.qualifying_q1_millis as q1,
+            q.qualifying_q2_millis as q2,
+            q.qualifying_q3_millis as q3,
+            -- As sql/derived/05-qualifying-best.sql
+            COALESCE(
+                q.qualifying_time_millis,
+                MIN(
+                    COALESCE(q.qualifying_q1_millis, q.qualifying_q2_millis, q.qualifying_q3_millis),
+                    COALESCE(q.qualifying_q2_millis, q.qualifying_q1_millis, q.qualifying_q3_millis),
+                    COALESCE(q.qualifying_q3_millis, q.qualifying_q1_millis, q.qualifying_q2_millis)
+                )
+            ) as best,
+            q.qualifying_laps as laps,
+            q.tyre_manufacturer_id as tyre,
+            q.engine_manufacturer_id as engine,
+            q.constructor_id as constructor
+        FROM     
+            race_data q
+        JOIN
+            race on race.id = q.race_id
+        JOIN
+            driver on driver.id = q.driver_id
+        WHERE 
+            q.type = 'QUALIFYING_RESULT'
+    ) t
+    WHERE 
+        t.best is not NULL
+)
+SELECT
+    circuit.name AS circuit,
+    records.rank AS '',
+    records.year,
+    records.driver,
+    records.q1,
+    records.q2,
+    records.q3,
+    records.best,
+    records.laps,
+    records.tyre,
+    records.engine,
+    records.constructor
+FROM
+    records
+JOIN
+    circuit ON circuit.id = records.circuit_id
+WHERE
+    records.rank > :after
+    AND (:limit < 0 OR records.rank <= :after + :limit)
+ORDER BY
+    circuit.name ASC,
+    circuit.id ASC,
+    CASE WHEN :reverse THEN -records.rank ELSE records.rank END
\ No newline at end of file
@@ -0,0 +1,44 @@
+WITH records AS (
+    SELECT
+        circuit_id,
+        ROW_NUMBER() OVER (
+            PARTITION BY circuit_id
+            ORDER BY total DESC, driver ASC
+        ) AS rank,
+        driver,
+        total
+    FROM (
+        SELECT
+            race.circuit_id,
+            driver.name AS driver,
+            COUNT(*) AS total
+        FROM 
+            race_data race_result
+        JOIN 
+            race ON race_result.race_id = race.id
+        JOIN 
+            driver ON driver.id = race_result.driver_id
+        WHERE 
+            race_result.type = 'RACE_RESULT'
+            AND race_result.position_number <= 3
+        GROUP BY 
+            race.circuit_id,
+            driver.name
+    )
+)
+SELECT
+    circuit.name AS circuit,
+    records.rank AS '',
+    records.driver,
+    records.total
+FROM
+    records
+JOIN
+    circuit ON circuit.id = records.circuit_id
+WHERE
+    records.rank > :after
+    AND (:limit < 0 OR records.rank <= :after + :limit)
+ORDER BY
+    circuit.name ASC,
+    circuit.id ASC,
+    CASE WHEN :reverse THEN -records.rank ELSE records.rank END
\ No newline at end of file
@@ -1,25 +1,47 @@
+WITH records AS (
+    SELECT
+        ROW_NUMBER() OVER 
+            (ORDER BY fastest_lap.fastest_lap_time_millis ASC, race.year ASC, driver.name ASC) as rank,
+        race.year,
+        driver.name as driver,
+        race_result.position_text as finish,
+        fastest_lap.fastest_lap_lap as lap,
+        fastest_lap.fastest_lap_time_millis as time,
+        fastest_lap.tyre_manufacturer_id as tyre,
+        fastest_lap.engine_manufacturer_id as engine,
+        fastest_lap.constructor_id as constructor
+    FROM 
+        race_data fastest_lap
+    JOIN
+        race ON fastest_lap.race_id = race.id
+    JOIN
+        driver on driver.id = fastest_lap.driver_id
+    LEFT JOIN 
+        race_data race_result ON race_result.race_id = fastest_lap.race_id
+        AND race_result.driver_id = fastest_lap.driver_id
+        AND race_result.type = 'RACE_RESULT'
+    WHERE 
+        fastest_lap.type = 'FASTEST_LAP' 
+        AND fastest_lap.fastest_lap_time_millis is not NULL
+        AND race.circuit_id = :id
+),
+page AS (
+    SELECT * FROM records
+    WHERE rank > :after
+    ORDER BY rank ASC
+    LIMIT :limit
+)
 SELECT
-    ROW_NUMBER() OVER 
-        (ORDER BY fastest_lap.fastest_lap_time ASC) as '',
-    race.year,
-    driver.name as driver,
-    race_result.position_text as finish,
-    fastest_lap.fastest_lap_lap as lap,
-    fastest_lap.fastest_lap_time as time,
-    fastest_lap.tyre_manufacturer_id as tyre,
-    fastest_lap.engine_manufacturer_id as engine,
-    fastest_lap.constructor_id as constructor
-
-FROM 
-    race_data fastest_lap
-JOIN
-    race ON fastest_lap.race_id = race.id
-JOIN
-    driver on driver.id = fastest_lap.driver_id
-LEFT JOIN 
-    race_data race_result ON race_result.race_id = fastest_lap.race_id
-    AND race_result.driver_id = fastest_lap.driver_id
-    AND race_result.type = 'RACE_RESULT'
-WHERE 
-    fastest_lap.type = 'FASTEST_LAP' 
-    AND race.circuit_id = ?
\ No newline at end of file
+    rank as '',
+    year,
+    driver,
+    finish,
+    lap,
+    time,
+    tyre,
+    engine,
+    constructor
+FROM
+    page
+ORDER BY
+    CASE WHEN :reverse THEN -rank ELSE rank END
\ No newline at end of file
@@ -1,40 +1,60 @@
-SELECT
-    ROW_NUMBER() OVER 
-        (ORDER BY best ASC) AS '',
-    t.*
-FROM (
-    SELECT 
-        race.year,
-        driver.name as driver,
-        q.qualifying_q1 as q1,
-        q.qualifying_q2 as q2,
-        q.qualifying_q3 as q3,
-        CASE 
-            WHEN q.qualifying_time THEN q.qualifying_time
-            WHEN q.qualifying_q1
-                and (q.qualifying_q2 is NULL or q.qualifying_q1 <= q.qualifying_q2)
-                and (q.qualifying_q3 is NULL or q.qualifying_q1 <= q.qualifying_q3) THEN q.qualifying_q1
-            WHEN q.qualifying_q2
-                and (q.qualifying_q1 is NULL or q.qualifying_q2 <= q.qualifying_q1)
-                and (q.qualifying_q3 is NULL or q.qualifying_q2 <= q.qualifying_q3) THEN q.qualifying_q2
-            WHEN q.qualifying_q3
-                and (q.qualifying_q1 is NULL or q.qualifying_q3 <= q.qualifying_q1)
-                and (q.qualifying_q2 is NULL or q.qualifying_q3 <= q.qualifying_q2) THEN q.qualifying_q3
-            ELSE NULL
-        END as best,
-        q.qualifying_laps as laps,
-        q.tyre_manufacturer_id as tyre,
-        q.engine_manufacturer_id as engine,
-        q.constructor_id as constructor
-    FROM     
-        race_data q
-    JOIN
-        race on race.id = q.race_id
-    JOIN
-        driver on driver.id = q.driver_id
+WITH records AS (
+    SELECT
+        ROW_NUMBER() OVER 
+            (ORDER BY best ASC, year ASC, driver ASC) AS rank,
+        t.*
+    FROM (
+        SELECT 
+            race.year,
+            driver.name as driver,
+            q.qualifying_q1_millis as q1,
+            q.qualifying_q2_millis as q2,
+            q.qualifying_q3_millis as q3,
+            -- As sql/derived/05-qualifying-best.sql
+            COALESCE(
+                q.qualifying_time_millis,
+                MIN(
+                    COALESCE(q.qualifying_q1_millis, q.qualifying_q2_millis, q.qualifying_q3_millis),
+                    COALESCE(q.qualifying_q2_millis, q.qualifying_q1_millis, q.qualifying_q3_millis),
+                    COALESCE(q.qualifying_q3_millis, q.qualifying_q1_millis, q.qualifying_q2_millis)
+                )
+            ) as best,
+            q.qualifying_laps as laps,
+            q.tyre_manufacturer_id as tyre,
+            q.engine_manufacturer_id as engine,
+            q.constructor_id as constructor
+        FROM     
+            race_data q
+        JOIN
+            race on race.id = q.race_id
+        JOIN
+            driver on driver.id = q.driver_id
+        WHERE 
+            q.type = 'QUALIFYING_RESULT' and
+            race.circuit_id = :id
+    ) t
     WHERE 
-        q.type = 'QUALIFYING_RESULT' and
-        race.circuit_id = ?
-) t
-WHERE 
-    t.best is not NULL
\ No newline at end of file
+        t.best is not NULL
+),
+page AS (
+    SELECT * FROM records
+    WHERE rank > :after
+    ORDER BY rank ASC
+    LIMIT :limit
+)
+SELECT
+    rank AS '',
+    year,
+    driver,
+    q1,
+    q2,
+    q3,
+    best,
+    laps,
+    tyre,
+    engine,
+    constructor
+FROM
+    page
+ORDER BY
+    CASE WHEN :reverse THEN -rank ELSE rank END
\ No newline at end of file
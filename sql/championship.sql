@@ -1,4 +1,7 @@
 SELECT
+    race.year,
+    race.round,
+    grand_prix.id,
     grand_prix.abbreviation,
     driver.name,
     race_data.position_text,
@@ -9,23 +12,25 @@ SELECT
     season_constructor_standing.points
 FROM
     race
-JOIN
-    race_data on race_data.race_id = race.id
-JOIN
+LEFT JOIN
+    race_data on race_data.race_id = race.id and
+    race_data.type = 'RACE_RESULT'
+LEFT JOIN
     driver on driver.id = race_data.driver_id
-JOIN
-    constructor on constructor.id = race_data.constructor_id
 LEFT JOIN
+    constructor on constructor.id = race_data.constructor_id
+JOIN
     grand_prix on grand_prix.id = race.grand_prix_id
 LEFT JOIN
-    season_driver_standing on season_driver_standing.year = :year and
+    season_driver_standing on season_driver_standing.year = race.year and
     season_driver_standing.driver_id = race_data.driver_id
 LEFT JOIN
-    season_constructor_standing on season_constructor_standing.year = :year and
+    season_constructor_standing on season_constructor_standing.year = race.year and
     season_constructor_standing.constructor_id = constructor.id
 WHERE
-    race.year = :year and
-    race_data.type = 'RACE_RESULT'
+    race.year BETWEEN :first AND :last
 ORDER BY
+    race.year ASC,
     season_driver_standing.points DESC,
-    driver.name ASC
\ No newline at end of file
+    driver.name ASC,
+    race.round ASC
\ No newline at end of file
@@ -0,0 +1,20 @@
+SELECT
+    rank AS '',
+    year,
+    driver,
+    finish,
+    lap,
+    time,
+    tyre,
+    engine,
+    constructor
+FROM (
+    SELECT * FROM f1_stats_circuit_best_lap
+    WHERE 
+        circuit_id = :id
+        AND rank > :after
+    ORDER BY rank ASC
+    LIMIT :limit
+)
+ORDER BY
+    CASE WHEN :reverse THEN -rank ELSE rank END
\ No newline at end of file
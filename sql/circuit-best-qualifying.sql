@@ -0,0 +1,22 @@
+SELECT
+    rank AS '',
+    year,
+    driver,
+    q1,
+    q2,
+    q3,
+    best,
+    laps,
+    tyre,
+    engine,
+    constructor
+FROM (
+    SELECT * FROM f1_stats_circuit_best_qualifying
+    WHERE 
+        circuit_id = :id
+        AND rank > :after
+    ORDER BY rank ASC
+    LIMIT :limit
+)
+ORDER BY
+    CASE WHEN :reverse THEN -rank ELSE rank END
\ No newline at end of file
@@ -0,0 +1,14 @@
+SELECT
+    rank AS '',
+    driver,
+    total
+FROM (
+    SELECT * FROM f1_stats_circuit_most_podiums
+    WHERE 
+        circuit_id = :id
+        AND rank > :after
+    ORDER BY rank ASC
+    LIMIT :limit
+)
+ORDER BY
+    CASE WHEN :reverse THEN -rank ELSE rank END
\ No newline at end of file
@@ -0,0 +1,16 @@
+SELECT
+    circuit.name AS circuit,
+    records.rank AS '',
+    records.driver,
+    records.total
+FROM
+    f1_stats_circuit_most_podiums records
+JOIN
+    circuit ON circuit.id = records.circuit_id
+WHERE
+    records.rank > :after
+    AND (:limit < 0 OR records.rank <= :after + :limit)
+ORDER BY
+    circuit.name ASC,
+    circuit.id ASC,
+    CASE WHEN :reverse THEN -records.rank ELSE records.rank END
\ No newline at end of file
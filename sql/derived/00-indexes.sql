@@ -0,0 +1,25 @@
+-- Access paths of the scripts in sql/: race_data is always filtered by
+-- type first, then by driver (driver-*) or by race (gp-*, circuit records)
+CREATE INDEX IF NOT EXISTS f1_stats_race_data_type_driver_idx
+    ON race_data (type, driver_id, race_id);
+
+CREATE INDEX IF NOT EXISTS f1_stats_race_data_type_race_idx
+    ON race_data (type, race_id, driver_id, position_number);
+
+CREATE INDEX IF NOT EXISTS f1_stats_race_year_grand_prix_idx
+    ON race (year, grand_prix_id);
+
+CREATE INDEX IF NOT EXISTS f1_stats_race_circuit_idx
+    ON race (circuit_id, year);
+
+CREATE INDEX IF NOT EXISTS f1_stats_race_driver_standing_idx
+    ON race_driver_standing (race_id, driver_id);
+
+CREATE INDEX IF NOT EXISTS f1_stats_race_constructor_standing_idx
+    ON race_constructor_standing (race_id, constructor_id);
+
+CREATE INDEX IF NOT EXISTS f1_stats_season_driver_standing_idx
+    ON season_driver_standing (year, driver_id);
+
+CREATE INDEX IF NOT EXISTS f1_stats_season_constructor_standing_idx
+    ON season_constructor_standing (year, constructor_id);
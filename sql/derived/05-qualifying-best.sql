@@ -0,0 +1,32 @@
+-- Best qualifying time of every qualifying result in millis, the session
+-- time when there is one, else the fastest of q1, q2 and q3. Read by
+-- sql/derived/10-circuit-records.sql
+DROP TABLE IF EXISTS f1_stats_qualifying_best;
+
+CREATE TABLE f1_stats_qualifying_best AS
+SELECT
+    q.race_id,
+    q.position_display_order,
+    q.driver_id,
+    race.circuit_id,
+    COALESCE(
+        q.qualifying_time_millis,
+        -- Scalar MIN is NULL if any argument is, each COALESCE falls back to the others
+        MIN(
+            COALESCE(q.qualifying_q1_millis, q.qualifying_q2_millis, q.qualifying_q3_millis),
+            COALESCE(q.qualifying_q2_millis, q.qualifying_q1_millis, q.qualifying_q3_millis),
+            COALESCE(q.qualifying_q3_millis, q.qualifying_q1_millis, q.qualifying_q2_millis)
+        )
+    ) AS best_millis
+FROM
+    race_data q
+JOIN
+    race ON race.id = q.race_id
+WHERE
+    q.type = 'QUALIFYING_RESULT';
+
+CREATE UNIQUE INDEX f1_stats_qualifying_best_idx
+    ON f1_stats_qualifying_best (race_id, position_display_order);
+
+CREATE INDEX f1_stats_qualifying_best_circuit_idx
+    ON f1_stats_qualifying_best (circuit_id, best_millis);
@@ -0,0 +1,149 @@
+-- Per circuit rankings of sql/best-lap.sql, sql/best-qualifying.sql,
+-- sql/most-wins.sql and sql/most-podiums.sql, read by sql/circuit-*.sql.
+-- Times are kept in millis, formatted when printed
+DROP TABLE IF EXISTS f1_stats_circuit_best_lap;
+DROP TABLE IF EXISTS f1_stats_circuit_best_qualifying;
+DROP TABLE IF EXISTS f1_stats_circuit_most_wins;
+DROP TABLE IF EXISTS f1_stats_circuit_most_podiums;
+
+CREATE TABLE f1_stats_circuit_best_lap AS
+SELECT
+    race.circuit_id,
+    ROW_NUMBER() OVER (
+        PARTITION BY race.circuit_id
+        ORDER BY fastest_lap.fastest_lap_time_millis ASC, race.year ASC, driver.name ASC
+    ) as rank,
+    race.year,
+    driver.name as driver,
+    race_result.position_text as finish,
+    fastest_lap.fastest_lap_lap as lap,
+    fastest_lap.fastest_lap_time_millis as time,
+    fastest_lap.tyre_manufacturer_id as tyre,
+    fastest_lap.engine_manufacturer_id as engine,
+    fastest_lap.constructor_id as constructor
+FROM 
+    race_data fastest_lap
+JOIN
+    race ON fastest_lap.race_id = race.id
+JOIN
+    driver on driver.id = fastest_lap.driver_id
+LEFT JOIN 
+    race_data race_result ON race_result.race_id = fastest_lap.race_id
+    AND race_result.driver_id = fastest_lap.driver_id
+    AND race_result.type = 'RACE_RESULT'
+WHERE 
+    fastest_lap.type = 'FASTEST_LAP'
+    AND fastest_lap.fastest_lap_time_millis is not NULL;
+
+CREATE TABLE f1_stats_circuit_best_qualifying AS
+SELECT
+    circuit_id,
+    ROW_NUMBER() OVER (
+        PARTITION BY circuit_id
+        ORDER BY best ASC, year ASC, driver ASC
+    ) AS rank,
+    year,
+    driver,
+    q1,
+    q2,
+    q3,
+    best,
+    laps,
+    tyre,
+    engine,
+    constructor
+FROM (
+    SELECT 
+        race.circuit_id,
+        race.year,
+        driver.name as driver,
+        q.qualifying_q1_millis as q1,
+        q.qualifying_q2_millis as q2,
+        q.qualifying_q3_millis as q3,
+        best.best_millis as best,
+        q.qualifying_laps as laps,
+        q.tyre_manufacturer_id as tyre,
+        q.engine_manufacturer_id as engine,
+        q.constructor_id as constructor
+    FROM     
+        race_data q
+    JOIN
+        race on race.id = q.race_id
+    JOIN
+        driver on driver.id = q.driver_id
+    JOIN
+        f1_stats_qualifying_best best ON best.race_id = q.race_id
+        AND best.position_display_order = q.position_display_order
+    WHERE 
+        q.type = 'QUALIFYING_RESULT'
+)
+WHERE 
+    best is not NULL;
+
+CREATE TABLE f1_stats_circuit_most_wins AS
+SELECT
+    circuit_id,
+    ROW_NUMBER() OVER (
+        PARTITION BY circuit_id
+        ORDER BY total DESC, driver ASC
+    ) AS rank,
+    driver,
+    total
+FROM (
+    SELECT
+        race.circuit_id,
+        driver.name AS driver,
+        COUNT(*) AS total
+    FROM 
+        race_data race_result
+    JOIN 
+        race ON race_result.race_id = race.id
+    JOIN 
+        driver ON driver.id = race_result.driver_id
+    WHERE 
+        race_result.type = 'RACE_RESULT'
+        AND race_result.position_number = 1
+    GROUP BY 
+        race.circuit_id,
+        driver.name
+);
+
+CREATE TABLE f1_stats_circuit_most_podiums AS
+SELECT
+    circuit_id,
+    ROW_NUMBER() OVER (
+        PARTITION BY circuit_id
+        ORDER BY total DESC, driver ASC
+    ) AS rank,
+    driver,
+    total
+FROM (
+    SELECT
+        race.circuit_id,
+        driver.name AS driver,
+        COUNT(*) AS total
+    FROM 
+        race_data race_result
+    JOIN 
+        race ON race_result.race_id = race.id
+    JOIN 
+        driver ON driver.id = race_result.driver_id
+    WHERE 
+        race_result.type = 'RACE_RESULT'
+        AND race_result.position_number <= 3
+    GROUP BY 
+        race.circuit_id,
+        driver.name
+);
+
+CREATE UNIQUE INDEX f1_stats_circuit_best_lap_idx
+    ON f1_stats_circuit_best_lap (circuit_id, rank);
+
+CREATE UNIQUE INDEX f1_stats_circuit_best_qualifying_idx
+    ON f1_stats_circuit_best_qualifying (circuit_id, rank);
+
+CREATE UNIQUE INDEX f1_stats_circuit_most_wins_idx
+    ON f1_stats_circuit_most_wins (circuit_id, rank);
+
+CREATE UNIQUE INDEX f1_stats_circuit_most_podiums_idx
+    ON f1_stats_circuit_most_podiums (circuit_id, rank);
@@ -0,0 +1,21 @@
+-- Trigram index of ids, names, full names and abbreviations of drivers,
+-- constructors, circuits and grand prix, read by db --search and db --find
+DROP TABLE IF EXISTS f1_stats_search;
+
+CREATE VIRTUAL TABLE f1_stats_search USING fts5(
+    kind UNINDEXED,
+    id,
+    name,
+    full_name,
+    abbreviation,
+    tokenize = 'trigram'
+);
+
+INSERT INTO f1_stats_search (kind, id, name, full_name, abbreviation)
+SELECT 'driver', id, name, full_name, abbreviation FROM driver
+UNION ALL
+SELECT 'constructor', id, name, full_name, NULL FROM constructor
+UNION ALL
+SELECT 'circuit', id, name, full_name, NULL FROM circuit
+UNION ALL
+SELECT 'grand_prix', id, name, full_name, abbreviation FROM grand_prix;
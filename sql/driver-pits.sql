@@ -11,4 +11,7 @@ JOIN
 WHERE
     pit.type = 'PIT_STOP' and
     pit.driver_id = :id and
-    race.year = :year
\ No newline at end of file
+    race.year = :year
+ORDER BY
+    race.round ASC,
+    pit.pit_stop_lap ASC
\ No newline at end of file
@@ -17,4 +17,6 @@ JOIN
 WHERE    
     q.type = 'QUALIFYING_RESULT' and
     q.driver_id = :id and
-    race.year = :year
\ No newline at end of file
+    race.year = :year
+ORDER BY
+    race.round ASC
\ No newline at end of file
@@ -35,4 +35,6 @@ LEFT JOIN
 WHERE 
     rd.driver_id = :id and 
     rd.type = 'RACE_RESULT' and 
-    race.year = :year
\ No newline at end of file
+    race.year = :year
+ORDER BY
+    race.round ASC
\ No newline at end of file
@@ -1,4 +1,5 @@
 SELECT
+    r.year,
     r.grand_prix_id,
     rd.race_fastest_lap,
     rd.race_pole_position,
@@ -15,7 +16,17 @@ SELECT
     rds.points,
     rd.race_points,
     rds.position_number,
-    rcs.points
+    rcs.points,
+    (
+        SELECT 
+            GROUP_CONCAT(pit.pit_stop_time_millis)
+        FROM 
+            race_data pit
+        WHERE 
+            pit.race_id = rd.race_id and
+            pit.driver_id = :id and
+            pit.type = 'PIT_STOP'
+    ) as pit_times
 FROM 
     race_data rd
 JOIN 
@@ -37,4 +48,7 @@ LEFT JOIN
 WHERE 
     rd.driver_id = :id and 
     rd.type = 'RACE_RESULT' and 
-    r.year = :year
\ No newline at end of file
+    r.year BETWEEN :first AND :last
+ORDER BY
+    r.year ASC,
+    r.round ASC
\ No newline at end of file
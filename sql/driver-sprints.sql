@@ -26,4 +26,6 @@ LEFT JOIN
 WHERE    
     q.type = 'SPRINT_QUALIFYING_RESULT' and
     q.driver_id = :id and
-    race.year = :year
\ No newline at end of file
+    race.year = :year
+ORDER BY
+    race.round ASC
\ No newline at end of file
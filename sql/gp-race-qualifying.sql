@@ -22,4 +22,6 @@ LEFT JOIN
 WHERE    
     q.type = 'QUALIFYING_RESULT' and
     race.grand_prix_id = :id and
-    race.year = :year
\ No newline at end of file
+    race.year = :year
+ORDER BY
+    q.position_display_order ASC
\ No newline at end of file
@@ -20,4 +20,6 @@ JOIN
 WHERE    
     r.type = 'SPRINT_RACE_RESULT' and
     race.grand_prix_id = :id and
-    race.year = :year
\ No newline at end of file
+    race.year = :year
+ORDER BY
+    r.position_display_order ASC
\ No newline at end of file
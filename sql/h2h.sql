@@ -0,0 +1,77 @@
+WITH pairs AS (
+    SELECT
+        race.year,
+        result.constructor_id,
+        result.driver_id,
+        teammate.driver_id AS teammate_id,
+        quali.position_number AS quali_pos,
+        teammate_quali.position_number AS teammate_quali_pos,
+        -- Times of the last session both drivers set one in
+        CASE
+            WHEN quali.qualifying_q3_millis AND teammate_quali.qualifying_q3_millis
+                THEN quali.qualifying_q3_millis - teammate_quali.qualifying_q3_millis
+            WHEN quali.qualifying_q2_millis AND teammate_quali.qualifying_q2_millis
+                THEN quali.qualifying_q2_millis - teammate_quali.qualifying_q2_millis
+            WHEN quali.qualifying_q1_millis AND teammate_quali.qualifying_q1_millis
+                THEN quali.qualifying_q1_millis - teammate_quali.qualifying_q1_millis
+            ELSE quali.qualifying_time_millis - teammate_quali.qualifying_time_millis
+        END AS quali_gap,
+        result.position_display_order AS race_order,
+        teammate.position_display_order AS teammate_race_order,
+        result.race_points AS points,
+        teammate.race_points AS teammate_points
+    FROM
+        race_data result
+    JOIN
+        race_data teammate ON teammate.race_id = result.race_id
+        AND teammate.type = 'RACE_RESULT'
+        AND teammate.constructor_id = result.constructor_id
+        AND teammate.driver_id > result.driver_id
+    JOIN
+        race ON race.id = result.race_id
+    LEFT JOIN
+        race_data quali ON quali.race_id = result.race_id
+        AND quali.type = 'QUALIFYING_RESULT'
+        AND quali.driver_id = result.driver_id
+    LEFT JOIN
+        race_data teammate_quali ON teammate_quali.race_id = result.race_id
+        AND teammate_quali.type = 'QUALIFYING_RESULT'
+        AND teammate_quali.driver_id = teammate.driver_id
+    WHERE
+        result.type = 'RACE_RESULT'
+        AND race.year BETWEEN :first AND :last
+        AND (:driver IS NULL OR :driver IN (result.driver_id, teammate.driver_id))
+        AND (:constructor IS NULL OR result.constructor_id = :constructor)
+)
+SELECT
+    pairs.year,
+    constructor.name AS team,
+    driver.name AS driver,
+    teammate.name AS teammate,
+    COUNT(*) AS races,
+    COUNT(*) FILTER (WHERE quali_pos < teammate_quali_pos) AS quali_wins,
+    COUNT(*) FILTER (WHERE quali_pos > teammate_quali_pos) AS quali_losses,
+    COUNT(*) FILTER (WHERE race_order < teammate_race_order) AS race_wins,
+    COUNT(*) FILTER (WHERE race_order > teammate_race_order) AS race_losses,
+    GROUP_CONCAT(quali_gap) AS quali_gaps,
+    TOTAL(points) AS points,
+    TOTAL(teammate_points) AS teammate_points,
+    pairs.driver_id,
+    pairs.teammate_id
+FROM
+    pairs
+JOIN
+    constructor ON constructor.id = pairs.constructor_id
+JOIN
+    driver ON driver.id = pairs.driver_id
+JOIN
+    driver teammate ON teammate.id = pairs.teammate_id
+GROUP BY
+    pairs.year,
+    pairs.constructor_id,
+    pairs.driver_id,
+    pairs.teammate_id
+ORDER BY
+    pairs.year ASC,
+    constructor.name ASC,
+    driver.name ASC
\ No newline at end of file
@@ -1,22 +1,38 @@
+WITH records AS (
+    SELECT
+        ROW_NUMBER() 
+            OVER (ORDER BY total DESC, driver ASC) AS rank,
+        driver,
+        total
+    FROM (
+        SELECT
+            driver.name AS driver,
+            COUNT(*) AS total
+        FROM 
+            race_data race_result
+        JOIN 
+            race ON race_result.race_id = race.id
+        JOIN 
+            driver ON driver.id = race_result.driver_id
+        WHERE 
+            race_result.type = 'RACE_RESULT'
+            AND race.circuit_id = :id
+            AND race_result.position_number = 1
+        GROUP BY 
+            driver.name
+    )
+),
+page AS (
+    SELECT * FROM records
+    WHERE rank > :after
+    ORDER BY rank ASC
+    LIMIT :limit
+)
 SELECT
-    ROW_NUMBER() 
-        OVER (ORDER BY total DESC) AS '',
+    rank AS '',
     driver,
     total
-FROM (
-    SELECT
-        driver.name AS driver,
-        COUNT(*) AS total
-    FROM 
-        race_data race_result
-    JOIN 
-        race ON race_result.race_id = race.id
-    JOIN 
-        driver ON driver.id = race_result.driver_id
-    WHERE 
-        race_result.type = 'RACE_RESULT'
-        AND race.circuit_id = ?
-        AND race_result.position_number = 1
-    GROUP BY 
-        driver.name
-)
\ No newline at end of file
+FROM
+    page
+ORDER BY
+    CASE WHEN :reverse THEN -rank ELSE rank END
\ No newline at end of file
@@ -0,0 +1,82 @@
+WITH results AS (
+    SELECT
+        race_result.driver_id,
+        race_result.race_id,
+        race.year || ' ' || grand_prix.short_name AS race,
+        race.date,
+        ROW_NUMBER() OVER (
+            PARTITION BY race_result.driver_id
+            ORDER BY race.year ASC, race.round ASC
+        ) AS n,
+        CASE :kind
+            WHEN 'win' THEN race_result.position_number = 1
+            WHEN 'podium' THEN race_result.position_number <= 3
+            WHEN 'points' THEN race_result.race_points > 0
+            WHEN 'finish' THEN race_result.position_number IS NOT NULL
+            WHEN 'pole' THEN race_result.race_pole_position
+            WHEN 'fastest-lap' THEN race_result.race_fastest_lap
+        END AS hit
+    FROM
+        race_data race_result
+    JOIN
+        race ON race.id = race_result.race_id
+    JOIN
+        grand_prix ON grand_prix.id = race.grand_prix_id
+    WHERE
+        race_result.type = 'RACE_RESULT'
+),
+-- Only a streak that got to the last race run so far is still going
+latest AS (
+    SELECT
+        race.id
+    FROM
+        race
+    WHERE
+        EXISTS (SELECT 1 FROM results WHERE results.race_id = race.id)
+    ORDER BY
+        race.year DESC, race.round DESC
+    LIMIT 1
+),
+-- Consecutive hits of a driver share n minus their rank among the hits,
+-- whatever season they fall in
+islands AS (
+    SELECT
+        driver_id,
+        n - ROW_NUMBER() OVER (PARTITION BY driver_id ORDER BY n) AS island,
+        n
+    FROM
+        results
+    WHERE
+        hit
+),
+streaks AS (
+    SELECT
+        driver_id,
+        COUNT(*) AS length,
+        MIN(n) AS first_n,
+        MAX(n) AS last_n
+    FROM
+        islands
+    GROUP BY
+        driver_id,
+        island
+)
+SELECT
+    ROW_NUMBER()
+        OVER (ORDER BY length DESC, first_race.date ASC, driver.name ASC) AS '',
+    driver.name AS driver,
+    length,
+    first_race.race AS 'from',
+    last_race.race AS 'to',
+    last_race.race_id = (SELECT id FROM latest) AS ongoing
+FROM
+    streaks
+JOIN
+    driver ON driver.id = streaks.driver_id
+JOIN
+    results first_race ON first_race.driver_id = streaks.driver_id AND first_race.n = first_n
+JOIN
+    results last_race ON last_race.driver_id = streaks.driver_id AND last_race.n = last_n
+ORDER BY
+    length DESC, first_race.date ASC, driver.name ASC
+LIMIT :limit
\ No newline at end of file
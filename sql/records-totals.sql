@@ -0,0 +1,34 @@
+WITH totals AS (
+    SELECT
+        driver.name AS driver,
+        SUM(CASE :kind
+            WHEN 'win' THEN race_result.position_number = 1
+            WHEN 'podium' THEN race_result.position_number <= 3
+            WHEN 'points' THEN race_result.race_points
+            WHEN 'pole' THEN race_result.race_pole_position
+            WHEN 'fastest-lap' THEN race_result.race_fastest_lap
+            WHEN 'finish' THEN race_result.position_number IS NOT NULL
+        END) AS total,
+        COUNT(*) AS races
+    FROM
+        race_data race_result
+    JOIN
+        driver ON driver.id = race_result.driver_id
+    WHERE
+        race_result.type = 'RACE_RESULT'
+    GROUP BY
+        race_result.driver_id
+)
+SELECT
+    ROW_NUMBER()
+        OVER (ORDER BY total DESC, races ASC, driver ASC) AS '',
+    driver,
+    IIF(total = CAST(total AS INTEGER), CAST(total AS INTEGER), ROUND(total, 2)) AS total,
+    races
+FROM
+    totals
+WHERE
+    total > 0
+ORDER BY
+    total DESC, races ASC, driver ASC
+LIMIT :limit
\ No newline at end of file
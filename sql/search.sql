@@ -0,0 +1,45 @@
+WITH candidates AS (
+    SELECT rowid, rank
+    FROM f1_stats_search
+    WHERE f1_stats_search MATCH :query
+    UNION ALL
+    -- Trigrams need 3 characters, shorter parts are only matched as substrings
+    SELECT rowid, 0
+    FROM f1_stats_search
+    WHERE
+        length(:part) < 3
+        AND (
+            id LIKE :contains ESCAPE '\'
+            OR name LIKE :contains ESCAPE '\'
+            OR full_name LIKE :contains ESCAPE '\'
+            OR abbreviation LIKE :contains ESCAPE '\'
+        )
+)
+SELECT
+    s.kind,
+    s.id,
+    s.name,
+    s.full_name,
+    s.abbreviation,
+    CASE
+        WHEN :part IN (lower(s.id), lower(s.name), lower(s.full_name), lower(s.abbreviation)) THEN 0
+        WHEN s.id LIKE :prefix ESCAPE '\'
+            OR s.name LIKE :prefix ESCAPE '\'
+            OR s.full_name LIKE :prefix ESCAPE '\'
+            OR s.abbreviation LIKE :prefix ESCAPE '\' THEN 1
+        WHEN s.id LIKE :contains ESCAPE '\'
+            OR s.name LIKE :contains ESCAPE '\'
+            OR s.full_name LIKE :contains ESCAPE '\'
+            OR s.abbreviation LIKE :contains ESCAPE '\' THEN 2
+        ELSE 3
+    END AS match
+FROM
+    candidates c
+JOIN
+    f1_stats_search s ON s.rowid = c.rowid
+WHERE
+    :kind IS NULL OR s.kind = :kind
+ORDER BY
+    match ASC,
+    c.rank ASC,
+    s.name ASC
\ No newline at end of file
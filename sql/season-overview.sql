@@ -0,0 +1,63 @@
+WITH pits AS (
+    SELECT
+        pit.race_id,
+        pit.driver_id,
+        GROUP_CONCAT(pit.pit_stop_time_millis) as times
+    FROM
+        race_data pit
+    JOIN
+        race r on r.id = pit.race_id
+    WHERE
+        r.year = :year and
+        pit.type = 'PIT_STOP'
+    GROUP BY
+        pit.race_id,
+        pit.driver_id
+)
+SELECT
+    r.year,
+    r.grand_prix_id,
+    rd.race_fastest_lap,
+    rd.race_pole_position,
+    q.qualifying_q3_millis,
+    rd.race_pit_stops,
+    rd.race_grid_position_number,
+    rd.position_number,
+    rd.position_text,
+    rd.race_reason_retired,
+    rd.race_positions_gained,
+    rd.race_gap_millis,
+    rd.race_laps,
+    rd.race_time_penalty,
+    rds.points,
+    rd.race_points,
+    rds.position_number,
+    rcs.points,
+    pits.times,
+    rd.driver_id,
+    d.name
+FROM 
+    race_data rd
+JOIN 
+    race r on r.id = rd.race_id
+JOIN
+    driver d on d.id = rd.driver_id
+LEFT JOIN
+    race_data q on q.race_id = rd.race_id and
+    q.driver_id = rd.driver_id and
+    q.type = 'QUALIFYING_RESULT'
+LEFT JOIN
+    race_driver_standing rds on rds.race_id = r.id and
+    rds.driver_id = rd.driver_id
+LEFT JOIN
+    race_constructor_standing rcs on rcs.race_id = r.id and
+    rcs.constructor_id = rd.constructor_id
+LEFT JOIN
+    pits on pits.race_id = rd.race_id and
+    pits.driver_id = rd.driver_id
+WHERE 
+    rd.type = 'RACE_RESULT' and 
+    r.year = :year
+ORDER BY
+    rd.driver_id ASC,
+    r.round ASC
\ No newline at end of file